@@ -0,0 +1,33 @@
+"""Syncing several CIN7 accounts in one process.
+
+With an `accounts` list in the config, every selected stream is synced once
+per account, each copy with the account's credentials, its own rate limiter,
+session, retry budget and circuit breaker, and its own bookmarks:
+
+    {"bookmarks": {...},
+     "tenants": {"acme": {"bookmarks": {"sale_order": {...}}}}}
+
+Every record carries the account's tenant label, which is also part of each
+stream's primary key, so that the accounts can share the target's tables.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional
+
+TENANT = "tenant"
+TENANTS = "tenants"
+ACCOUNT_SETTINGS = (TENANT, "api_key", "api_password", "api_url")
+
+
+def get_accounts(config: Mapping[str, Any]) -> List[Dict[str, str]]:
+    """Return the accounts to sync, or an empty list for a single-account tap."""
+    return [
+        {name: account[name] for name in ACCOUNT_SETTINGS if name in account}
+        for account in config.get("accounts") or []
+    ]
+
+
+def tenant_state(state: dict, tenant: Optional[str]) -> dict:
+    """Return the part of the tap state holding a tenant's bookmarks."""
+    if tenant is None:
+        return state
+    return state.setdefault(TENANTS, {}).setdefault(tenant, {})
@@ -0,0 +1,162 @@
+"""Batch file output, following the Singer SDK BATCH message spec.
+
+Instead of one RECORD message per record, records are written to rotating
+gzip-compressed JSONL or Parquet files and announced with BATCH messages:
+
+    {"type": "BATCH", "stream": "sale_order",
+     "encoding": {"format": "jsonl", "compression": "gzip"},
+     "manifest": ["file:///data/sale_order-20240101T000000-0001.jsonl.gz"]}
+
+Files are only announced once they are closed, and a stream's open file is
+always closed and announced before the stream writes a STATE message, so a
+bookmark never covers records that have not been handed to the target.
+"""
+
+import gzip
+import json
+import threading
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import singer
+
+JSONL = "jsonl"
+PARQUET = "parquet"
+FORMATS = (JSONL, PARQUET)
+COMPRESSION = "gzip"
+
+DEFAULT_MAX_RECORDS = 100000
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Files of the same stream created within one second are told apart by this.
+_SEQUENCE = count(1)
+_SEQUENCE_LOCK = threading.Lock()
+
+
+class BatchMessage(singer.Message):
+    """A Singer SDK BATCH message."""
+
+    def __init__(self, stream: str, encoding: Dict[str, str], manifest: List[str]):
+        """Create a message announcing the files in `manifest`."""
+        self.stream = stream
+        self.encoding = encoding
+        self.manifest = manifest
+
+    def asdict(self) -> Dict[str, Any]:
+        """Return the message as a dictionary."""
+        return {
+            "type": "BATCH",
+            "stream": self.stream,
+            "encoding": self.encoding,
+            "manifest": self.manifest,
+        }
+
+
+class BatchWriter:
+    """Write one stream's records to rotating batch files."""
+
+    def __init__(
+        self,
+        stream_name: str,
+        directory: str,
+        file_format: str = JSONL,
+        max_records: int = DEFAULT_MAX_RECORDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Create a writer placing files for `stream_name` in `directory`.
+
+        A file is closed once it holds `max_records` records. JSONL files are
+        also closed once `max_bytes` of compressed data have been written.
+        Parquet rows are held in memory until the file is closed, so Parquet
+        files are closed once the buffered rows take `max_bytes` as JSON.
+        """
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported batch format: {file_format}")
+        if file_format == PARQUET:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as ex:
+                raise ImportError("Parquet batch files require pyarrow") from ex
+        self.stream_name = stream_name
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.completed: List[str] = []
+        self._path: Optional[Path] = None
+        self._file: Any = None
+        self._gzip: Optional[gzip.GzipFile] = None
+        self._rows: List[dict] = []
+        self._row_bytes = 0
+        self._records = 0
+
+    @property
+    def encoding(self) -> Dict[str, str]:
+        """Return the encoding of the files, as given in BATCH messages."""
+        return {"format": self.file_format, "compression": COMPRESSION}
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _SEQUENCE_LOCK:
+            sequence = next(_SEQUENCE)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        suffix = ".jsonl.gz" if self.file_format == JSONL else ".parquet"
+        self._path = self.directory / (
+            f"{self.stream_name}-{timestamp}-{sequence:04d}{suffix}"
+        )
+        if self.file_format == JSONL:
+            self._file = open(self._path, "wb")
+            self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+
+    def write(self, record: dict) -> None:
+        """Add a record to the current file, rotating it when it is full."""
+        if self._path is None:
+            self._open()
+        line = json.dumps(record, default=str, separators=(",", ":")) + "\n"
+        if self._gzip is not None:
+            self._gzip.write(line.encode("utf-8"))
+            size = self._file.tell()
+        else:
+            self._rows.append(record)
+            self._row_bytes += len(line)
+            size = self._row_bytes
+        self._records += 1
+        if self._records >= self.max_records or size >= self.max_bytes:
+            self._close()
+
+    def _close(self) -> None:
+        if self._path is None:
+            return
+        if self._gzip is not None:
+            self._gzip.close()
+            self._file.close()
+        else:
+            import pyarrow
+            import pyarrow.parquet
+
+            # Table.from_pylist needs pyarrow 7, so columns are built by hand.
+            columns: Dict[str, List[Any]] = {}
+            for row in self._rows:
+                for key in row:
+                    columns.setdefault(key, [])
+            for row in self._rows:
+                for key, values in columns.items():
+                    values.append(row.get(key))
+            table = pyarrow.Table.from_pydict(columns)
+            pyarrow.parquet.write_table(table, self._path, compression=COMPRESSION)
+        self.completed.append(self._path.resolve().as_uri())
+        self._path = self._file = self._gzip = None
+        self._rows = []
+        self._row_bytes = 0
+        self._records = 0
+
+    def flush(self) -> Optional[BatchMessage]:
+        """Close the current file and return a message announcing new files."""
+        self._close()
+        if not self.completed:
+            return None
+        message = BatchMessage(self.stream_name, self.encoding, self.completed)
+        self.completed = []
+        return message
@@ -0,0 +1,121 @@
+"""Content-hash change detection for streams without a usable bookmark.
+
+The fingerprint of every record emitted by a stream is kept in a local SQLite
+database, keyed by the record's primary key. On the next run, only records
+whose fingerprint is new or different are emitted, and keys which were not
+returned at all can be reported as deleted.
+
+Fingerprints are compared in memory and only written back once the stream has
+synced successfully, so a failed run never hides changes from the next one.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence
+
+DELETED_AT = "_sdc_deleted_at"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    stream TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (stream, key)
+)
+"""
+# Serializes commits of streams syncing concurrently into the same database.
+_WRITE_LOCK = threading.Lock()
+
+
+def fingerprint(record: dict) -> str:
+    """Return a stable hash of a record's content."""
+    content = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+class ChangeDetector:
+    """The fingerprints of one stream's records as of its last successful sync."""
+
+    def __init__(self, path: str, stream_name: str, key_properties: Sequence[str]):
+        """Load the stream's fingerprints from the database at `path`."""
+        self.path = path
+        self.stream_name = stream_name
+        self.key_properties = list(key_properties)
+        connection = _connect(path)
+        try:
+            self._known: Dict[str, str] = dict(
+                connection.execute(
+                    "SELECT key, hash FROM fingerprints WHERE stream = ?",
+                    (stream_name,),
+                )
+            )
+        finally:
+            connection.close()
+        self._changed: Dict[str, str] = {}
+        self._seen: set = set()
+
+    def _key(self, record: dict) -> str:
+        return json.dumps([record.get(name) for name in self.key_properties])
+
+    def is_changed(self, record: dict) -> bool:
+        """Return True if the record is new or differs from its last version."""
+        key = self._key(record)
+        digest = fingerprint(record)
+        self._seen.add(key)
+        if self._known.get(key) == digest:
+            return False
+        self._changed[key] = digest
+        return True
+
+    @property
+    def seen_count(self) -> int:
+        """Return the number of keys seen in this run."""
+        return len(self._seen)
+
+    @property
+    def known_count(self) -> int:
+        """Return the number of keys stored by the previous runs."""
+        return len(self._known)
+
+    def deleted_keys(self) -> List[dict]:
+        """Return the primary keys of known records not seen in this run."""
+        return [
+            dict(zip(self.key_properties, json.loads(key)))
+            for key in self._known
+            if key not in self._seen
+        ]
+
+    def commit(self, deleted: Optional[List[dict]] = None) -> None:
+        """Store the fingerprints of this run, forgetting any deleted keys."""
+        removed = [(self.stream_name, self._key(record)) for record in (deleted or [])]
+        changed = [
+            (self.stream_name, key, digest) for key, digest in self._changed.items()
+        ]
+        with _WRITE_LOCK:
+            connection = _connect(self.path)
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO fingerprints (stream, key, hash) "
+                        "VALUES (?, ?, ?)",
+                        changed,
+                    )
+                    connection.executemany(
+                        "DELETE FROM fingerprints WHERE stream = ? AND key = ?",
+                        removed,
+                    )
+            finally:
+                connection.close()
+        self._known.update(self._changed)
+        for _, key in removed:
+            self._known.pop(key, None)
+        self._changed = {}
+        self._seen = set()
@@ -1,44 +1,331 @@
 """REST client handling, including CIN7Stream base class."""
 
-import json
+import asyncio
+import copy
 import logging
 import time
-from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
 
 import backoff
 import requests
 import singer
-from memoization import cached
+from pendulum import parse
 from singer_sdk.authenticators import BasicAuthenticator
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import RESTStream
-from time import sleep
-from pendulum import parse
 
+from tap_cin7.accounts import TENANT
+from tap_cin7.batch import DEFAULT_MAX_BYTES, DEFAULT_MAX_RECORDS, BatchWriter
+from tap_cin7.change_detection import DELETED_AT, ChangeDetector
+from tap_cin7.conform import compile_conformer, compile_validator
+from tap_cin7.decoding import decode_page, iter_array
+from tap_cin7.delete_scan import ID_SCAN_CONTEXT, IdSet, load_ids, save_ids
+from tap_cin7.nested import (
+    PARENT_REPLICATION_KEY,
+    iter_nested_items,
+    nested_items_schema,
+)
+from tap_cin7.output import OUTPUT_LOCK, SharedState, flush_output, write_message
+from tap_cin7.pagination import (
+    DEFAULT_MAX_PAGE_BYTES,
+    MAX_PAGE_SIZE,
+    AdaptivePageSize,
+    BackgroundIterator,
+    PageToken,
+    find_last_page,
+    is_last_page,
+    iter_pages_in_order,
+    iter_prefetched_pages,
+)
+from tap_cin7.partitions import (
+    WINDOW_COMPLETE,
+    WINDOW_END,
+    WINDOW_KEYS,
+    WINDOW_START,
+    WINDOW_WATERMARK,
+    advance_watermark,
+    build_windows,
+    format_datetime,
+)
+from tap_cin7.projection import is_selected, selected_fields
+from tap_cin7.rate_limit import RateLimiter, get_rate_limiter, parse_retry_after
+from tap_cin7.retry import (
+    CircuitBreaker,
+    RetryBudget,
+    get_circuit_breaker,
+    get_retry_budget,
+)
+from tap_cin7.scheduling import FairShare
+from tap_cin7.schemas import lazy_schema
+from tap_cin7.session import DEFAULT_READ_TIMEOUT, get_session
+from tap_cin7.telemetry import TELEMETRY, Metrics
+from tap_cin7.transport import ASYNCIO, REQUESTS, AsyncTransport, get_transport
+
+if TYPE_CHECKING:
+    from tap_cin7.tap import TapCIN7
 
 LOGGER = singer.get_logger()
 logging.getLogger("backoff").setLevel(logging.CRITICAL)
 
+STREAMING_CHUNK_SIZE = 64 * 1024
+PAGE_CHECKPOINT = "page_checkpoint"
+API_URL = "https://api.cin7.com/api"
+RETRIABLE_EXCEPTIONS = (
+    RetriableAPIError,
+    requests.exceptions.ReadTimeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
 
 class CIN7Stream(RESTStream):
     """CIN7 stream class."""
 
-    url_base = "https://api.cin7.com/api"
-
     check_empty_response = True
 
     records_jsonpath = "$[*]"
     next_page_token_jsonpath = ""
 
+    _shared_state: Optional[SharedState] = None
+    _isolated_state: Optional[dict] = None
+    _windows: Optional[List[dict]] = None
+    _window_origin: Optional[str] = None
+    _window_run_started: datetime
+
+    # Whether the endpoint accepts `order=<replication_key>`.
+    supports_ordering = False
+    _sort_fallback = False
+    _sorted_start_value: Optional[str] = None
+    _last_sorted_value: Optional[str] = None
+
+    # A static condition ANDed into every `where` filter of the stream.
+    where_filter: Optional[str] = None
+    # Name of a stream whose scan can also produce this stream's records, and
+    # whether this stream can only be produced that way.
+    fan_out_of: Optional[str] = None
+    fan_out_only = False
+    _fanned_out = False
+    # Source fields a fanned-out stream needs besides its own selected ones.
+    fan_out_fields: List[str] = []
+
+    # Whether the endpoint accepts the `fields` parameter.
+    supports_fields = True
+
+    # Whether unchanged records can be skipped using stored content hashes.
+    detect_changes = False
+
+    # Shares the account's request slots between concurrently syncing streams.
+    fair_share: Optional[FairShare] = None
+
+    def __init__(
+        self, *args: Any, account: Optional[Dict[str, str]] = None, **kwargs: Any
+    ) -> None:
+        """Initialize the stream, for one of the configured accounts if given."""
+        super().__init__(*args, **kwargs)
+        if account:
+            self._config.update(account)
+        self._prefetched_windows: Dict[tuple, BackgroundIterator] = {}
+        self._filters: Dict[tuple, Optional[str]] = {}
+        self.fan_out_targets: List["CIN7Stream"] = []
+        self._authenticator: Optional[BasicAuthenticator] = None
+        self._change_detector: Optional[ChangeDetector] = None
+        self._batch_writers: Dict[str, BatchWriter] = {}
+        self._emitted = 0
+        self._emit_seconds = 0.0
+        self._conformer: Optional[Callable[[dict], dict]] = None
+        self._validator: Optional[Callable[[dict], List[str]]] = None
+        self._invalid_fields: Set[str] = set()
+        self._page_sizer: Optional[AdaptivePageSize] = None
+        # Pages fetched ahead are all requested with the size of the first one.
+        if (
+            self.config.get("adaptive_page_size")
+            and self.config.get("prefetch_pages", 1) <= 1
+            and self.config.get("transport", REQUESTS) == REQUESTS
+        ):
+            self._page_sizer = AdaptivePageSize(
+                self.page_size,
+                max_bytes=self.config.get("max_page_bytes", DEFAULT_MAX_PAGE_BYTES),
+                slow_seconds=self.config.get("read_timeout", DEFAULT_READ_TIMEOUT) / 4,
+            )
+        if self.emits_deletes or self.config.get("accounts"):
+            # The class's schema is shared, so only this stream's copy is extended.
+            self._schema = copy.deepcopy(self.schema)
+        if self.emits_deletes:
+            self.schema["properties"][DELETED_AT] = {
+                "type": ["string", "null"],
+                "format": "date-time",
+            }
+        if self.config.get("accounts"):
+            self.schema["properties"][TENANT] = {"type": ["string"]}
+            self._add_tenant_key()
+
+    def _add_tenant_key(self) -> None:
+        if self.primary_keys and TENANT not in self.primary_keys:
+            self.primary_keys = [TENANT, *self.primary_keys]
+
+    def apply_catalog(self, catalog: Any) -> None:
+        """Apply the catalog, keeping the tenant in the primary key."""
+        super().apply_catalog(catalog)
+        if self.config.get("accounts"):
+            self._add_tenant_key()
+
+    @property
+    def tenant(self) -> Optional[str]:
+        """Return the tenant label of the account this stream syncs, if any."""
+        return self.config.get(TENANT)
+
+    @property
+    def qualified_name(self) -> str:
+        """Return the stream name, prefixed with the tenant label if any."""
+        return f"{self.tenant}/{self.name}" if self.tenant else self.name
+
+    @property
+    def record_keys(self) -> List[str]:
+        """Return the primary key fields found in CIN7's records."""
+        return [key for key in self.primary_keys or [] if key != TENANT]
+
+    @property
+    def url_base(self) -> str:
+        """Return the API base URL, which the config may point elsewhere."""
+        return self.config.get("api_url") or API_URL
+
     @property
     def authenticator(self) -> BasicAuthenticator:
-        """Return a new authenticator object."""
-        return BasicAuthenticator.create_for_stream(
-            self,
-            username=self.config.get("api_key"),
-            password=self.config.get("api_password"),
+        """Return the stream's authenticator, creating it on first use."""
+        if self._authenticator is None:
+            self._authenticator = BasicAuthenticator.create_for_stream(
+                self,
+                username=self.config.get("api_key"),
+                password=self.config.get("api_password"),
+            )
+        return self._authenticator
+
+    @property
+    def tap_state(self) -> dict:
+        """Return the tap state, or this stream's private copy when concurrent."""
+        if self._isolated_state is not None:
+            return self._isolated_state
+        return super().tap_state
+
+    def use_shared_state(self, shared_state: SharedState) -> None:
+        """Track bookmarks privately and checkpoint them into `shared_state`."""
+        self._shared_state = shared_state
+        self._isolated_state = shared_state.isolate(self.name, self.tenant)
+        for target in self.fan_out_targets:
+            target.use_shared_state(shared_state)
+
+    def add_fan_out_target(self, target: "CIN7Stream") -> None:
+        """Emit `target`'s records from this stream's scan."""
+        if target in self.fan_out_targets:
+            return
+        LOGGER.info("Stream '%s' will be synced from '%s'", target.name, self.name)
+        target._fanned_out = True
+        self.fan_out_targets.append(target)
+
+    def fan_out_records(self, record: dict) -> Iterable[dict]:
+        """Return the records of this stream derived from a source record."""
+        yield dict(record)
+
+    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return a generator of row-type dictionary objects."""
+        emitted = self._emitted
+        own_start = None
+        targets = [(target, None) for target in self.fan_out_targets]
+        if self.fan_out_targets and self.replication_key:
+            own_start = self.get_starting_replication_key_value(context)
+            targets = [
+                (target, target.get_starting_replication_key_value(None))
+                for target in self.fan_out_targets
+            ]
+        try:
+            for record in super().get_records(context):
+                detector = self._change_detector
+                if detector is not None and not detector.is_changed(record):
+                    continue
+                for target, start in targets:
+                    for row in target.fan_out_records(record):
+                        if target._is_before(row, start):
+                            # Only scanned for the source or another target.
+                            continue
+                        target._write_record_message(row)
+                        target._increment_stream_state(row, context=None)
+                if self._is_before(record, own_start):
+                    # Only scanned for a fanned-out stream with an older bookmark.
+                    continue
+                yield record
+        finally:
+            metrics = self._metrics(context)
+            metrics.add(records=self._emitted - emitted)
+            if context:
+                metrics.finish()
+                metrics.log()
+
+    def _is_before(self, record: dict, start: Optional[str]) -> bool:
+        """Return True if a record's replication key value is older than `start`."""
+        value = record.get(self.replication_key or "")
+        return bool(start and value and value < start)
+
+    def _metrics(self, context: Optional[dict]) -> Metrics:
+        """Return the telemetry of a partition of this stream."""
+        return TELEMETRY.metrics(self.qualified_name, context)
+
+    def _finish_telemetry(self, count_records: bool) -> None:
+        """Record the stream-level timings and log the stream's totals."""
+        metrics = self._metrics(None)
+        metrics.add(emit_seconds=self._emit_seconds)
+        if count_records:
+            metrics.add(records=self._emitted)
+        self._emit_seconds = 0.0
+        metrics.finish()
+        TELEMETRY.stream_totals(self.qualified_name).log()
+
+    @property
+    def cin7_tap(self) -> "TapCIN7":
+        """Return the tap, which holds the limits shared by its streams."""
+        return cast("TapCIN7", self._tap)
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled session shared by all streams of this API account."""
+        return get_session(
+            self.cin7_tap.sessions, self.config.get("api_key"), self.config
+        )
+
+    @property
+    def streaming_decode(self) -> bool:
+        """Return True if records are decoded incrementally from the body."""
+        return bool(self.config.get("streaming_decode")) and (
+            self.records_jsonpath == "$[*]"
+        )
+
+    @property
+    def transport(self) -> Optional[AsyncTransport]:
+        """Return the asyncio transport, or None to send requests on this thread."""
+        if self.config.get("transport", REQUESTS) == ASYNCIO:
+            return get_transport()
+        return None
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Return the rate limiter shared by all streams of this API account."""
+        return get_rate_limiter(
+            self.cin7_tap.rate_limiters, self.config.get("api_key"), self.config
         )
 
     @property
@@ -49,51 +336,705 @@ class CIN7Stream(RESTStream):
             headers["User-Agent"] = self.config.get("user_agent")
         return headers
 
+    @property
+    def page_size(self) -> int:
+        """Return the configured number of rows per page."""
+        rows = (self.config.get("stream_page_sizes") or {}).get(self.name)
+        return min(rows or self.config.get("page_size") or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+
     def get_next_page_token(
         self, response: requests.Response, previous_token: Optional[Any]
     ) -> Optional[Any]:
         """Return a token for identifying next page or None if no more pages."""
-        if previous_token is None:
-            return 2
-        # Parse response as JSON
-        res = response.json()
-        if len(res) == 0:
+        token: PageToken = previous_token or PageToken(1, self.page_size)
+        if is_last_page(self._page_record_count(response), token.rows):
             return None
-        return previous_token + 1
+        next_offset = token.offset + token.rows
+        if self._page_sizer is None:
+            return PageToken(token.page + 1, token.rows)
+        self._page_sizer.observe(
+            response.elapsed.total_seconds(), self._response_bytes(response)
+        )
+        return self._page_sizer.token_at(next_offset)
+
+    def _request_pages(
+        self, context: Optional[dict], first: PageToken
+    ) -> Iterator[Tuple[PageToken, Any]]:
+        """Yield the token and the records of each page for a context."""
+        transport = self.transport
+        if transport is not None:
+            yield from self._request_pages_async(context, first, transport)
+            return
+
+        decorated_request = self.request_decorator(self._request)
+        window = self.config.get("prefetch_pages", 1)
+        if window > 1:
+
+            def fetch(page: int) -> List[dict]:
+                token = PageToken(page, first.rows)
+                prepared_request = self.prepare_request(context, next_page_token=token)
+                response = decorated_request(prepared_request, context)
+                return list(self._timed_parse(response, context))
+
+            plan = self._page_planner(context, first)
+            for page, records in iter_prefetched_pages(
+                fetch, first.page, window, first.rows, plan
+            ):
+                yield PageToken(page, first.rows), records
+            return
+
+        token: Optional[PageToken] = first
+        while token:
+            prepared_request = self.prepare_request(context, next_page_token=token)
+            try:
+                response = decorated_request(prepared_request, context)
+            except requests.exceptions.ReadTimeout:
+                if self._page_sizer is None or not self._page_sizer.shrink():
+                    raise
+                token = self._page_sizer.token_at(token.offset)
+                LOGGER.warning(
+                    "Stream '%s' timed out, retrying with %d rows per page",
+                    self.qualified_name,
+                    token.rows,
+                )
+                continue
+            yield token, self._timed_parse(response, context)
+            token = self.get_next_page_token(response, token)
+
+    def _request_pages_async(
+        self, context: Optional[dict], first: PageToken, transport: AsyncTransport
+    ) -> Iterator[Tuple[PageToken, Any]]:
+        """Yield the pages of a context, fetched ahead on the asyncio transport."""
+
+        def submit(page: int) -> Future:
+            token = PageToken(page, first.rows)
+            prepared_request = self.prepare_request(context, next_page_token=token)
+            return transport.submit(self._async_request(prepared_request, context))
+
+        window = max(self.config.get("prefetch_pages", 1), 1)
+        for page, response in iter_pages_in_order(
+            submit,
+            first.page,
+            window,
+            first.rows,
+            self._page_record_count,
+            self._page_planner(context, first) if window > 1 else None,
+        ):
+            yield PageToken(page, first.rows), self._timed_parse(response, context)
+
+    def _page_planner(
+        self, context: Optional[dict], first: PageToken
+    ) -> Optional[Callable[[int, int], int]]:
+        """Return a function bisecting for a short scan's last page, if enabled.
+
+        Each probe asks for the first record of a page, with only its key, so
+        the pages of a scan shorter than `prefetch_pages` can be fetched ahead
+        without requesting any past the end.
+        """
+        if not self.config.get("trim_short_scans"):
+            return None
+        decorated_request = self.request_decorator(self._request)
+        keys = [key for key in self.primary_keys or [] if key != TENANT]
+
+        def has_page(page: int) -> bool:
+            token = PageToken(PageToken(page, first.rows).offset + 1, 1)
+            params = self.get_url_params(context, token)
+            params.pop("order", None)
+            if self.supports_fields and keys:
+                params["fields"] = keys[0]
+            prepared_request = self.prepare_request(context, next_page_token=token)
+            prepared_request.prepare_url(self.get_url(context), params)
+            response = decorated_request(prepared_request, context)
+            return self._page_record_count(response) > 0
+
+        def plan(last_known: int, empty: int) -> int:
+            last_page = find_last_page(has_page, last_known, empty)
+            LOGGER.info(
+                "Stream '%s' planned pages %d to %d of %d rows",
+                self.qualified_name,
+                first.page,
+                last_page,
+                first.rows,
+            )
+            return last_page
+
+        return plan
+
+    def _materialized_pages(
+        self, context: Optional[dict], first: PageToken
+    ) -> Iterator[Tuple[PageToken, Any]]:
+        for token, records in self._request_pages(context, first):
+            yield token, list(records)
+
+    def _pages_for(self, context: Optional[dict]) -> Iterable[Tuple[PageToken, Any]]:
+        """Return the pages of a context, fetching upcoming windows concurrently."""
+        workers = self.config.get("partition_workers", 1)
+        if workers <= 1 or not self._windows or context not in self._windows:
+            return self._request_pages(context, self._resume_token(context))
+
+        index = self._windows.index(context)
+        end = index + workers
+        for upcoming in self._windows[index:end]:
+            key = self._context_key(upcoming)
+            if key not in self._prefetched_windows:
+                self._filters.setdefault(key, self._where_filter(upcoming))
+                self._prefetched_windows[key] = BackgroundIterator(
+                    self._materialized_pages(upcoming, self._resume_token(upcoming)),
+                    maxsize=max(self.config.get("prefetch_pages", 1), 2),
+                )
+        return self._prefetched_windows.pop(self._context_key(context))
+
+    def _resume_token(self, context: Optional[dict]) -> PageToken:
+        """Return the first page to request, resuming from a page checkpoint."""
+        rows = self._page_sizer.rows if self._page_sizer else self.page_size
+        first = PageToken(1, rows)
+        state = self.get_context_state(context)
+        checkpoint = state.get(PAGE_CHECKPOINT)
+        if not checkpoint:
+            return first
+        if checkpoint.get("where") != self.get_url_params(context, None).get("where"):
+            state.pop(PAGE_CHECKPOINT)
+            return first
+        if self.replication_key and checkpoint.get("replication_key_value"):
+            progress = state.setdefault(
+                "progress_markers",
+                {"Note": "Progress is not resumable if interrupted."},
+            )
+            progress["replication_key"] = self.replication_key
+            progress["replication_key_value"] = max(
+                progress.get("replication_key_value") or "",
+                checkpoint["replication_key_value"],
+            )
+        # Checkpoints written before page sizes were configurable used 250 rows.
+        rows = checkpoint.get("rows", MAX_PAGE_SIZE)
+        token = PageToken(checkpoint["page"] + 1, rows)
+        LOGGER.info(
+            "Resuming stream '%s' from record %d", self.qualified_name, token.offset + 1
+        )
+        return token
+
+    def _write_page_checkpoint(self, context: Optional[dict], token: PageToken) -> None:
+        """Record that every page up to the one at `token` has been emitted."""
+        state = self.get_context_state(context)
+        progress = state.get("progress_markers", {})
+        state[PAGE_CHECKPOINT] = {
+            "where": self.get_url_params(context, None).get("where"),
+            "page": token.page,
+            "rows": token.rows,
+            "replication_key_value": progress.get("replication_key_value"),
+        }
+        self._write_state_message()
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request records from REST endpoint(s), prefetching pages if enabled."""
+        # Bookmarks of sorted streams move while paging, so fix the filter first.
+        key = self._context_key(context)
+        self._filters.setdefault(key, self._where_filter(context))
+        state = self.get_context_state(context)
+        self._sorted_start_value = state.get("replication_key_value")
+        self._last_sorted_value = None
+
+        checkpoint_pages = self.config.get("checkpoint_pages", 0)
+        pages_since_checkpoint = 0
+        for token, records in self._pages_for(context):
+            if self._shared_state is not None:
+                self._shared_state.check_stopped()
+            if self.is_sorted:
+                # Check the whole page first, so that no bookmark is written
+                # past a record that only arrives later in the page.
+                records = list(records)
+                for row in records:
+                    self._check_sort_order(row, context)
+                    if self._sort_fallback:
+                        break
+            yield from records
+            pages_since_checkpoint += 1
+            if self.is_sorted:
+                # The bookmark has already moved past every emitted record.
+                self._write_state_message()
+            elif checkpoint_pages and pages_since_checkpoint >= checkpoint_pages:
+                self._write_page_checkpoint(context, token)
+                pages_since_checkpoint = 0
+        state.pop(PAGE_CHECKPOINT, None)
+        self._filters.pop(key, None)
+        if (
+            context
+            and WINDOW_END in context
+            and context[WINDOW_END] <= format_datetime(self._window_run_started)
+        ):
+            self.get_context_state(context)[WINDOW_COMPLETE] = True
+
+    @property
+    def window_days(self) -> Optional[int]:
+        """Return the length of the date windows, if windowing is enabled."""
+        if not self.replication_key:
+            return None
+        return self.config.get("window_days")
+
+    @property
+    def partitions(self) -> Optional[List[dict]]:
+        """Return one context per open date window, if windowing is enabled."""
+        if not self.window_days:
+            return super().partitions
+        if self._windows is None:
+            self._windows = self._build_windows()
+        return self._windows or None
+
+    def _build_windows(self) -> List[dict]:
+        state = self.stream_state
+        watermark = state.get(WINDOW_WATERMARK)
+        start: Optional[datetime] = (
+            cast(datetime, parse(watermark))
+            if watermark
+            else self.get_starting_time(None)
+        )
+        if not start:
+            LOGGER.warning(
+                "Stream '%s' has no start_date or bookmark, "
+                "syncing without date windows.",
+                self.qualified_name,
+            )
+            return []
+        self._window_run_started = datetime.now(timezone.utc)
+        self._window_origin = format_datetime(start)
+        completed = [
+            partition["context"]
+            for partition in state.get("partitions", [])
+            if partition.get(WINDOW_COMPLETE)
+        ]
+        windows = build_windows(
+            start, self._window_run_started, self.config["window_days"]
+        )
+        return [window for window in windows if window not in completed]
+
+    def _sync_records(self, context: Optional[dict] = None) -> None:
+        """Sync records of this stream and any streams fanned out from them."""
+        for target in self.fan_out_targets:
+            target._write_schema_message()
+            target._write_starting_replication_value(None)
+        if context is None and self.change_detection_path:
+            self._change_detector = ChangeDetector(
+                self.change_detection_path, self.qualified_name, self.record_keys
+            )
+        super()._sync_records(context)
+        detector = self._change_detector
+        deleted = self._write_deletes(detector) if detector is not None else []
+        scanned_ids = self._scan_for_deletes() if context is None else None
+        if context is None and self._windows:
+            watermark = advance_watermark(
+                self.stream_state,
+                self.stream_state.get(WINDOW_WATERMARK, self._window_origin),
+            )
+            # Finalizing the partitions must not bring the folded windows back.
+            self._windows = [
+                window for window in self._windows if window[WINDOW_START] >= watermark
+            ]
+            self._write_state_message()
+        self._finish_fan_out_targets(scan_deletes=context is None)
+        if context is None and self.batch_format:
+            self._write_state_message(final=True)
+        if detector is not None:
+            detector.commit(deleted)
+            self._change_detector = None
+        if scanned_ids is not None:
+            save_ids(self.config["delete_scan_path"], self.qualified_name, scanned_ids)
+        if context is None:
+            self._finish_telemetry(count_records=False)
+
+    def _finish_fan_out_targets(self, scan_deletes: bool) -> None:
+        """Finalize the streams fanned out of this one, scanning them for deletes."""
+        for target in self.fan_out_targets:
+            target.finalize_state_progress_markers(target.stream_state)
+            target._write_state_message(final=True)
+            # Fanned-out streams never run a sync of their own to scan in.
+            scanned_ids = target._scan_for_deletes() if scan_deletes else None
+            target._finish_telemetry(count_records=True)
+            if scanned_ids is not None:
+                save_ids(
+                    target.config["delete_scan_path"],
+                    target.qualified_name,
+                    scanned_ids,
+                )
+
+    @property
+    def change_detection_path(self) -> Optional[str]:
+        """Return the fingerprint database path if change detection is enabled."""
+        if self.detect_changes and self.primary_keys:
+            return self.config.get("change_detection_path")
+        return None
+
+    @property
+    def emits_deletes(self) -> bool:
+        """Return True if the stream emits records marked as deleted."""
+        return self.deletes_from_hashes or self.scans_for_deletes
+
+    @property
+    def deletes_from_hashes(self) -> bool:
+        """Return True if records missing from a full-table scan are deleted."""
+        return bool(
+            self.change_detection_path
+            and self.config.get("emit_deletes")
+            and not self.replication_key
+        )
+
+    @property
+    def scans_for_deletes(self) -> bool:
+        """Return True if deletes are detected with an id-only scan."""
+        return bool(
+            self.name in self.config.get("delete_scan_streams", [])
+            and self.config.get("delete_scan_path")
+            and self.record_keys == ["id"]
+            and self.supports_fields
+        )
+
+    def _write_deletes(self, detector: ChangeDetector) -> List[dict]:
+        """Emit deletes for keys missing from this run and return them."""
+        if not self.deletes_from_hashes:
+            return []
+        if not detector.seen_count and detector.known_count:
+            LOGGER.warning(
+                "Stream '%s' returned no records, skipping delete detection",
+                self.qualified_name,
+            )
+            return []
+        return self._write_deleted_keys(detector.deleted_keys())
+
+    def _write_deleted_keys(self, deleted: List[dict]) -> List[dict]:
+        deleted_at = datetime.now(timezone.utc).isoformat()
+        for key in deleted:
+            self._write_record_message(dict(key, **{DELETED_AT: deleted_at}))
+        if deleted:
+            LOGGER.info(
+                "Stream '%s' emitted %d deleted records",
+                self.qualified_name,
+                len(deleted),
+            )
+        return deleted
+
+    def _scan_ids(self) -> IdSet:
+        """Return the ids of all of the stream's records, requesting only ids."""
+        first = PageToken(1, MAX_PAGE_SIZE)
+        pages = self._request_pages(ID_SCAN_CONTEXT, first)
+        return IdSet(record["id"] for _, records in pages for record in records)
+
+    def _scan_for_deletes(self) -> Optional[IdSet]:
+        """Emit deletes for ids which disappeared since the last scan.
+
+        Returns the scanned ids, to be saved once the stream has synced.
+        """
+        if not self.scans_for_deletes:
+            if self.name in self.config.get("delete_scan_streams", []):
+                LOGGER.warning(
+                    "Stream '%s' cannot be scanned for deletes, it needs an "
+                    "integer `id` key, the `fields` parameter and a "
+                    "delete_scan_path",
+                    self.name,
+                )
+            return None
+        previous = load_ids(self.config["delete_scan_path"], self.qualified_name)
+        metrics = self._metrics(ID_SCAN_CONTEXT)
+        current = self._scan_ids()
+        metrics.finish()
+        metrics.log()
+        if previous is None:
+            LOGGER.info("Stream '%s' saved %d ids", self.qualified_name, len(current))
+            return current
+        if not len(current) and len(previous):
+            LOGGER.warning(
+                "Stream '%s' listed no ids, skipping delete detection",
+                self.qualified_name,
+            )
+            return None
+        deleted = previous.difference(current)
+        self._write_deleted_keys([{"id": record_id} for record_id in deleted])
+        return current
+
+    @property
+    def batch_format(self) -> Optional[str]:
+        """Return the batch file format, or None to write RECORD messages."""
+        return self.config.get("batch_format")
+
+    def _batch_writer(self, stream_alias: str) -> BatchWriter:
+        writer = self._batch_writers.get(stream_alias)
+        if writer is None:
+            file_format = self.batch_format
+            if file_format is None:
+                raise RuntimeError("Records are only batched with a batch_format")
+            writer = BatchWriter(
+                stream_alias,
+                self.config.get("batch_directory", "output"),
+                file_format=file_format,
+                max_records=self.config.get("batch_max_records", DEFAULT_MAX_RECORDS),
+                max_bytes=self.config.get("batch_max_bytes", DEFAULT_MAX_BYTES),
+            )
+            self._batch_writers[stream_alias] = writer
+        return writer
+
+    def _flush_batches(self, final: bool) -> bool:
+        """Announce the stream's batch files ahead of a STATE message.
+
+        Returns False if the STATE message should be held back instead, so that
+        checkpoints between complete files do not produce tiny batch files.
+        """
+        writers = list(self._batch_writers.values())
+        if not final and not any(writer.completed for writer in writers):
+            return False
+        for writer in writers:
+            message = writer.flush()
+            if message is not None:
+                write_message(message)
+        return True
 
     def get_starting_time(self, context):
         start_date = self.config.get("start_date")
         if start_date:
             start_date = parse(self.config.get("start_date"))
         rep_key = self.get_starting_timestamp(context)
-        return rep_key or start_date
-    
+        if context and WINDOW_START in context:
+            window_start = parse(context[WINDOW_START])
+            return max(window_start, rep_key) if rep_key else window_start
+        starting_time = rep_key or start_date
+        if context is None and self.fan_out_targets:
+            # Scan far enough back for the stream with the oldest bookmark.
+            starts = [target.get_starting_time(None) for target in self.fan_out_targets]
+            if self.selected:
+                starts.append(starting_time)
+            if all(starts):
+                starting_time = min(starts)
+            else:
+                starting_time = None
+        return starting_time
+
+    @staticmethod
+    def _context_key(context: Optional[dict]) -> tuple:
+        return tuple(sorted((context or {}).items()))
+
+    @property
+    def server_side_ordering(self) -> bool:
+        """Return True if records are requested in replication key order."""
+        return bool(
+            self.supports_ordering
+            and self.replication_key
+            and self.config.get("server_side_ordering", True)
+        )
+
+    @property
+    def is_sorted(self) -> bool:
+        """Return True if records arrive in ascending replication key order."""
+        if self._fanned_out:
+            return False
+        return self.server_side_ordering and not self._sort_fallback
+
+    def _where_filter(self, context: Optional[dict]) -> Optional[str]:
+        """Return the `where` clause selecting the records of a context."""
+        where = [self.where_filter] if self.where_filter else []
+        start_date = self.get_starting_time(context)
+        if self.replication_key and start_date:
+            start_date = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            # Sorted bookmarks may stop between records sharing the same value.
+            operator = ">=" if self.is_sorted else ">"
+            where.append(f"{self.replication_key}{operator}'{start_date}'")
+            if context and WINDOW_END in context:
+                where.append(f"{self.replication_key}<='{context[WINDOW_END]}'")
+        return " AND ".join(where) or None
+
     def get_url_params(
         self, context: Optional[dict], next_page_token: Optional[Any]
     ) -> Dict[str, Any]:
         """Return a dictionary of values to be used in URL parameterization."""
-        params: dict = {}
-        if next_page_token is None:
-            params["page"] = 1
+        token = next_page_token or PageToken(1, self.page_size)
+        params: dict = {"page": token.page, "rows": token.rows}
+        if context == ID_SCAN_CONTEXT:
+            if self.where_filter:
+                params["where"] = self.where_filter
+            params["fields"] = "id"
+            return params
+        key = self._context_key(context)
+        if key in self._filters:
+            where = self._filters[key]
         else:
-            params["page"] = next_page_token
-        start_date = self.get_starting_time(context)
-        if self.replication_key and start_date:
-            start_date = start_date.strftime('%Y-%m-%dT%H:%M:%SZ')
-            params["where"] = f"{self.replication_key}>'{start_date}'"
+            where = self._where_filter(context)
+        if where:
+            params["where"] = where
+        if self.server_side_ordering:
+            params["order"] = self.replication_key
+        fields = self.requested_fields
+        if fields:
+            params["fields"] = ",".join(fields)
         return params
 
+    def selected_fields(self) -> Optional[List[str]]:
+        """Return the top-level fields selected in the catalog, or None for all."""
+        selection = {}
+        for breadcrumb, metadata in self.metadata.items():
+            if len(breadcrumb) < 2:
+                continue
+            if len(breadcrumb) == 2:
+                selection[breadcrumb] = is_selected(metadata)
+            else:
+                # Nested properties only count when explicitly selected.
+                selection[breadcrumb] = metadata.selected is True
+        always_include = list(self.record_keys)
+        if self.replication_key:
+            always_include.append(self.replication_key)
+        fields = selected_fields(self.schema, selection, always_include)
+        if fields is None:
+            return None
+        return [name for name in fields if name != TENANT]
+
+    def source_fields(self) -> Optional[List[str]]:
+        """Return the fields this stream needs from the stream it fans out of."""
+        fields = self.selected_fields()
+        if fields is None:
+            return None
+        return fields + [name for name in self.fan_out_fields if name not in fields]
+
+    @property
+    def requested_fields(self) -> Optional[List[str]]:
+        """Return the fields to request from CIN7, or None to request everything."""
+        if not (self.supports_fields and self.config.get("field_projection", True)):
+            return None
+        wanted = [self.selected_fields()] if self.selected else []
+        wanted += [target.source_fields() for target in self.fan_out_targets]
+        if not wanted:
+            return None
+        fields: List[str] = []
+        for stream_fields in wanted:
+            if stream_fields is None:
+                return None
+            fields += [name for name in stream_fields if name not in fields]
+        return fields
+
+    def _check_sort_order(self, row: dict, context: Optional[dict]) -> None:
+        """Fall back to unsorted replication if `row` arrived out of order."""
+        value = row.get(self.replication_key)
+        if value is None:
+            return
+        if self._last_sorted_value is None or value >= self._last_sorted_value:
+            self._last_sorted_value = value
+            return
+
+        LOGGER.warning(
+            "Stream '%s' returned records out of %s order, "
+            "falling back to unsorted replication.",
+            self.qualified_name,
+            self.replication_key,
+        )
+        self._sort_fallback = True
+        # Emitted records no longer prove that everything before them was
+        # synced, so only commit the bookmark once the stream completes.
+        state = self.get_context_state(context)
+        emitted = state.get("replication_key_value")
+        if self._sorted_start_value is None:
+            state.pop("replication_key_value", None)
+        else:
+            state["replication_key_value"] = self._sorted_start_value
+        state["progress_markers"] = {
+            "Note": "Progress is not resumable if interrupted.",
+            "replication_key": self.replication_key,
+            "replication_key_value": emitted,
+        }
+
+    def _decode_page(self, response: requests.Response) -> Any:
+        """Decode the response body once and cache it on the response."""
+        if not hasattr(response, "_cin7_page"):
+            setattr(response, "_cin7_page", decode_page(response.content))
+        return getattr(response, "_cin7_page")
+
+    def _page_record_count(self, response: requests.Response) -> int:
+        """Return the number of records in the page held by the response."""
+        if hasattr(response, "_cin7_record_count"):
+            return getattr(response, "_cin7_record_count")
+        page = self._decode_page(response)
+        if self.records_jsonpath == "$[*]" and isinstance(page, list):
+            return len(page)
+        return sum(1 for _ in extract_jsonpath(self.records_jsonpath, input=page))
+
+    def _timed_parse(
+        self, response: requests.Response, context: Optional[dict]
+    ) -> Iterator[dict]:
+        """Parse a response, timing the parsing and counting the bytes received."""
+        records = iter(self.parse_response(response))
+        parse_seconds = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    record = next(records)
+                except StopIteration:
+                    return
+                finally:
+                    parse_seconds += time.perf_counter() - started
+                yield record
+        finally:
+            self._metrics(context).add(
+                parse_seconds=parse_seconds,
+                response_bytes=self._response_bytes(response),
+            )
+
+    @staticmethod
+    def _response_bytes(response: requests.Response) -> int:
+        """Return the number of body bytes received for a response."""
+        tell = getattr(response.raw, "tell", None)
+        return tell() if tell else len(response.content or b"")
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        response_str = json.loads(response.text.replace("\\r", ""))
-        yield from extract_jsonpath(self.records_jsonpath, input=response_str)
+        # The requests stubs omit the flag set once the body has been read.
+        consumed = response._content_consumed  # type: ignore[attr-defined]
+        if self.streaming_decode and not consumed:
+            count = 0
+            try:
+                for record in iter_array(response.iter_content(STREAMING_CHUNK_SIZE)):
+                    count += 1
+                    yield record
+            finally:
+                response.close()
+            setattr(response, "_cin7_record_count", count)
+            return
+
+        page = self._decode_page(response)
+        if self.records_jsonpath == "$[*]" and isinstance(page, list):
+            yield from page
+        else:
+            yield from extract_jsonpath(self.records_jsonpath, input=page)
+
+    @property
+    def retry_budget(self) -> RetryBudget:
+        """Return the retry budget shared by all streams of this API account."""
+        return get_retry_budget(
+            self.cin7_tap.retry_budgets, self.config.get("api_key"), self.config
+        )
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker shared by all streams of this API account."""
+        return get_circuit_breaker(
+            self.cin7_tap.circuit_breakers, self.config.get("api_key"), self.config
+        )
 
     def log_backoff_attempt(self, details):
+        args = details.get("args") or ()
+        self._metrics(args[1] if len(args) > 1 else None).add(retries=1)
         LOGGER.info(
             "ConnectionFailure detected, triggering backoff: %d try",
             details.get("tries"),
         )
 
+    def give_up_retrying(self, exception: Exception) -> bool:
+        """Return True once the run's retry budget is used up."""
+        if (
+            isinstance(exception, requests.exceptions.ReadTimeout)
+            and self._page_sizer is not None
+            and self._page_sizer.can_shrink
+        ):
+            # Retry right away with smaller pages instead.
+            return True
+        if self.retry_budget.spend():
+            return False
+        LOGGER.error("Retry budget exhausted, not retrying: %s", exception)
+        return True
+
     def request_decorator(self, func: Callable) -> Callable:
         """Instantiate a decorator for handling request failures.
 
@@ -108,23 +1049,107 @@ class CIN7Stream(RESTStream):
         """
         decorator: Callable = backoff.on_exception(
             backoff.expo,
-            (
-                RetriableAPIError,
-                FatalAPIError,
-                requests.exceptions.ReadTimeout,
-                requests.exceptions.TooManyRedirects,
-                requests.exceptions.ConnectionError
-            ),
-            max_tries=10,
+            RETRIABLE_EXCEPTIONS,
+            max_tries=self.config.get("max_retries", 5),
             factor=2,
-            max_time=600,
+            max_time=self.config.get("max_retry_time", 300),
+            jitter=backoff.full_jitter,
+            giveup=self.give_up_retrying,
             on_backoff=self.log_backoff_attempt,
         )(func)
         return decorator
 
+    def _request(
+        self, prepared_request: requests.PreparedRequest, context: Optional[dict]
+    ) -> requests.Response:
+        """Wait for the circuit breaker and the rate limit, then send the request."""
+        metrics = self._metrics(context)
+        waited = self.circuit_breaker.wait()
+        if self.fair_share is not None:
+            waited += self.fair_share.acquire(self.qualified_name, self.rate_limiter)
+        else:
+            waited += self.rate_limiter.acquire()
+        metrics.add(rate_limit_wait_seconds=waited)
+        started = time.perf_counter()
+        try:
+            return super()._request(prepared_request, context)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            metrics.observe_request(time.perf_counter() - started)
+
+    async def _async_request(
+        self, prepared_request: requests.PreparedRequest, context: Optional[dict]
+    ) -> requests.Response:
+        """Send a request on the asyncio transport, retrying like `_request`."""
+        max_tries = self.config.get("max_retries", 5)
+        max_time = self.config.get("max_retry_time", 300)
+        started = time.monotonic()
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                return await self._async_send(prepared_request, context)
+            except RETRIABLE_EXCEPTIONS as ex:
+                elapsed = time.monotonic() - started
+                if (
+                    self.give_up_retrying(ex)
+                    or tries >= max_tries
+                    or elapsed >= max_time
+                ):
+                    raise
+                self.log_backoff_attempt(
+                    {"args": (prepared_request, context), "tries": tries}
+                )
+                wait = backoff.full_jitter(2 * 2 ** (tries - 1))
+                await asyncio.sleep(min(wait, max_time - elapsed))
+
+    async def _async_send(
+        self, prepared_request: requests.PreparedRequest, context: Optional[dict]
+    ) -> requests.Response:
+        """Wait for the circuit breaker and the rate limit without blocking."""
+        metrics = self._metrics(context)
+        started = time.perf_counter()
+        delay = self.circuit_breaker.delay()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.circuit_breaker.delay()
+        if self.fair_share is not None:
+            # The scheduler blocks until it is the stream's turn, so wait off
+            # the event loop.
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.fair_share.acquire, self.qualified_name, self.rate_limiter
+            )
+        else:
+            await asyncio.sleep(self.rate_limiter.reserve())
+        metrics.add(rate_limit_wait_seconds=time.perf_counter() - started)
+        started = time.perf_counter()
+        try:
+            response = await get_transport().send(
+                self.config.get("api_key"), self.config, prepared_request
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            metrics.observe_request(time.perf_counter() - started)
+        self.validate_response(response)
+        return response
+
     def validate_response(self, response: requests.Response) -> None:
-        sleep(1.01)
-        if 400 <= response.status_code < 500:
+        if response.status_code == 429:
+            self._metrics(None).add(throttled=1)
+            self.rate_limiter.throttled(
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+            msg = (
+                f"{response.status_code} Too Many Requests: "
+                f"{response.reason} for path: {self.path}"
+            )
+            raise RetriableAPIError(msg)
+
+        elif 400 <= response.status_code < 500:
             msg = (
                 f"{response.status_code} Client Error: "
                 f"{response.reason} for path: {self.path}"
@@ -132,8 +1157,116 @@ class CIN7Stream(RESTStream):
             raise FatalAPIError(msg)
 
         elif 500 <= response.status_code < 600:
+            self._metrics(None).add(server_errors=1)
+            self.circuit_breaker.record_failure()
             msg = (
                 f"{response.status_code} Server Error: "
                 f"{response.reason} for path: {self.path}"
             )
-            raise RetriableAPIError(msg)
\ No newline at end of file
+            raise RetriableAPIError(msg)
+
+        self.rate_limiter.succeeded()
+        self.circuit_breaker.record_success()
+
+    def _write_schema_message(self) -> None:
+        """Write out a SCHEMA message with the stream schema."""
+        if not self.selected:
+            # Only scanned for the streams fanned out of it.
+            return
+        with OUTPUT_LOCK:
+            flush_output()
+            super()._write_schema_message()
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write out a RECORD message, or add the record to a batch file."""
+        started = time.perf_counter()
+        if self.tenant:
+            record[TENANT] = self.tenant
+        try:
+            self._emit_record(record)
+        finally:
+            self._emit_seconds += time.perf_counter() - started
+            self._emitted += 1
+
+    def _emit_record(self, record: dict) -> None:
+        if self._windows:
+            for key in WINDOW_KEYS:
+                record.pop(key, None)
+        record = self._conform_record(record)
+        for stream_map in self.stream_maps:
+            mapped_record = stream_map.transform(record)
+            if mapped_record is None:
+                continue
+            if self.batch_format:
+                self._batch_writer(stream_map.stream_alias).write(mapped_record)
+            else:
+                write_message(
+                    singer.RecordMessage(
+                        stream=stream_map.stream_alias,
+                        record=mapped_record,
+                        time_extracted=datetime.now(timezone.utc),
+                    )
+                )
+
+    def _conform_record(self, record: dict) -> dict:
+        """Conform a record with the stream's compiled schema, validating it too."""
+        if self._conformer is None:
+            self._conformer = compile_conformer(self.schema, self.mask, self.name)
+            if self.config.get("validate_records"):
+                self._validator = compile_validator(self.schema)
+        record = self._conformer(record)
+        if self._validator is not None:
+            for error in self._validator(record):
+                field = error.split(":", 1)[0]
+                if field not in self._invalid_fields:
+                    self._invalid_fields.add(field)
+                    LOGGER.warning(
+                        "Stream '%s' has invalid records: %s",
+                        self.qualified_name,
+                        error,
+                    )
+        return record
+
+    def _write_state_message(self, final: bool = False) -> None:
+        """Write out a STATE message with the latest state."""
+        if self.batch_format and not self._flush_batches(final):
+            return
+        if self._shared_state is not None and self._isolated_state is not None:
+            self._shared_state.write(self.name, self._isolated_state, self.tenant)
+            return
+        with OUTPUT_LOCK:
+            flush_output()
+            super()._write_state_message()
+
+
+class NestedItemsStream(CIN7Stream):
+    """A child stream made of the items nested in another stream's records."""
+
+    fan_out_only = True
+    replication_key = PARENT_REPLICATION_KEY
+    # The stream whose records the items are nested in.
+    source_type: Type[CIN7Stream]
+    # Fields leading from a parent record to its items, and the fields taking
+    # the ids of the records at each level above the items.
+    items_path: Tuple[str, ...] = ()
+    parent_keys: Tuple[str, ...] = ()
+    # Item fields moved aside because the parent's fields take their names.
+    renamed_fields: Dict[str, str] = {}
+    schema = lazy_schema(
+        lambda stream_type: nested_items_schema(
+            stream_type.source_type.schema,
+            stream_type.items_path,
+            stream_type.parent_keys,
+            stream_type.renamed_fields,
+        )
+    )
+
+    def fan_out_records(self, record: dict) -> Iterable[dict]:
+        """Return a record for every item nested in the parent record."""
+        return iter_nested_items(
+            record, self.items_path, self.parent_keys, self.renamed_fields
+        )
+
+    def source_fields(self) -> Optional[List[str]]:
+        """Return the parent fields holding the keys and the nested items."""
+        return ["id", PARENT_REPLICATION_KEY, self.items_path[0]]
@@ -0,0 +1,279 @@
+"""Record conformance and validation compiled once per stream schema.
+
+The SDK conforms every record by looking up each of its properties in the
+stream's schema and working out the property's type again. Instead, a stream
+compiles its schema once into a tree of small functions, one per property that
+needs any work, and runs every record through that tree, in place:
+
+- properties missing from the schema, or deselected in the catalog, are dropped,
+  in nested objects as well as at the top level;
+- booleans are conformed like the SDK does, dates and datetimes become ISO 8601
+  strings, and numeric strings in integer and number properties become numbers;
+- values which already have a type the schema allows are left alone.
+
+A validator compiled the same way checks the JSON types of a conformed record.
+"""
+
+import datetime
+import math
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import singer
+
+LOGGER = singer.get_logger()
+
+Breadcrumb = Tuple[str, ...]
+Converter = Callable[[Any], Any]
+Validator = Callable[[Any, str], Iterator[str]]
+
+Rule = Tuple[FrozenSet[type], Converter]
+
+# The value types each kind of property accepts as they are.
+_NO_TYPES: FrozenSet[type] = frozenset([type(None)])
+_BOOLEAN_TYPES: FrozenSet[type] = frozenset([type(None), bool])
+_STRING_TYPES: FrozenSet[type] = frozenset([type(None), str])
+_INTEGER_TYPES: FrozenSet[type] = frozenset([type(None), int, bool])
+_NUMBER_TYPES: FrozenSet[type] = frozenset([type(None), int, float, bool])
+
+
+def schema_types(schema: dict) -> Set[str]:
+    """Return the JSON types a schema allows, including those under `anyOf`."""
+    types = schema.get("type", [])
+    result = {types} if isinstance(types, str) else set(types)
+    for option in schema.get("anyOf", []):
+        result |= schema_types(option)
+    return result
+
+
+def _schema_format(schema: dict) -> Optional[str]:
+    if "format" in schema:
+        return schema["format"]
+    for option in schema.get("anyOf", []):
+        if option.get("format"):
+            return option["format"]
+    return None
+
+
+def _conform_boolean(value: Any) -> Any:
+    # Like the SDK: zero is False and anything else but null is True.
+    return None if value is None else value != 0
+
+
+def _conform_datetime(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat() + "T00:00:00+00:00"
+    return value
+
+
+def _conform_integer(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _conform_number(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        # "nan" and "inf" parse as floats, but JSON has no such numbers.
+        return number if math.isfinite(number) else value
+    return value
+
+
+class _Compiler:
+    """Turn a schema into rules, warning once about each unknown property.
+
+    A rule is a pair of the value types which need no work and the function
+    converting any other value.
+    """
+
+    def __init__(self, stream_name: str, mask: Optional[Mapping]) -> None:
+        self.stream_name = stream_name
+        self.mask = mask
+        self.unknown: Set[str] = set()
+
+    def warn_unknown(self, path: str) -> None:
+        if path in self.unknown:
+            return
+        self.unknown.add(path)
+        LOGGER.warning(
+            "Property '%s' was present in the '%s' stream but not found in "
+            "catalog schema. Ignoring.",
+            path,
+            self.stream_name,
+        )
+
+    def rule(
+        self, schema: dict, path: str, breadcrumb: Optional[Breadcrumb]
+    ) -> Optional[Rule]:
+        """Return the rule for a property, or None if it needs no work."""
+        types = schema_types(schema)
+        if "object" in types and "properties" in schema:
+            return _NO_TYPES, self.object_converter(schema, path, breadcrumb)
+        if "array" in types and isinstance(schema.get("items"), dict):
+            # The SDK's selection mask does not reach inside arrays.
+            item_rule = self.rule(schema["items"], path + "[]", None)
+            if item_rule is None:
+                return None
+            return _NO_TYPES, _array_converter(*item_rule)
+        if "boolean" in types:
+            return _BOOLEAN_TYPES, _conform_boolean
+        if _schema_format(schema) in ("date-time", "date"):
+            return _STRING_TYPES, _conform_datetime
+        if "number" in types:
+            return _NUMBER_TYPES, _conform_number
+        if "integer" in types:
+            return _INTEGER_TYPES, _conform_integer
+        return None
+
+    def property_rules(
+        self, schema: dict, path: str, breadcrumb: Optional[Breadcrumb]
+    ) -> Tuple[List[str], List[Tuple[str, FrozenSet[type], Converter]]]:
+        """Return an object's deselected properties and the rules of the others."""
+        dropped = []
+        rules = []
+        for name, property_schema in schema["properties"].items():
+            child = (
+                breadcrumb + ("properties", name) if breadcrumb is not None else None
+            )
+            if child is not None and self.mask is not None and not self.mask[child]:
+                dropped.append(name)
+                continue
+            rule = self.rule(property_schema, f"{path}.{name}" if path else name, child)
+            if rule is not None:
+                rules.append((name, *rule))
+        return dropped, rules
+
+    def object_converter(
+        self, schema: dict, path: str, breadcrumb: Optional[Breadcrumb]
+    ) -> Converter:
+        """Return a function conforming an object in place."""
+        known = frozenset(schema["properties"])
+        dropped, rules = self.property_rules(schema, path, breadcrumb)
+        warn_unknown = self.warn_unknown
+
+        def conform(value: Any) -> Any:
+            if value.__class__ is not dict:
+                return value
+            if not value.keys() <= known:
+                for name in [name for name in value if name not in known]:
+                    warn_unknown(f"{path}.{name}" if path else name)
+                    del value[name]
+            for name in dropped:
+                value.pop(name, None)
+            for name, ready, convert in rules:
+                # Missing properties read as None, which never needs work.
+                item = value.get(name)
+                if item.__class__ not in ready:
+                    value[name] = convert(item)
+            return value
+
+        return conform
+
+
+def _array_converter(ready: FrozenSet[type], convert: Converter) -> Converter:
+    def conform(value: Any) -> Any:
+        if value.__class__ is not list:
+            return value
+        for index, item in enumerate(value):
+            if item.__class__ not in ready:
+                value[index] = convert(item)
+        return value
+
+    return conform
+
+
+def compile_conformer(
+    schema: dict, mask: Optional[Mapping] = None, stream_name: str = ""
+) -> Callable[[dict], dict]:
+    """Return a function conforming records to `schema`.
+
+    `mask` is the stream's selection mask, mapping breadcrumbs such as
+    `("properties", "lineItems")` to whether the property is selected.
+    """
+    return _Compiler(stream_name, mask).object_converter(schema, "", ())
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    return type(value).__name__
+
+
+def _validator(schema: dict) -> Validator:
+    types = schema_types(schema)
+    if "number" in types:
+        types.add("integer")
+    expected = "/".join(sorted(schema_types(schema)))
+    properties = {
+        name: _validator(property_schema)
+        for name, property_schema in schema.get("properties", {}).items()
+    }
+    items = (
+        _validator(schema["items"]) if isinstance(schema.get("items"), dict) else None
+    )
+
+    def validate(value: Any, path: str) -> Iterator[str]:
+        json_type = _json_type(value)
+        if types and json_type not in types:
+            yield f"{path}: expected {expected}, got {json_type}"
+        elif json_type == "object":
+            for name, item in value.items():
+                if name in properties:
+                    yield from properties[name](item, f"{path}.{name}")
+        elif json_type == "array" and items is not None:
+            for item in value:
+                yield from items(item, f"{path}[]")
+
+    return validate
+
+
+def compile_validator(schema: dict) -> Callable[[dict], List[str]]:
+    """Return a function listing the type errors of a record."""
+    properties = {
+        name: _validator(property_schema)
+        for name, property_schema in schema["properties"].items()
+    }
+
+    def errors(record: dict) -> List[str]:
+        found: List[str] = []
+        for name, value in record.items():
+            validate = properties.get(name)
+            if validate is not None:
+                found.extend(validate(value, name))
+        return found
+
+    return errors
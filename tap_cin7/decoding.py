@@ -0,0 +1,147 @@
+r"""JSON decoding of CIN7 response pages.
+
+CIN7 sometimes returns literal `\r` escapes inside string values, which the tap
+has always stripped before decoding. Pages are decoded from the raw response
+bytes with orjson when it is installed, falling back to the standard library.
+"""
+
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore
+
+CARRIAGE_RETURN_ESCAPE = b"\\r"
+
+_STRUCTURAL = re.compile(rb'["\[\]{},]')
+_STRING_END = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+def loads(data: bytes) -> Any:
+    """Decode a JSON document from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_page(content: bytes) -> Any:
+    """Decode a full response body."""
+    return loads(content.replace(CARRIAGE_RETURN_ESCAPE, b""))
+
+
+def iter_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array, one at a time.
+
+    Only the element currently being read is held in memory, so the peak
+    memory of a page is bounded by its largest record rather than its size.
+    """
+    scanner = _ArrayScanner()
+    for chunk in chunks:
+        for element in scanner.feed(chunk):
+            yield loads(bytes(element).replace(CARRIAGE_RETURN_ESCAPE, b""))
+        if scanner.finished:
+            return
+
+
+class _ArrayScanner:
+    """Split a top-level JSON array into the raw bytes of its elements."""
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.finished = False
+        # Start of the element being read, and end of the last separator.
+        self.start: Optional[int] = None
+        self.separator = 0
+
+    def feed(self, chunk: bytes) -> Iterator[bytearray]:
+        """Add a chunk and yield every element it completes."""
+        self.buf += chunk
+        while not self.finished:
+            if self.in_string:
+                if not self._skip_string():
+                    break
+                continue
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                break
+            element = self._structural(match.start())
+            if element is not None:
+                yield element
+        self._compact()
+
+    def _skip_string(self) -> bool:
+        """Advance past the end of the current string, if it is buffered."""
+        match = _STRING_END.search(self.buf, self.pos)
+        if match is None:
+            self.pos = len(self.buf)
+            return False
+        if self.buf[match.start()] == 0x5C:
+            if match.end() >= len(self.buf):
+                # The escaped character is in the next chunk.
+                self.pos = match.start()
+                return False
+            self.pos = match.end() + 1
+        else:
+            self.pos = match.end()
+            self.in_string = False
+        return True
+
+    def _structural(self, i: int) -> Optional[bytearray]:
+        """Handle the structural character at `i`, returning any finished element."""
+        char = self.buf[i]
+        self.pos = i + 1
+        if self.depth == 0:
+            if char != 0x5B:
+                raise ValueError("Expected a top-level JSON array.")
+            self.depth = 1
+            self.separator = self.pos
+        elif self.depth == 1 and char in b",]":
+            return self._end_element(i, char)
+        elif char == 0x22:
+            self.in_string = True
+            self._begin_element(i, 1)
+        elif char in b"[{":
+            self.depth += 1
+            self._begin_element(i, 2)
+        elif char in b"]}":
+            self.depth -= 1
+        return None
+
+    def _begin_element(self, i: int, depth: int) -> None:
+        if self.depth == depth and self.start is None:
+            self.start = i
+
+    def _end_element(self, i: int, char: int) -> Optional[bytearray]:
+        element = None
+        start, separator = self.start, self.separator
+        if start is None and bytes(self.buf[separator:i]).strip(_WHITESPACE):
+            # A number or literal, which has no opening character.
+            start = separator
+        if start is not None:
+            element = self.buf[start:i]
+        self.start = None
+        self.separator = self.pos
+        self.finished = char == 0x5D
+        return element
+
+    def _compact(self) -> None:
+        """Drop everything before the element being read."""
+        if self.start is not None:
+            keep = self.start
+        elif self.depth == 1:
+            keep = self.separator
+        else:
+            keep = self.pos
+        del self.buf[:keep]
+        self.pos -= keep
+        self.separator = max(self.separator - keep, 0)
+        if self.start is not None:
+            self.start = 0
@@ -0,0 +1,118 @@
+"""Hard-delete detection from id-only scans.
+
+CIN7 never reports deleted records. Instead, a stream can list the ids of all
+of its records with `fields=id` at the largest page size, which costs a small
+fraction of a full sync, and compare them with the ids it listed last time.
+Ids which have disappeared belong to deleted records.
+
+The ids of each stream are kept as a sorted, delta-encoded and compressed
+array in a local SQLite database, where a million ids take up less than a
+megabyte.
+"""
+
+import sqlite3
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional
+
+ID_SCAN = "id_scan"
+# The context of the requests made by an id-only scan.
+ID_SCAN_CONTEXT = {ID_SCAN: True}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS id_sets (
+    stream TEXT PRIMARY KEY,
+    ids BLOB NOT NULL
+)
+"""
+# Serializes saves of streams syncing concurrently into the same database.
+_WRITE_LOCK = threading.Lock()
+
+
+class IdSet:
+    """An immutable set of integer ids, stored as a sorted array."""
+
+    def __init__(self, ids: Iterable[int] = ()) -> None:
+        """Create a set of the given ids."""
+        self._ids = array("q", sorted(set(ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        index = bisect_left(self._ids, value)
+        return index < len(self._ids) and self._ids[index] == value
+
+    def difference(self, other: "IdSet") -> List[int]:
+        """Return the ids of this set missing from `other`, in order."""
+        missing = []
+        theirs = other._ids
+        position, count = 0, len(theirs)
+        for value in self._ids:
+            while position < count and theirs[position] < value:
+                position += 1
+            if position == count or theirs[position] != value:
+                missing.append(value)
+        return missing
+
+    def to_bytes(self) -> bytes:
+        """Return the set delta-encoded and compressed."""
+        deltas = array("q", self._ids)
+        for index in range(len(deltas) - 1, 0, -1):
+            deltas[index] -= deltas[index - 1]
+        if sys.byteorder == "big":
+            deltas.byteswap()
+        return zlib.compress(deltas.tobytes(), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "IdSet":
+        """Return the set encoded by `to_bytes`."""
+        deltas = array("q")
+        deltas.frombytes(zlib.decompress(data))
+        if sys.byteorder == "big":
+            deltas.byteswap()
+        for index in range(1, len(deltas)):
+            deltas[index] += deltas[index - 1]
+        id_set = cls()
+        id_set._ids = deltas
+        return id_set
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+def load_ids(path: str, stream_name: str) -> Optional[IdSet]:
+    """Return the ids saved for a stream, or None if it was never scanned."""
+    connection = _connect(path)
+    try:
+        row = connection.execute(
+            "SELECT ids FROM id_sets WHERE stream = ?", (stream_name,)
+        ).fetchone()
+    finally:
+        connection.close()
+    return IdSet.from_bytes(row[0]) if row else None
+
+
+def save_ids(path: str, stream_name: str, ids: IdSet) -> None:
+    """Replace the ids saved for a stream."""
+    with _WRITE_LOCK:
+        connection = _connect(path)
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO id_sets (stream, ids) VALUES (?, ?)",
+                    (stream_name, ids.to_bytes()),
+                )
+        finally:
+            connection.close()
@@ -0,0 +1,66 @@
+"""Child streams exploding the arrays nested in CIN7 records.
+
+Sales orders, purchase orders, products and BOMs embed their line items,
+options and components. A child stream turns every element of such an array
+into a record of its own, keyed by the ids of the records it is nested in and
+carrying the parent's `modifiedDate`:
+
+    {"id": 7, "modifiedDate": "...", "lineItems": [{"id": 70, "qty": 2}]}
+    -> {"salesOrderId": 7, "modifiedDate": "...", "id": 70, "qty": 2}
+
+Child records are produced from the parent's pages, so they cost no requests.
+"""
+
+import copy
+from typing import Dict, Iterator, Sequence
+
+PARENT_REPLICATION_KEY = "modifiedDate"
+
+
+def nested_items_schema(
+    schema: dict,
+    items_path: Sequence[str],
+    parent_keys: Sequence[str],
+    renamed: Dict[str, str],
+) -> dict:
+    """Return the schema of the records a child stream makes from `schema`."""
+    for field in items_path:
+        schema = schema["properties"][field]["items"]
+    properties: Dict[str, dict] = {
+        key: {"type": ["integer", "null"]} for key in parent_keys
+    }
+    properties[PARENT_REPLICATION_KEY] = {
+        "type": ["string", "null"],
+        "format": "date-time",
+    }
+    for name, item_schema in schema["properties"].items():
+        name = renamed.get(name, name)
+        properties.setdefault(name, copy.deepcopy(item_schema))
+    return {"type": "object", "properties": properties}
+
+
+def iter_nested_items(
+    record: dict,
+    items_path: Sequence[str],
+    parent_keys: Sequence[str],
+    renamed: Dict[str, str],
+) -> Iterator[dict]:
+    """Yield a child record for every item nested in `record` along `items_path`.
+
+    `parent_keys` names the field receiving the id of the record at each level
+    above the items, and `renamed` moves item fields whose names are taken by
+    the parent's.
+    """
+    parents = {PARENT_REPLICATION_KEY: record.get(PARENT_REPLICATION_KEY)}
+
+    def walk(item: dict, level: int) -> Iterator[dict]:
+        parents[parent_keys[level]] = item.get("id")
+        for child in item.get(items_path[level]) or []:
+            if level + 1 < len(items_path):
+                yield from walk(child, level + 1)
+                continue
+            row = {renamed.get(name, name): value for name, value in child.items()}
+            row.update(parents)
+            yield row
+
+    return walk(record, 0)
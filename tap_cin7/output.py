@@ -0,0 +1,191 @@
+"""Serialized Singer output shared by streams syncing on different threads.
+
+By default every message is written with singer-python, one flushed line at a
+time. The fast message writer encodes messages with orjson when it is installed
+and writes them to stdout in large chunks instead. Buffered RECORD messages are
+always flushed ahead of any other message, so a STATE message never reaches the
+target before the records it covers.
+"""
+
+import copy
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Mapping, Optional, Union
+
+import singer
+
+from tap_cin7.accounts import tenant_state
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore
+
+# Guards stdout and the shared tap state so that SCHEMA, RECORD and STATE
+# messages from concurrent streams are never interleaved or torn.
+OUTPUT_LOCK = threading.RLock()
+
+SINGER_WRITER = "singer"
+FAST_WRITER = "fast"
+WRITERS = (SINGER_WRITER, FAST_WRITER)
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def encode_message(message: singer.Message) -> bytes:
+    """Encode a message as a line of JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(message.asdict(), option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # e.g. Decimal values, which singer-python writes as numbers.
+    return (singer.format_message(message) + "\n").encode("utf-8")
+
+
+class SingerWriter:
+    """Write each message as its own line, exactly like the SDK does."""
+
+    buffered = False
+
+    def write(self, message: singer.Message) -> None:
+        """Write a message to stdout."""
+        singer.write_message(message)
+
+    def flush(self) -> None:
+        """Nothing is buffered."""
+
+
+class BufferedWriter:
+    """Write messages to stdout in large chunks.
+
+    The buffer is flushed once it holds `buffer_size` bytes, once
+    `flush_interval` seconds have passed since the last flush, and before any
+    message other than a RECORD is written.
+    """
+
+    buffered = True
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an empty buffer."""
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._flushed_at = clock()
+
+    def write(self, message: singer.Message) -> None:
+        """Buffer a message, flushing as required."""
+        data = encode_message(message)
+        self._chunks.append(data)
+        self._size += len(data)
+        if (
+            not isinstance(message, singer.RecordMessage)
+            or self._size >= self.buffer_size
+            or self._clock() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered messages to stdout."""
+        self._flushed_at = self._clock()
+        if not self._chunks:
+            return
+        # Anything written through the text layer must come out first.
+        sys.stdout.flush()
+        sys.stdout.buffer.write(b"".join(self._chunks))
+        sys.stdout.buffer.flush()
+        self._chunks = []
+        self._size = 0
+
+
+_writer: Union[SingerWriter, BufferedWriter] = SingerWriter()
+
+
+def configure_output(config: Mapping[str, Any]) -> None:
+    """Select the message writer requested by the tap config."""
+    global _writer
+    with OUTPUT_LOCK:
+        _writer.flush()
+        if config.get("message_writer") == FAST_WRITER:
+            _writer = BufferedWriter(
+                config.get("output_buffer_size", DEFAULT_BUFFER_SIZE),
+                config.get("output_flush_interval", DEFAULT_FLUSH_INTERVAL),
+            )
+        else:
+            _writer = SingerWriter()
+
+
+def is_buffered() -> bool:
+    """Return True if messages must be written through `write_message`."""
+    return _writer.buffered
+
+
+def write_message(message: singer.Message) -> None:
+    """Write a single Singer message to stdout."""
+    with OUTPUT_LOCK:
+        _writer.write(message)
+
+
+def flush_output() -> None:
+    """Write out any buffered messages."""
+    with OUTPUT_LOCK:
+        _writer.flush()
+
+
+class SyncStopped(RuntimeError):
+    """Raised in a stream that was stopped because another stream failed."""
+
+
+class SharedState:
+    """The tap state, merged from the private state of each running stream.
+
+    Every stream syncing on a worker thread reads and updates its own private
+    copy of its bookmarks. Whenever the stream checkpoints, its bookmarks are
+    copied into the shared tap state and the full state is written out, so a
+    STATE message never covers records that have not been written yet.
+    """
+
+    def __init__(self, tap_state: dict) -> None:
+        """Wrap the tap's state dictionary."""
+        self._state = tap_state
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        """Stop every stream still syncing before its next page."""
+        self._stopped.set()
+
+    def check_stopped(self) -> None:
+        """Raise `SyncStopped` if the streams have been stopped."""
+        if self._stopped.is_set():
+            raise SyncStopped("Stopped because another stream failed")
+
+    def isolate(self, stream_name: str, tenant: Optional[str] = None) -> dict:
+        """Return a private state dict holding only the given stream's bookmarks."""
+        with OUTPUT_LOCK:
+            state = tenant_state(self._state, tenant)
+            bookmarks = state.get("bookmarks", {}).get(stream_name, {})
+            return {"bookmarks": {stream_name: copy.deepcopy(bookmarks)}}
+
+    def merge(
+        self, stream_name: str, private_state: dict, tenant: Optional[str] = None
+    ) -> None:
+        """Copy a stream's private bookmarks into the shared tap state."""
+        bookmarks = copy.deepcopy(private_state["bookmarks"].get(stream_name, {}))
+        with OUTPUT_LOCK:
+            state = tenant_state(self._state, tenant)
+            state.setdefault("bookmarks", {})[stream_name] = bookmarks
+
+    def write(
+        self, stream_name: str, private_state: dict, tenant: Optional[str] = None
+    ) -> None:
+        """Merge a stream's private bookmarks and write the full tap state."""
+        with OUTPUT_LOCK:
+            self.merge(stream_name, private_state, tenant)
+            write_message(singer.StateMessage(value=self._state))
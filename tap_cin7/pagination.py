@@ -0,0 +1,284 @@
+"""Pagination helpers for CIN7's `page=N&rows=R` style endpoints."""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+PageFetcher = Callable[[int], List[dict]]
+
+MAX_PAGE_SIZE = 250
+# Every step divides the one before it, so the records already read always end
+# on a page boundary of the next smaller size.
+PAGE_SIZE_LADDER = (250, 125, 25, 5)
+DEFAULT_MAX_PAGE_BYTES = 4 * 1024 * 1024
+DEFAULT_SLOW_PAGE_SECONDS = 30.0
+
+
+class PageToken(NamedTuple):
+    """A page number together with the number of rows per page."""
+
+    page: int
+    rows: int
+
+    @property
+    def offset(self) -> int:
+        """Return the number of records before this page."""
+        return (self.page - 1) * self.rows
+
+
+def page_size_ladder(max_rows: int) -> List[int]:
+    """Return the page sizes to step through, starting from `max_rows`."""
+    ladder = [max_rows]
+    for rows in PAGE_SIZE_LADDER:
+        if rows < ladder[-1] and ladder[-1] % rows == 0:
+            ladder.append(rows)
+    return ladder
+
+
+class AdaptivePageSize:
+    """Pick page sizes from the response times and sizes of earlier pages.
+
+    The page size steps down the ladder when a page is slower than
+    `slow_seconds` or larger than `max_bytes`, or when a request times out, and
+    steps back up when pages take less than a quarter of both limits.
+    """
+
+    def __init__(
+        self,
+        max_rows: int,
+        max_bytes: int = DEFAULT_MAX_PAGE_BYTES,
+        slow_seconds: float = DEFAULT_SLOW_PAGE_SECONDS,
+    ) -> None:
+        """Start at `max_rows` per page."""
+        self.ladder = page_size_ladder(max_rows)
+        self.max_bytes = max_bytes
+        self.slow_seconds = slow_seconds
+        self._step = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        """Return the page size currently aimed for."""
+        return self.ladder[self._step]
+
+    @property
+    def can_shrink(self) -> bool:
+        """Return True unless the smallest page size is already in use."""
+        return self._step < len(self.ladder) - 1
+
+    def shrink(self) -> bool:
+        """Step down to a smaller page size, returning False if none is left."""
+        with self._lock:
+            if not self.can_shrink:
+                return False
+            self._step += 1
+            return True
+
+    def observe(self, seconds: float, size: int) -> None:
+        """Adjust the page size after a page took `seconds` and `size` bytes."""
+        with self._lock:
+            if seconds > self.slow_seconds or size > self.max_bytes:
+                self._step = min(self._step + 1, len(self.ladder) - 1)
+            elif seconds < self.slow_seconds / 4 and size < self.max_bytes / 4:
+                self._step = max(self._step - 1, 0)
+
+    def token_at(self, offset: int) -> PageToken:
+        """Return the largest page not above the current size starting at `offset`."""
+        step = self._step
+        for rows in self.ladder[step:]:
+            if offset % rows == 0:
+                return PageToken(offset // rows + 1, rows)
+        return PageToken(offset + 1, 1)
+
+
+def is_last_page(record_count: int, page_size: Optional[int]) -> bool:
+    """Return True if a page with this many records cannot have a successor."""
+    if not record_count:
+        return True
+    return page_size is not None and record_count < page_size
+
+
+def find_last_page(has_page: Callable[[int], bool], last_known: int, empty: int) -> int:
+    """Return the last page with records between `last_known` and `empty`.
+
+    `last_known` has records and `empty` has none, and `has_page` tells
+    whether a page in between has any, so the pages in between are bisected
+    with about `log2(empty - last_known)` probes.
+    """
+    while empty - last_known > 1:
+        middle = (last_known + empty) // 2
+        if has_page(middle):
+            last_known = middle
+        else:
+            empty = middle
+    return last_known
+
+
+def _planned_last_page(
+    first_page: int,
+    far_page: int,
+    far: Future,
+    count: Callable[[Any], int],
+    page_size: Optional[int],
+    plan: Callable[[int, int], int],
+) -> Optional[int]:
+    """Return the last page after a full first page, or None past `far_page`."""
+    records = count(far.result())
+    if not records:
+        return plan(first_page, far_page)
+    if is_last_page(records, page_size):
+        return far_page
+    return None
+
+
+def iter_pages_in_order(
+    submit: Callable[[int], Future],
+    first_page: int,
+    window: int,
+    page_size: Optional[int],
+    count: Callable[[Any], int] = len,
+    plan: Optional[Callable[[int, int], int]] = None,
+) -> Iterator[Tuple[int, Any]]:
+    """Yield `(page, result)` in page order, keeping `window` pages in flight.
+
+    `submit` starts fetching a page and returns a future for it, and `count`
+    returns the number of records in a page's result. Iteration stops after
+    the first empty or short page, so at most `window - 1` pages past the end
+    of the result set are requested.
+
+    With `plan`, the first page is fetched together with the last page of the
+    first window. If that page is full, the scan is longer than the window and
+    pages are fetched ahead as usual. If it is short, it is the last page. If
+    it is empty, `plan` is given the first page and that empty page, and
+    returns the last page in between. Planning thus requests the empty page
+    and at most `log2(window)` probes, never more than the `window - 1` pages
+    past the end it saves. Should a planned last page still be full once
+    fetched, records were added in the meantime, and they are followed one
+    page at a time.
+    """
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    ahead: Dict[int, Future] = {}
+    next_page = first_page
+    last_page = None
+    far_page = first_page + window - 1
+    if plan is not None and window > 1:
+        # Fetch the first page and the last one of its window before the rest.
+        in_flight.append((first_page, submit(first_page)))
+        ahead[far_page] = submit(far_page)
+        next_page, last_page = first_page + 1, first_page
+    else:
+        plan = None
+    try:
+        while True:
+            while len(in_flight) < window and (
+                last_page is None or next_page <= last_page
+            ):
+                future = ahead.pop(next_page, None) or submit(next_page)
+                in_flight.append((next_page, future))
+                next_page += 1
+            if not in_flight:
+                if plan is not None:
+                    last_page = _planned_last_page(
+                        first_page, far_page, ahead[far_page], count, page_size, plan
+                    )
+                    plan = None
+                else:
+                    last_page, window = None, 1
+                continue
+            page, future = in_flight.popleft()
+            result = future.result()
+            yield page, result
+            if is_last_page(count(result), page_size):
+                return
+    finally:
+        for future in [pending for _, pending in in_flight] + list(ahead.values()):
+            future.cancel()
+
+
+def iter_prefetched_pages(
+    fetch: PageFetcher,
+    first_page: int,
+    window: int,
+    page_size: Optional[int],
+    plan: Optional[Callable[[int, int], int]] = None,
+) -> Iterator[Tuple[int, List[dict]]]:
+    """Yield `(page, records)` in page order while fetching ahead on threads."""
+    with ThreadPoolExecutor(
+        max_workers=window, thread_name_prefix="tap-cin7-page"
+    ) as pool:
+        yield from iter_pages_in_order(
+            lambda page: pool.submit(fetch, page),
+            first_page,
+            window,
+            page_size,
+            plan=plan,
+        )
+
+
+_DONE = object()
+
+
+class BackgroundIterator:
+    """Drain an iterable on a worker thread into a bounded buffer.
+
+    Items are handed to the consuming thread in order, and any exception raised
+    by the producer is re-raised there.
+    """
+
+    def __init__(self, iterable: Iterable, maxsize: int = 1) -> None:
+        """Start draining `iterable` in the background."""
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._produce, args=(iterable,), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterable: Iterable) -> None:
+        try:
+            for item in iterable:
+                if not self._put((True, item)):
+                    return
+        except BaseException as ex:  # noqa: B902 - re-raised by the consumer
+            self._put((False, ex))
+            return
+        self._put((True, _DONE))
+
+    def __iter__(self) -> Iterator:
+        """Yield the produced items in order."""
+        try:
+            while True:
+                ok, item = self._queue.get()
+                if not ok:
+                    raise item
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the producer after the item it is currently working on."""
+        self._closed.set()
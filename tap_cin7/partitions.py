@@ -0,0 +1,60 @@
+"""Date-window partitioning of a stream's replication range.
+
+The replication range of a stream is split into fixed `modifiedDate` windows,
+each synced as its own partition with its own bookmark. Windows are aligned to
+the stream's window watermark, the point up to which every window is known to
+be complete, so their boundaries are stable from one run to the next.
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+WINDOW_START = "window_start"
+WINDOW_END = "window_end"
+WINDOW_KEYS = (WINDOW_START, WINDOW_END)
+WINDOW_COMPLETE = "window_complete"
+WINDOW_WATERMARK = "window_watermark"
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def format_datetime(value: datetime) -> str:
+    """Format a datetime the way CIN7 `where` filters expect it."""
+    return value.strftime(DATETIME_FORMAT)
+
+
+def build_windows(start: datetime, end: datetime, days: int) -> List[dict]:
+    """Return contexts for consecutive `days`-long windows covering start..end."""
+    windows = []
+    step = timedelta(days=days)
+    window_start = start
+    while window_start < end:
+        window_end = window_start + step
+        windows.append(
+            {
+                WINDOW_START: format_datetime(window_start),
+                WINDOW_END: format_datetime(window_end),
+            }
+        )
+        window_start = window_end
+    return windows
+
+
+def advance_watermark(stream_state: dict, watermark: str) -> str:
+    """Fold completed windows following `watermark` into it.
+
+    The partition state of every window absorbed into the watermark is dropped,
+    so the state only ever holds the windows which are still open.
+    """
+    partitions = stream_state.get("partitions", [])
+    completed = {
+        partition["context"][WINDOW_START]: partition
+        for partition in partitions
+        if partition.get(WINDOW_COMPLETE) and WINDOW_START in partition["context"]
+    }
+    while watermark in completed:
+        partition = completed.pop(watermark)
+        partitions.remove(partition)
+        watermark = partition["context"][WINDOW_END]
+    stream_state[WINDOW_WATERMARK] = watermark
+    return watermark
@@ -0,0 +1,51 @@
+"""Column projection through CIN7's `fields` parameter.
+
+CIN7 only accepts top-level field names in `fields` and always returns nested
+objects and arrays whole, so a top-level property is requested whenever it, or
+any property nested below it, is selected in the catalog.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Breadcrumb = Tuple[str, ...]
+
+
+def is_selected(metadata: object) -> bool:
+    """Return True if a catalog metadata entry is selected."""
+    inclusion = getattr(metadata, "inclusion", None)
+    if inclusion == "unsupported":
+        return False
+    if inclusion == "automatic":
+        return True
+    selected = getattr(metadata, "selected", None)
+    if selected is not None:
+        return bool(selected)
+    return getattr(metadata, "selected_by_default", None) is not False
+
+
+def selected_fields(
+    schema: dict,
+    selection: Dict[Breadcrumb, bool],
+    always_include: Iterable[str] = (),
+) -> Optional[List[str]]:
+    """Return the top-level fields to request, or None to request everything.
+
+    `selection` maps catalog breadcrumbs to whether they are selected; any
+    property without an entry is treated as selected.
+    """
+    properties = list(schema.get("properties", {}))
+    fields = []
+    for name in properties:
+        breadcrumb = ("properties", name)
+        if selection.get(breadcrumb, True) or any(
+            selected
+            for nested, selected in selection.items()
+            if len(nested) > 2 and nested[:2] == breadcrumb
+        ):
+            fields.append(name)
+    for name in always_include:
+        if name not in fields:
+            fields.append(name)
+    if set(fields) >= set(properties):
+        return None
+    return fields
@@ -0,0 +1,190 @@
+"""Client-side rate limiting for the CIN7 API.
+
+CIN7 enforces per-account quotas (by default 3 calls per second and 60 calls per
+minute). Rather than pausing for a fixed interval after every response, requests
+reserve a slot from a set of token buckets shared by every stream that uses the
+same API account, so that requests are spaced by the time they are *sent* and
+no stream ever sleeps longer than the quota requires.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+DEFAULT_BURST = 3
+DEFAULT_PER_SECOND = 3.0
+DEFAULT_PER_MINUTE = 60.0
+
+# Lower bound for the adaptive slow-down, as a fraction of the configured rates.
+MIN_RATE_SCALE = 0.1
+# Fraction of the configured rate recovered after each successful response.
+RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """A token bucket which hands out tokens at (possibly future) send times.
+
+    The bucket is not thread-safe on its own; `RateLimiter` serialises access.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """Create a full bucket refilling at `rate` tokens per second."""
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = now
+
+    def _tokens_at(self, when: float) -> float:
+        if when <= self._updated:
+            return self._tokens
+        return min(self.capacity, self._tokens + (when - self._updated) * self.rate)
+
+    def available_at(self, now: float) -> float:
+        """Return the earliest time at or after `now` when a token is free."""
+        when = max(now, self._updated)
+        tokens = self._tokens_at(when)
+        if tokens >= 1:
+            return when
+        return when + (1 - tokens) / self.rate
+
+    def consume(self, when: float) -> None:
+        """Take one token at time `when` (which must be `available_at`)."""
+        self._tokens = self._tokens_at(when) - 1
+        self._updated = max(when, self._updated)
+
+    def set_rate(self, rate: float, now: float) -> None:
+        """Change the refill rate without losing already accrued tokens."""
+        if now > self._updated:
+            self._tokens = self._tokens_at(now)
+            self._updated = now
+        self.rate = rate
+
+    def pause_until(self, when: float) -> None:
+        """Hand out no tokens before `when`, then allow a single request."""
+        if when > self._updated:
+            self._tokens = min(self._tokens_at(when), 1.0)
+            self._updated = when
+
+
+class RateLimiter:
+    """A set of token buckets sharing one CIN7 account's request budget.
+
+    The per-second bucket allows short bursts of `burst` requests. The
+    per-minute bucket refills at `(per_minute - burst) / 60` so that no sliding
+    one-minute window ever sees more than `per_minute` requests.
+
+    When CIN7 answers with HTTP 429 the limiter halves its rates (down to
+    `MIN_RATE_SCALE` of the configured values) and honours any `Retry-After`
+    delay; successful responses slowly restore the configured rates.
+    """
+
+    def __init__(
+        self,
+        burst: int = DEFAULT_BURST,
+        per_second: float = DEFAULT_PER_SECOND,
+        per_minute: Optional[float] = DEFAULT_PER_MINUTE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a limiter with the given burst size and budgets."""
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._scale = 1.0
+        now = clock()
+        self._base_rates: List[float] = [float(per_second)]
+        self._buckets: List[TokenBucket] = [TokenBucket(per_second, burst, now)]
+        if per_minute:
+            minute_rate = max(per_minute - burst, 1.0) / 60.0
+            self._base_rates.append(minute_rate)
+            self._buckets.append(TokenBucket(minute_rate, burst, now))
+
+    @property
+    def scale(self) -> float:
+        """Return the current fraction of the configured rates in use."""
+        return self._scale
+
+    def reserve(self) -> float:
+        """Reserve the next request slot and return the seconds to wait for it."""
+        with self._lock:
+            now = self._clock()
+            when = max(bucket.available_at(now) for bucket in self._buckets)
+            for bucket in self._buckets:
+                bucket.consume(when)
+            return max(when - now, 0.0)
+
+    def delay(self) -> float:
+        """Return the seconds until a request slot is free, without taking it."""
+        with self._lock:
+            now = self._clock()
+            when = max(bucket.available_at(now) for bucket in self._buckets)
+            return max(when - now, 0.0)
+
+    def acquire(self) -> float:
+        """Block until a request may be sent and return the time spent waiting."""
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def _rescale(self, scale: float, now: float) -> None:
+        self._scale = scale
+        for bucket, base_rate in zip(self._buckets, self._base_rates):
+            bucket.set_rate(base_rate * scale, now)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """Slow down after CIN7 rejected a request for exceeding the quota."""
+        with self._lock:
+            now = self._clock()
+            self._rescale(max(self._scale / 2, MIN_RATE_SCALE), now)
+            if retry_after:
+                for bucket in self._buckets:
+                    bucket.pause_until(now + retry_after)
+
+    def succeeded(self) -> None:
+        """Recover part of the configured rate after a successful response."""
+        if self._scale >= 1.0:
+            return
+        with self._lock:
+            self._rescale(min(self._scale + RECOVERY_STEP, 1.0), self._clock())
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds described by a `Retry-After` header."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(
+    limiters: Dict[Optional[str], RateLimiter],
+    account: Optional[str],
+    config: Mapping[str, Any],
+) -> RateLimiter:
+    """Return the account's limiter in `limiters`, creating it on first use."""
+    with _LIMITERS_LOCK:
+        limiter = limiters.get(account)
+        if limiter is None:
+            limiter = RateLimiter(
+                burst=config.get("rate_limit_burst", DEFAULT_BURST),
+                per_second=config.get("rate_limit_per_second", DEFAULT_PER_SECOND),
+                per_minute=config.get("rate_limit_per_minute", DEFAULT_PER_MINUTE),
+            )
+            limiters[account] = limiter
+        return limiter
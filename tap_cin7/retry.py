@@ -0,0 +1,187 @@
+"""Retry budgeting and circuit breaking for CIN7 API requests.
+
+Errors fall into three classes. Permanent errors (most 4xx responses) fail the
+sync straight away. Throttled requests (HTTP 429) are retried once the rate
+limiter has honoured `Retry-After`. Transient errors (5xx responses, timeouts and
+dropped connections) are retried with jittered exponential backoff.
+
+Every retry spends from a budget shared by the whole run, and repeated transient
+failures open a circuit breaker that pauses all streams of the account at once
+instead of letting each of them keep hammering an API that is down.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import singer
+
+LOGGER = singer.get_logger()
+
+DEFAULT_RETRY_BUDGET = 100
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30.0
+MAX_COOLDOWN = 300.0
+# How often requests held back by a half-open breaker check on the probe.
+PROBE_POLL_INTERVAL = 1.0
+
+# The states of a circuit breaker.
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class RetryBudget:
+    """A number of retries shared by every request of a run."""
+
+    def __init__(self, retries: int = DEFAULT_RETRY_BUDGET) -> None:
+        """Create a budget allowing `retries` retries in total."""
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def spend(self) -> bool:
+        """Take one retry from the budget, returning False if none are left."""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class CircuitBreaker:
+    """Pause every request to an account after repeated transient failures.
+
+    After `failure_threshold` consecutive failures the breaker opens and all
+    requests wait for `cooldown` seconds. The breaker is then half-open: one
+    request is let through as a probe while the others keep waiting. If the
+    probe succeeds the breaker closes, and if it fails the breaker re-opens with
+    a doubled cooldown. A probe which never reports back is replaced by another
+    one after `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self._cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        # The end of the cooldown when open, or of the probe's turn when half-open.
+        self._open_until = 0.0
+
+    @property
+    def state(self) -> str:
+        """Return CLOSED, OPEN or HALF_OPEN."""
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while every request is being held back."""
+        return self._state == OPEN and self._clock() < self._open_until
+
+    def delay(self) -> float:
+        """Return the seconds to wait before sending a request, or 0 to send it.
+
+        Once the cooldown is over, the first caller gets 0 and sends the probe.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            now = self._clock()
+            if now < self._open_until:
+                if self._state == HALF_OPEN:
+                    # Check back soon, the probe may well be answered by then.
+                    return min(self._open_until - now, PROBE_POLL_INTERVAL)
+                return self._open_until - now
+            LOGGER.info("Letting one request through to check whether CIN7 is back")
+            self._state = HALF_OPEN
+            self._open_until = now + self.base_cooldown
+            return 0.0
+
+    def wait(self) -> float:
+        """Block while the breaker holds requests back; return the time waited."""
+        waited = 0.0
+        while True:
+            remaining = self.delay()
+            if remaining <= 0:
+                return waited
+            self._sleep(remaining)
+            waited += remaining
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._cooldown = self.base_cooldown
+            self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the breaker past the threshold."""
+        with self._lock:
+            if self._state == OPEN:
+                # A request sent before the breaker opened.
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures < self.failure_threshold:
+                return
+            if self._state == HALF_OPEN:
+                LOGGER.warning(
+                    "CIN7 is still failing, pausing all requests for %.0fs",
+                    self._cooldown,
+                )
+            else:
+                LOGGER.warning(
+                    "CIN7 failed %d requests in a row, pausing all requests for %.0fs",
+                    self._failures,
+                    self._cooldown,
+                )
+            self._state = OPEN
+            self._failures = 0
+            self._open_until = self._clock() + self._cooldown
+            self._cooldown = min(self._cooldown * 2, MAX_COOLDOWN)
+
+
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_retry_budget(
+    budgets: Dict[Optional[str], RetryBudget],
+    account: Optional[str],
+    config: Mapping[str, Any],
+) -> RetryBudget:
+    """Return the account's budget in `budgets`, creating it on first use."""
+    with _REGISTRY_LOCK:
+        budget = budgets.get(account)
+        if budget is None:
+            budget = RetryBudget(config.get("retry_budget", DEFAULT_RETRY_BUDGET))
+            budgets[account] = budget
+        return budget
+
+
+def get_circuit_breaker(
+    breakers: Dict[Optional[str], CircuitBreaker],
+    account: Optional[str],
+    config: Mapping[str, Any],
+) -> CircuitBreaker:
+    """Return the account's breaker in `breakers`, creating it on first use."""
+    with _REGISTRY_LOCK:
+        breaker = breakers.get(account)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=config.get(
+                    "circuit_breaker_threshold", DEFAULT_FAILURE_THRESHOLD
+                ),
+                cooldown=config.get("circuit_breaker_cooldown", DEFAULT_COOLDOWN),
+            )
+            breakers[account] = breaker
+        return breaker
@@ -0,0 +1,166 @@
+"""Stream scheduling from the statistics of earlier runs.
+
+After every successful run, the duration, request count and record count of
+each synced stream are kept in a small JSON sidecar file. On the next
+concurrent run, the streams expected to take longest are started first, and
+the account's request budget is shared between the streams in proportion to
+the number of requests they are expected to make, so that the long streams are
+not held back by the short ones and all streams finish close together.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+import singer
+
+from tap_cin7.rate_limit import RateLimiter
+from tap_cin7.telemetry import Metrics
+
+LOGGER = singer.get_logger()
+
+# Weight of the latest run in the smoothed statistics.
+SMOOTHING = 0.5
+STATISTICS = ("seconds", "requests", "records")
+
+T = TypeVar("T")
+
+
+class RunHistory:
+    """Smoothed per-stream statistics of earlier runs, kept in a JSON file."""
+
+    def __init__(self, path: str) -> None:
+        """Load the statistics from `path`, starting empty if it does not exist."""
+        self.path = path
+        self.streams: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(path) as history_file:
+                self.streams = json.load(history_file).get("streams", {})
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable run statistics in '%s'", path)
+
+    def expected(self, stream: str, statistic: str) -> Optional[float]:
+        """Return the smoothed value of a statistic, or None for a new stream."""
+        return self.streams.get(stream, {}).get(statistic)
+
+    def longest_first(self, items: Sequence[T], key: Callable[[T], str]) -> List[T]:
+        """Order items by the expected duration of their stream, longest first.
+
+        Streams without statistics go first, in their original order, since
+        they may well be the longest.
+        """
+
+        def sort_key(item: T) -> float:
+            seconds = self.expected(key(item), "seconds")
+            return -seconds if seconds is not None else float("-inf")
+
+        return sorted(items, key=sort_key)
+
+    def weights(self, streams: Sequence[str]) -> Dict[str, float]:
+        """Return each stream's expected share of the requests.
+
+        Streams without statistics get the average weight of the others.
+        """
+        known: Dict[str, float] = {}
+        for stream in streams:
+            requests = self.expected(stream, "requests")
+            if requests:
+                known[stream] = requests
+        default = sum(known.values()) / len(known) if known else 1.0
+        return {stream: known.get(stream) or default for stream in streams}
+
+    def update(self, stream: str, metrics: Metrics) -> None:
+        """Fold the metrics of this run into the stream's statistics."""
+        current = {
+            "seconds": metrics.elapsed,
+            "requests": metrics.values["requests"],
+            "records": metrics.values["records"],
+        }
+        previous = self.streams.get(stream)
+        if previous is not None:
+            current = {
+                name: SMOOTHING * current[name]
+                + (1 - SMOOTHING) * previous.get(name, current[name])
+                for name in STATISTICS
+            }
+        current["runs"] = (previous or {}).get("runs", 0) + 1
+        self.streams[stream] = current
+
+    def save(self) -> None:
+        """Write the statistics back, replacing the file atomically."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as history_file:
+            json.dump({"streams": self.streams}, history_file, indent=2)
+        os.replace(temporary, self.path)
+
+
+class FairShare:
+    """Share rate limited request slots between streams by weight.
+
+    Instead of serving streams in the order they ask, each free slot goes to
+    the waiting stream that has used the smallest share of its weight so far
+    (stride scheduling). Slots are never left unused: a stream with nothing in
+    flight does not hold back the others.
+    """
+
+    def __init__(self, weights: Dict[str, float]) -> None:
+        """Create a scheduler with the given relative stream weights."""
+        self.weights = weights
+        self._condition = threading.Condition()
+        self._passes: Dict[str, float] = {}
+        self._waiting: Dict[str, int] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    def _weight(self, stream: str) -> float:
+        return max(self.weights.get(stream, 1.0), 1e-9)
+
+    def _enter(self, stream: str, limiter: RateLimiter) -> None:
+        if not self._waiting.get(stream):
+            # A stream returning from idle starts level with the waiting ones
+            # rather than claiming the slots it did not use.
+            waiting = [self._passes[s] for s in self._waiting if self._waiting[s]]
+            floor = min(waiting) if waiting else 0.0
+            self._passes[stream] = max(self._passes.get(stream, 0.0), floor)
+        self._waiting[stream] = self._waiting.get(stream, 0) + 1
+        self._limiters[stream] = limiter
+
+    def _is_next(self, stream: str, limiter: RateLimiter) -> bool:
+        contenders = [
+            s
+            for s, count in self._waiting.items()
+            if count and self._limiters[s] is limiter
+        ]
+        return min(contenders, key=lambda s: self._passes[s]) == stream
+
+    def acquire(self, stream: str, limiter: RateLimiter) -> float:
+        """Block until the stream may send a request, returning the time waited."""
+        started = time.monotonic()
+        with self._condition:
+            self._enter(stream, limiter)
+            self._condition.notify_all()
+            try:
+                while True:
+                    if self._is_next(stream, limiter):
+                        delay = limiter.delay()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+                wait = limiter.reserve()
+                self._passes[stream] += 1 / self._weight(stream)
+            finally:
+                self._waiting[stream] -= 1
+                self._condition.notify_all()
+        if wait > 0:
+            time.sleep(wait)
+        return time.monotonic() - started
+
+    def shares(self) -> Dict[str, float]:
+        """Return each stream's fraction of the total weight."""
+        total = sum(self.weights.values()) or 1.0
+        return {stream: weight / total for stream, weight in self.weights.items()}
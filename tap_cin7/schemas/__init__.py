@@ -0,0 +1,55 @@
+"""JSON schemas of the CIN7 streams, loaded the first time they are needed.
+
+Stream classes declare their schema with `schema_file`, so importing the tap
+reads no schema at all, and a run only loads the schemas of the streams it
+builds:
+
+    class VoucherStream(CIN7Stream):
+        schema = schema_file("voucher.json")
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, cast
+
+SCHEMAS_DIR = Path(__file__).parent
+
+
+class LazySchema:
+    """A stream class's `schema`, built on first access and kept per class.
+
+    `build` receives the stream class, so that subclasses can derive their
+    schema from their own attributes. A stream with a `_schema` of its own, such
+    as a copy extended with extra properties, gets that one instead.
+    """
+
+    def __init__(self, build: Callable[[type], dict]) -> None:
+        """Create the attribute from the function building the schema."""
+        self._build = build
+        self._schemas: Dict[type, dict] = {}
+
+    def __get__(self, instance: Any, owner: type) -> dict:
+        if instance is not None and "_schema" in vars(instance):
+            return instance._schema
+        schema = self._schemas.get(owner)
+        if schema is None:
+            schema = self._schemas[owner] = self._build(owner)
+        return schema
+
+
+def load_schema(name: str) -> dict:
+    """Return the schema stored in the named file of this package."""
+    return json.loads((SCHEMAS_DIR / name).read_text())
+
+
+def lazy_schema(build: Callable[[Any], dict]) -> dict:
+    """Return a `schema` attribute built by `build` from the stream class.
+
+    It is typed as the dict it evaluates to, like the SDK's `schema` property.
+    """
+    return cast(dict, LazySchema(build))
+
+
+def schema_file(name: str) -> dict:
+    """Return a `schema` attribute loading the named file of this package."""
+    return lazy_schema(lambda stream_type: load_schema(name))
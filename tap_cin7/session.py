@@ -0,0 +1,125 @@
+"""Pooled, keep-alive HTTP sessions shared by every stream of an API account."""
+
+import socket
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 300.0
+MIN_POOL_SIZE = 10
+
+try:
+    import brotli  # noqa: F401
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import brotlicffi  # noqa: F401
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+    else:
+        ACCEPT_ENCODING = "gzip, br"
+else:
+    ACCEPT_ENCODING = "gzip, br"
+
+
+def _keepalive_options() -> List[Tuple[int, int, Union[int, bytes]]]:
+    options: List[Tuple[int, int, Union[int, bytes]]] = [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    # Probe idle connections well before load balancers drop them.
+    for name, value in (
+        ("TCP_KEEPIDLE", 60),
+        ("TCP_KEEPINTVL", 15),
+        ("TCP_KEEPCNT", 4),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class CIN7Adapter(HTTPAdapter):
+    """An adapter with TCP keep-alive and fixed connect and read timeouts."""
+
+    def __init__(
+        self, pool_size: int, timeout: Tuple[float, float], **kwargs: Any
+    ) -> None:
+        """Create an adapter keeping up to `pool_size` connections open."""
+        self.timeout = timeout
+        super().__init__(pool_connections=1, pool_maxsize=pool_size, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """Create the pool manager with keep-alive socket options."""
+        kwargs["socket_options"] = (
+            HTTPConnection.default_socket_options + _keepalive_options()
+        )
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Union[None, float, Tuple[float, float], Tuple[float, None]] = None,
+        verify: Union[bool, str] = True,
+        cert: Union[
+            None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]
+        ] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> requests.Response:
+        """Send a request with the configured timeouts, ignoring `timeout`."""
+        return super().send(
+            request,
+            stream=stream,
+            timeout=self.timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+
+def pool_size(config: Mapping[str, Any]) -> int:
+    """Return the number of connections needed by the configured concurrency."""
+    if config.get("pool_size"):
+        return config["pool_size"]
+    concurrent_requests = (
+        max(config.get("max_workers", 1), 1)
+        * max(config.get("partition_workers", 1), 1)
+        * max(config.get("prefetch_pages", 1), 1)
+    )
+    return max(concurrent_requests, MIN_POOL_SIZE)
+
+
+def build_session(config: Mapping[str, Any]) -> requests.Session:
+    """Return a new session configured from the tap config."""
+    session = requests.Session()
+    adapter = CIN7Adapter(
+        pool_size(config),
+        timeout=(
+            config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+            config.get("read_timeout", DEFAULT_READ_TIMEOUT),
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.stream = bool(config.get("streaming_decode"))
+    return session
+
+
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(
+    sessions: Dict[Optional[str], requests.Session],
+    account: Optional[str],
+    config: Mapping[str, Any],
+) -> requests.Session:
+    """Return the account's session in `sessions`, creating it on first use."""
+    with _SESSIONS_LOCK:
+        session = sessions.get(account)
+        if session is None:
+            session = build_session(config)
+            sessions[account] = session
+        return session
@@ -0,0 +1,55 @@
+"""Concurrent sync engine for TapCIN7."""
+
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import List
+
+import singer
+
+from tap_cin7.client import CIN7Stream
+from tap_cin7.output import SharedState, SyncStopped
+
+LOGGER = singer.get_logger()
+
+
+class ConcurrentSync:
+    """Sync independent streams on a bounded pool of worker threads.
+
+    All workers share the per-account rate limiters, and all output goes
+    through the serialized writer in `tap_cin7.output`.
+    """
+
+    def __init__(self, tap_state: dict, max_workers: int) -> None:
+        """Create an engine writing to the given tap state."""
+        self.shared_state = SharedState(tap_state)
+        self.max_workers = max_workers
+
+    def _sync_stream(self, stream: CIN7Stream) -> None:
+        stream.use_shared_state(self.shared_state)
+        LOGGER.info("Starting concurrent sync of stream '%s'", stream.qualified_name)
+        stream.sync()
+        stream.finalize_state_progress_markers()
+        stream._write_state_message(final=True)
+
+    def run(self, streams: List[CIN7Stream]) -> None:
+        """Sync the given streams, stopping them all at the first failure.
+
+        Streams that have not started are cancelled, and running streams stop
+        before their next page, so the failure is raised without waiting for
+        the other streams to finish.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="tap-cin7"
+        ) as pool:
+            futures = [pool.submit(self._sync_stream, stream) for stream in streams]
+            try:
+                wait(futures, return_when=FIRST_EXCEPTION)
+            finally:
+                self.shared_state.stop()
+                for future in futures:
+                    future.cancel()
+        for future in futures:
+            if future.cancelled():
+                continue
+            exc = future.exception()
+            if exc is not None and not isinstance(exc, SyncStopped):
+                raise exc
@@ -1,21 +1,40 @@
 """CIN7 tap class."""
 
-from typing import List
+import copy
+from itertools import chain, zip_longest
+from typing import Any, Dict, List, Optional, Type, cast
 
+import requests
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th
+from singer_sdk.helpers._singer import Catalog
+from singer_sdk.helpers._state import reset_state_progress_markers
 
+from tap_cin7.accounts import TENANTS, get_accounts
+from tap_cin7.batch import FORMATS
+from tap_cin7.client import CIN7Stream
+from tap_cin7.output import SINGER_WRITER, WRITERS, configure_output, flush_output
+from tap_cin7.rate_limit import RateLimiter
+from tap_cin7.retry import CircuitBreaker, RetryBudget
+from tap_cin7.scheduling import FairShare, RunHistory
 from tap_cin7.streams import (
+    BomComponentsStream,
+    BomMastersStream,
     BranchesStream,
     ContactsStream,
+    ContactsSuppliersStream,
     OrderStream,
+    ProductOptionsStream,
     ProductStream,
+    PurchaseOrderLineItemsStream,
     PurchaseOrdersStream,
+    SaleOrderLineItemsStream,
     StockStream,
     VoucherStream,
-    ContactsSuppliersStream,
-    BomMastersStream
 )
+from tap_cin7.sync import ConcurrentSync
+from tap_cin7.telemetry import TELEMETRY
+from tap_cin7.transport import REQUESTS, TRANSPORTS, close_transport
 
 STREAM_TYPES = [
     ProductStream,
@@ -26,7 +45,14 @@ STREAM_TYPES = [
     ContactsStream,
     BranchesStream,
     ContactsSuppliersStream,
-    BomMastersStream
+    BomMastersStream,
+]
+# Streams of the arrays nested in other streams' records, discovered on request.
+CHILD_STREAM_TYPES = [
+    SaleOrderLineItemsStream,
+    PurchaseOrderLineItemsStream,
+    ProductOptionsStream,
+    BomComponentsStream,
 ]
 
 
@@ -36,20 +62,464 @@ class TapCIN7(Tap):
     name = "tap-cin7"
 
     config_jsonschema = th.PropertiesList(
-        th.Property("api_key", th.StringType, required=True, description="api_key"),
+        th.Property("api_key", th.StringType, description="api_key"),
+        th.Property("api_password", th.StringType, description="api_password"),
         th.Property(
-            "api_password", th.StringType, required=True, description="api_password"
+            "accounts",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property("tenant", th.StringType, required=True),
+                    th.Property("api_key", th.StringType, required=True),
+                    th.Property("api_password", th.StringType, required=True),
+                    th.Property("api_url", th.StringType),
+                )
+            ),
+            description="CIN7 accounts to sync instead of api_key and api_password, "
+            "each labelled with a tenant written into every record",
         ),
         th.Property(
             "start_date",
             th.DateTimeType,
             description="The earliest record date to sync",
         ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            default="https://api.cin7.com/api",
+            description="Base URL of the CIN7 API",
+        ),
+        th.Property(
+            "rate_limit_burst",
+            th.IntegerType,
+            default=3,
+            description="Maximum number of requests sent back-to-back",
+        ),
+        th.Property(
+            "rate_limit_per_second",
+            th.NumberType,
+            default=3,
+            description="Maximum requests per second for the API account",
+        ),
+        th.Property(
+            "rate_limit_per_minute",
+            th.NumberType,
+            default=60,
+            description="Maximum requests per minute for the API account",
+        ),
+        th.Property(
+            "max_workers",
+            th.IntegerType,
+            default=1,
+            description="Number of streams to sync concurrently",
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType,
+            default=1,
+            description="Number of pages of a stream to request ahead",
+        ),
+        th.Property(
+            "streaming_decode",
+            th.BooleanType,
+            default=False,
+            description="Decode records incrementally while the page downloads",
+        ),
+        th.Property(
+            "trim_short_scans",
+            th.BooleanType,
+            default=False,
+            description="Find the last page of scans shorter than prefetch_pages "
+            "with single-record probes, so no empty pages are fetched ahead of "
+            "their end",
+        ),
+        th.Property(
+            "transport",
+            th.CustomType({"type": "string", "enum": list(TRANSPORTS)}),
+            default=REQUESTS,
+            description="'asyncio' to send page requests from one event loop with "
+            "httpx, 'requests' to send them from the streams' threads",
+        ),
+        th.Property(
+            "window_days",
+            th.IntegerType,
+            description="Split incremental syncs into modifiedDate windows of this "
+            "many days",
+        ),
+        th.Property(
+            "partition_workers",
+            th.IntegerType,
+            default=1,
+            description="Number of partitions of a stream to fetch concurrently",
+        ),
+        th.Property(
+            "checkpoint_pages",
+            th.IntegerType,
+            default=0,
+            description="Write a resumable page checkpoint every this many pages",
+        ),
+        th.Property(
+            "server_side_ordering",
+            th.BooleanType,
+            default=True,
+            description="Request records ordered by modifiedDate where supported",
+        ),
+        th.Property(
+            "field_projection",
+            th.BooleanType,
+            default=True,
+            description="Only request the fields selected in the catalog",
+        ),
+        th.Property(
+            "pool_size",
+            th.IntegerType,
+            description="Number of HTTP connections kept open per API account "
+            "(defaults to the configured concurrency)",
+        ),
+        th.Property(
+            "connect_timeout",
+            th.NumberType,
+            default=10,
+            description="Seconds to wait when opening a connection to CIN7",
+        ),
+        th.Property(
+            "read_timeout",
+            th.NumberType,
+            default=300,
+            description="Seconds to wait for CIN7 to send response data",
+        ),
+        th.Property(
+            "page_size",
+            th.IntegerType,
+            default=250,
+            description="Rows requested per page, at most 250",
+        ),
+        th.Property(
+            "stream_page_sizes",
+            th.CustomType({"type": "object"}),
+            description="Rows requested per page for individual streams, "
+            "keyed by stream name",
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            default=False,
+            description="Shrink pages that are slow, large or time out, and grow "
+            "them back when pages are light",
+        ),
+        th.Property(
+            "max_page_bytes",
+            th.IntegerType,
+            default=4194304,
+            description="Response size above which adaptive paging shrinks pages",
+        ),
+        th.Property(
+            "max_retries",
+            th.IntegerType,
+            default=5,
+            description="Maximum attempts for a request failing with a "
+            "transient error",
+        ),
+        th.Property(
+            "max_retry_time",
+            th.NumberType,
+            default=300,
+            description="Maximum seconds spent retrying a single request",
+        ),
+        th.Property(
+            "retry_budget",
+            th.IntegerType,
+            default=100,
+            description="Maximum retries across all requests of a run",
+        ),
+        th.Property(
+            "circuit_breaker_threshold",
+            th.IntegerType,
+            default=5,
+            description="Consecutive server failures that pause all requests",
+        ),
+        th.Property(
+            "circuit_breaker_cooldown",
+            th.NumberType,
+            default=30,
+            description="Seconds to pause all requests once CIN7 looks down",
+        ),
+        th.Property(
+            "child_streams",
+            th.BooleanType,
+            default=False,
+            description="Discover streams of sales and purchase order line items, "
+            "product options and BOM components, synced from their parents' pages",
+        ),
+        th.Property(
+            "validate_records",
+            th.BooleanType,
+            default=False,
+            description="Log a warning for each record field whose type does not "
+            "match the stream's schema",
+        ),
+        th.Property(
+            "change_detection_path",
+            th.StringType,
+            description="SQLite file of record hashes used to skip unchanged "
+            "voucher and branch records",
+        ),
+        th.Property(
+            "emit_deletes",
+            th.BooleanType,
+            default=False,
+            description="Emit records missing from full-table streams as deleted",
+        ),
+        th.Property(
+            "delete_scan_streams",
+            th.ArrayType(th.StringType),
+            default=[],
+            description="Streams whose deleted records are detected by listing "
+            "all of their ids after each sync",
+        ),
+        th.Property(
+            "delete_scan_path",
+            th.StringType,
+            description="SQLite file keeping the ids listed by delete scans",
+        ),
+        th.Property(
+            "batch_format",
+            th.CustomType({"type": "string", "enum": [*FORMATS, None]}),
+            description="Write records to gzip JSONL or Parquet batch files "
+            "announced by BATCH messages instead of RECORD messages",
+        ),
+        th.Property(
+            "batch_directory",
+            th.StringType,
+            default="output",
+            description="Directory the batch files are written to",
+        ),
+        th.Property(
+            "batch_max_records",
+            th.IntegerType,
+            default=100000,
+            description="Maximum number of records in a batch file",
+        ),
+        th.Property(
+            "batch_max_bytes",
+            th.IntegerType,
+            default=134217728,
+            description="Compressed size after which a JSONL batch file is "
+            "rotated, or JSON size of the rows buffered for a Parquet file",
+        ),
+        th.Property(
+            "message_writer",
+            th.CustomType({"type": "string", "enum": list(WRITERS)}),
+            default=SINGER_WRITER,
+            description="'fast' to encode messages with orjson and write them to "
+            "stdout in large chunks, 'singer' to write them one line at a time",
+        ),
+        th.Property(
+            "output_buffer_size",
+            th.IntegerType,
+            default=1048576,
+            description="Bytes of messages the fast writer buffers before writing",
+        ),
+        th.Property(
+            "output_flush_interval",
+            th.NumberType,
+            default=1,
+            description="Maximum seconds the fast writer holds buffered messages",
+        ),
+        th.Property(
+            "metrics_summary_path",
+            th.StringType,
+            description="File to write a JSON summary of per-stream metrics to",
+        ),
+        th.Property(
+            "metrics_prometheus_path",
+            th.StringType,
+            description="File to write per-stream metrics to in the Prometheus "
+            "text format",
+        ),
+        th.Property(
+            "run_stats_path",
+            th.StringType,
+            description="File keeping per-stream run statistics, used to start the "
+            "longest streams first and share requests by expected work",
+        ),
     ).to_dict()
+    # Credentials come either from api_key and api_password or from accounts.
+    config_jsonschema["anyOf"] = [
+        {"required": ["api_key", "api_password"]},
+        {"required": ["accounts"]},
+    ]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the tap.
+
+        Rate limiters, retry budgets, circuit breakers and sessions are shared
+        per account by the tap's streams, but never with another tap.
+        """
+        self.rate_limiters: Dict[Optional[str], RateLimiter] = {}
+        self.retry_budgets: Dict[Optional[str], RetryBudget] = {}
+        self.circuit_breakers: Dict[Optional[str], CircuitBreaker] = {}
+        self.sessions: Dict[Optional[str], requests.Session] = {}
+        super().__init__(*args, **kwargs)
 
     def discover_streams(self) -> List[Stream]:
-        """Return a list of discovered streams."""
-        return [stream_class(tap=self) for stream_class in STREAM_TYPES]
+        """Return a list of discovered streams.
+
+        With a catalog, only the streams it selects are built, along with the
+        streams their records are taken from.
+        """
+        stream_types = list(STREAM_TYPES)
+        if self.config.get("child_streams"):
+            stream_types += CHILD_STREAM_TYPES
+        if self.input_catalog is not None:
+            stream_types = self._catalog_stream_types(stream_types, self.input_catalog)
+        return [stream_class(tap=self) for stream_class in stream_types]
+
+    def _catalog_stream_types(
+        self, stream_types: List[Type[CIN7Stream]], catalog: Catalog
+    ) -> List[Type[CIN7Stream]]:
+        """Return the stream types the catalog needs, in the same order."""
+        needed = set()
+        for stream_type in stream_types:
+            entry = catalog.get_stream(stream_type.name)
+            # Streams missing from the catalog keep their default selection.
+            if entry is None or entry.metadata.resolve_selection().get((), True):
+                needed.add(stream_type.name)
+                if stream_type.fan_out_only and stream_type.fan_out_of:
+                    needed.add(stream_type.fan_out_of)
+        return [
+            stream_type for stream_type in stream_types if stream_type.name in needed
+        ]
+
+    @property
+    def _cin7_streams(self) -> Dict[str, CIN7Stream]:
+        """Return the tap's streams, which are all CIN7 streams."""
+        return cast(Dict[str, CIN7Stream], self.streams)
+
+    def _streams_to_sync(
+        self, available: Optional[Dict[str, CIN7Stream]] = None
+    ) -> List[CIN7Stream]:
+        """Return the streams to sync directly, attaching fanned-out streams."""
+        if available is None:
+            available = self._cin7_streams
+        streams: List[CIN7Stream] = []
+        for stream in available.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info(f"Skipping deselected stream '{stream.name}'.")
+                continue
+            if stream.parent_stream_type:
+                continue
+            source = available.get(stream.fan_out_of or "")
+            if source is not None and (source.selected or stream.fan_out_only):
+                source.add_fan_out_target(stream)
+                continue
+            streams.append(stream)
+        for stream in available.values():
+            if stream.fan_out_targets and stream not in streams:
+                streams.append(stream)
+        return streams
+
+    def _account_streams(self, account: Dict[str, str]) -> Dict[str, CIN7Stream]:
+        """Return a copy of every stream, syncing the given account."""
+        streams = {}
+        for name, stream in self._cin7_streams.items():
+            account_stream = type(stream)(tap=self, account=account)
+            if self.input_catalog is not None:
+                account_stream.apply_catalog(self.input_catalog)
+            streams[name] = account_stream
+        return streams
+
+    def _all_accounts_streams(self) -> List[CIN7Stream]:
+        """Return the streams to sync for every account, interleaving accounts."""
+        per_account = [
+            self._streams_to_sync(self._account_streams(account))
+            for account in get_accounts(self.config)
+        ]
+        interleaved = chain.from_iterable(zip_longest(*per_account))
+        return [stream for stream in interleaved if stream is not None]
+
+    def load_state(self, state: dict) -> None:
+        """Load the state, including the bookmarks of every tenant."""
+        super().load_state(state)
+        for tenant, bookmarks in state.get(TENANTS, {}).items():
+            self.state.setdefault(TENANTS, {})[tenant] = copy.deepcopy(bookmarks)
+
+    def _reset_state_progress_markers(self) -> None:
+        """Clear prior jobs' progress markers, including those of every tenant."""
+        super()._reset_state_progress_markers()
+        for state in self.state.get(TENANTS, {}).values():
+            for stream_state in state.get("bookmarks", {}).values():
+                reset_state_progress_markers(stream_state)
+                for partition_state in stream_state.get("partitions", []):
+                    reset_state_progress_markers(partition_state)
+
+    # The SDK marks `sync_all` final, but its loop can neither sync streams
+    # concurrently nor sync several accounts.
+    def sync_all(self) -> None:  # type: ignore[misc]
+        """Sync all streams, concurrently when `max_workers` is above one."""
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        # Retry budgets and circuit breakers last for one run.
+        self.retry_budgets.clear()
+        self.circuit_breakers.clear()
+        if get_accounts(self.config):
+            streams = self._all_accounts_streams()
+        else:
+            streams = self._streams_to_sync()
+        configure_output(self.config)
+        history = None
+        if self.config.get("run_stats_path"):
+            history = RunHistory(self.config["run_stats_path"])
+        try:
+            self._sync_streams(streams, history)
+            if history is not None:
+                for stream in streams:
+                    name = stream.qualified_name
+                    history.update(name, TELEMETRY.stream_totals(name))
+                history.save()
+        finally:
+            close_transport()
+            flush_output()
+            self._write_telemetry()
+
+    def _write_telemetry(self) -> None:
+        if self.config.get("metrics_summary_path"):
+            TELEMETRY.write_json(self.config["metrics_summary_path"])
+        if self.config.get("metrics_prometheus_path"):
+            TELEMETRY.write_prometheus(self.config["metrics_prometheus_path"])
+
+    def _schedule(
+        self, streams: List[CIN7Stream], history: RunHistory
+    ) -> List[CIN7Stream]:
+        """Order streams longest first and share requests by expected work."""
+        streams = history.longest_first(
+            streams, key=lambda stream: stream.qualified_name
+        )
+        fair_share = FairShare(
+            history.weights([stream.qualified_name for stream in streams])
+        )
+        for stream in streams:
+            stream.fair_share = fair_share
+        self.logger.info(
+            "Stream order and request shares: %s",
+            ", ".join(
+                f"{name} ({share:.0%})" for name, share in fair_share.shares().items()
+            ),
+        )
+        return streams
+
+    def _sync_streams(
+        self, streams: List[CIN7Stream], history: Optional[RunHistory] = None
+    ) -> None:
+        max_workers = self.config.get("max_workers", 1)
+        # Accounts always sync through the shared state, even on one worker.
+        if max_workers > 1 or get_accounts(self.config):
+            if history is not None:
+                streams = self._schedule(streams, history)
+            ConcurrentSync(self.state, max_workers).run(streams)
+            return
+        for stream in streams:
+            stream.sync()
+            stream.finalize_state_progress_markers()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+"""Per-stream performance telemetry.
+
+Every stream partition counts its requests, response bytes, retries and
+records, and times its requests, rate limit waits, response parsing and record
+output. The totals are logged as Singer METRIC lines when a partition or
+stream finishes, and can be written as a JSON summary or a Prometheus text
+dump at the end of the run.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import singer
+
+LOGGER = singer.get_logger()
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTERS = (
+    "requests",
+    "retries",
+    "throttled",
+    "server_errors",
+    "response_bytes",
+    "records",
+)
+TIMERS = (
+    "request_seconds",
+    "rate_limit_wait_seconds",
+    "parse_seconds",
+    "emit_seconds",
+)
+
+
+class Histogram:
+    """Counts of observed values falling into fixed buckets."""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Create an empty histogram with the given upper bucket bounds."""
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        """Add all observations of another histogram with the same buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Return the upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a summary of the histogram."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class Metrics:
+    """The counters and timings of one stream partition."""
+
+    def __init__(
+        self,
+        stream: str,
+        context: Optional[dict] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Create zeroed metrics, starting the partition's clock."""
+        self.stream = stream
+        self.context = context
+        self.values: Dict[str, float] = dict.fromkeys(COUNTERS + TIMERS, 0)
+        self.latency = Histogram()
+        self._clock = clock
+        self.started = clock()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, **values: float) -> None:
+        """Add to any of the counters and timers."""
+        with self._lock:
+            for name, value in values.items():
+                self.values[name] += value
+
+    def observe_request(self, seconds: float) -> None:
+        """Record the duration of a request."""
+        with self._lock:
+            self.values["requests"] += 1
+            self.values["request_seconds"] += seconds
+            self.latency.observe(seconds)
+
+    def finish(self) -> None:
+        """Stop the partition's clock."""
+        self.finished = self._clock()
+
+    @property
+    def elapsed(self) -> float:
+        """Return the wall time spent on the partition so far."""
+        return (self.finished or self._clock()) - self.started
+
+    def merge(self, other: "Metrics") -> None:
+        """Add the counters and timings of another partition."""
+        with self._lock:
+            for name, value in other.values.items():
+                self.values[name] += value
+            self.latency.merge(other.latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics, including derived rates."""
+        elapsed = self.elapsed
+        result: Dict[str, Any] = dict(self.values)
+        result["elapsed_seconds"] = elapsed
+        result["records_per_second"] = (
+            self.values["records"] / elapsed if elapsed else 0
+        )
+        result["request_latency"] = self.latency.as_dict()
+        return result
+
+    def log(self) -> None:
+        """Log the metrics as Singer METRIC lines."""
+        tags: Dict[str, Any] = {"endpoint": self.stream}
+        if self.context:
+            tags["context"] = self.context
+        summary = self.as_dict()
+        lines: List[Tuple[str, str, float]] = [
+            ("counter", name, summary[name]) for name in COUNTERS
+        ]
+        lines += [("timer", name, summary[name]) for name in TIMERS]
+        lines += [
+            ("timer", "request_seconds_p50", summary["request_latency"]["p50"]),
+            ("timer", "request_seconds_p95", summary["request_latency"]["p95"]),
+            ("timer", "elapsed_seconds", summary["elapsed_seconds"]),
+        ]
+        for metric_type, metric, value in lines:
+            LOGGER.info(
+                "METRIC: %s",
+                json.dumps(
+                    {
+                        "type": metric_type,
+                        "metric": metric,
+                        "value": value,
+                        "tags": tags,
+                    }
+                ),
+            )
+
+
+class Telemetry:
+    """The metrics of every stream partition synced in this run."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._metrics: Dict[Tuple[str, str], Metrics] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, stream: str, context: Optional[dict] = None) -> Metrics:
+        """Return the metrics of a stream partition, creating them on first use."""
+        key = (stream, json.dumps(context, sort_keys=True))
+        with self._lock:
+            metrics = self._metrics.get(key)
+            if metrics is None:
+                metrics = Metrics(stream, context)
+                self._metrics[key] = metrics
+            return metrics
+
+    def _partitions(self, stream: str) -> List[Metrics]:
+        with self._lock:
+            return [m for (name, _), m in self._metrics.items() if name == stream]
+
+    def stream_totals(self, stream: str) -> Metrics:
+        """Return the metrics of a stream summed over all of its partitions."""
+        partitions = self._partitions(stream)
+        totals = Metrics(stream)
+        if partitions:
+            totals.started = min(m.started for m in partitions)
+            if all(m.finished is not None for m in partitions):
+                totals.finished = max(m.finished or 0.0 for m in partitions)
+        for metrics in partitions:
+            totals.merge(metrics)
+        return totals
+
+    @property
+    def streams(self) -> List[str]:
+        """Return the names of the streams with metrics."""
+        with self._lock:
+            return sorted({name for name, _ in self._metrics})
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the metrics of every stream and its partitions."""
+        summary = {}
+        for stream in self.streams:
+            partitions = [m for m in self._partitions(stream) if m.context]
+            totals = self.stream_totals(stream).as_dict()
+            totals["partitions"] = [
+                dict(m.as_dict(), context=m.context) for m in partitions
+            ]
+            summary[stream] = totals
+        return {"streams": summary}
+
+    def write_json(self, path: str) -> None:
+        """Write the summary to a JSON file."""
+        with open(path, "w") as summary_file:
+            json.dump(self.summary(), summary_file, indent=2, default=str)
+
+    def prometheus_text(self) -> str:
+        """Return the stream totals in the Prometheus text exposition format."""
+        lines = []
+        totals = {stream: self.stream_totals(stream) for stream in self.streams}
+        for name in COUNTERS + TIMERS:
+            metric = f"tap_cin7_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for stream, metrics in totals.items():
+                lines.append(f'{metric}{{stream="{stream}"}} {metrics.values[name]}')
+        metric = "tap_cin7_request_duration_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for stream, metrics in totals.items():
+            histogram = metrics.latency
+            cumulative = 0
+            for bound, count in zip(
+                [*map(str, histogram.bounds), "+Inf"], histogram.counts
+            ):
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{stream="{stream}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{metric}_sum{{stream="{stream}"}} {histogram.sum}')
+            lines.append(f'{metric}_count{{stream="{stream}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the stream totals to a Prometheus text file."""
+        with open(path, "w") as metrics_file:
+            metrics_file.write(self.prometheus_text())
+
+
+TELEMETRY = Telemetry()
@@ -0,0 +1,202 @@
+"""Throughput benchmark of the tap against the offline CIN7 mock server.
+
+Every stream is synced on its own in a fresh process, so that its peak RSS and
+CPU time are not mixed up with those of the other streams:
+
+    python -m tap_cin7.tests.benchmark --records 5000 --latency 0.05
+    python -m tap_cin7.tests.benchmark --streams products sale_order --json
+
+Extra tap settings, such as `max_workers` or `prefetch_pages`, can be passed
+with `--config path/to/config.json` to compare them against the baseline.
+"""
+
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+RECORD_MESSAGE = re.compile(r'"type":\s*"RECORD"')
+
+BENCHMARK_CONFIG = {
+    "api_key": "benchmark",
+    "api_password": "benchmark",
+    "start_date": "2019-01-01T00:00:00Z",
+    # The mock server is not rate limited; measure the tap, not the limiter.
+    "rate_limit_burst": 100,
+    "rate_limit_per_second": 10000,
+    "rate_limit_per_minute": 600000,
+}
+
+
+class MessageCounter:
+    """A stand-in for stdout which counts the Singer messages written to it."""
+
+    def __init__(self) -> None:
+        """Create an empty counter."""
+        self.records = 0
+        self.bytes = 0
+
+    @property
+    def buffer(self) -> "MessageCounter":
+        """Accept binary writes as well."""
+        return self
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Count the records in a chunk of output."""
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        self.records += len(RECORD_MESSAGE.findall(data))
+        self.bytes += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing is buffered."""
+
+
+def _catalog(config: dict, stream_name: str) -> dict:
+    from tap_cin7.tap import TapCIN7
+
+    catalog = TapCIN7(config=config, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] == stream_name
+    return catalog
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _sync_stream(config: dict, stream_name: str, results: Any) -> None:
+    from tap_cin7.tap import TapCIN7
+
+    catalog = _catalog(config, stream_name)
+    counter = MessageCounter()
+    stdout, sys.stdout = sys.stdout, counter
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    try:
+        tap = TapCIN7(config=config, catalog=catalog, parse_env_config=False)
+        tap.sync_all()
+    finally:
+        sys.stdout = stdout
+    results.put(
+        {
+            "stream": stream_name,
+            "records": counter.records,
+            "output_mb": counter.bytes / (1024 * 1024),
+            "seconds": time.perf_counter() - wall_start,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+    )
+
+
+def benchmark_stream(
+    server: MockCIN7Server, config: dict, stream_name: str
+) -> Dict[str, Any]:
+    """Sync one stream in a child process and return its measurements."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    server.reset_stats()
+    process = context.Process(target=_sync_stream, args=(config, stream_name, results))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Syncing '{stream_name}' failed")
+    result = results.get()
+    seconds = result["seconds"] or float("nan")
+    result["requests"] = sum(server.requests.values())
+    result["throttled"] = server.responses[429]
+    result["server_errors"] = sum(
+        count for status, count in server.responses.items() if status >= 500
+    )
+    result["records_per_second"] = result["records"] / seconds
+    result["requests_per_second"] = result["requests"] / seconds
+    return result
+
+
+def run_benchmark(
+    stream_names: List[str], config: Optional[dict] = None, **server_options: Any
+) -> List[Dict[str, Any]]:
+    """Benchmark each stream against a freshly started mock server."""
+    with MockCIN7Server(**server_options) as server:
+        tap_config = dict(BENCHMARK_CONFIG, **(config or {}))
+        tap_config["api_url"] = server.url
+        return [benchmark_stream(server, tap_config, name) for name in stream_names]
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a plain text table."""
+    columns = [
+        ("stream", "{}"),
+        ("records", "{:d}"),
+        ("records_per_second", "{:.0f}"),
+        ("requests", "{:d}"),
+        ("requests_per_second", "{:.1f}"),
+        ("cpu_seconds", "{:.2f}"),
+        ("peak_rss_mb", "{:.1f}"),
+        ("seconds", "{:.2f}"),
+    ]
+    rows = [[name for name, _ in columns]]
+    for result in results:
+        rows.append(
+            [
+                "-" if result[name] is None else pattern.format(result[name])
+                for name, pattern in columns
+            ]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line."""
+    from tap_cin7.tap import STREAM_TYPES
+
+    stream_names = [stream_type.name for stream_type in STREAM_TYPES]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", nargs="+", default=stream_names)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--config", help="JSON file of extra tap settings")
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config) as config_file:
+            config = json.load(config_file)
+    results = run_benchmark(
+        args.streams,
+        config,
+        records=args.records,
+        seed=args.seed,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
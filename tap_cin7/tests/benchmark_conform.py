@@ -0,0 +1,76 @@
+"""Micro-benchmark of record conformance.
+
+Conforms the mock server's records for every endpoint with the SDK's generic,
+schema-walking helpers and with the stream's compiled conformer:
+
+    python -m tap_cin7.tests.benchmark_conform --records 20000
+"""
+
+import argparse
+import copy
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import conform_record_data_types
+
+from tap_cin7.conform import compile_conformer
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.benchmark import BENCHMARK_CONFIG
+from tap_cin7.tests.mock_server import ENDPOINTS, generate_records
+
+
+def _time_conformer(conform: Callable[[dict], Any], records: List[dict]) -> float:
+    records = copy.deepcopy(records)
+    start = time.perf_counter()
+    for record in records:
+        conform(record)
+    return time.perf_counter() - start
+
+
+def benchmark_stream(stream: Any, records: int) -> Dict[str, Any]:
+    """Return the records/sec of both conformers for one stream's records."""
+    rows = generate_records(stream.path, records)
+    logger = logging.getLogger("benchmark")
+
+    def sdk_conform(record: dict) -> dict:
+        pop_deselected_record_properties(record, stream.schema, stream.mask, logger)
+        return conform_record_data_types(stream.name, record, stream.schema, logger)
+
+    compiled = compile_conformer(stream.schema, stream.mask, stream.name)
+    sdk_seconds = _time_conformer(sdk_conform, rows)
+    compiled_seconds = _time_conformer(compiled, rows)
+    return {
+        "stream": stream.name,
+        "sdk_per_second": records / sdk_seconds,
+        "compiled_per_second": records / compiled_seconds,
+        "speedup": sdk_seconds / compiled_seconds,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    tap = TapCIN7(config=BENCHMARK_CONFIG, parse_env_config=False)
+    streams = {}
+    for stream in tap.streams.values():
+        # Benchmark each endpoint with the stream that owns it.
+        if stream.fan_out_of is None:
+            streams.setdefault(stream.path, stream)
+
+    print(f"{'stream':<20} {'sdk/s':>10} {'compiled/s':>11} {'speedup':>8}")
+    for path in ENDPOINTS:
+        result = benchmark_stream(streams[path], args.records)
+        print(
+            f"{result['stream']:<20} {result['sdk_per_second']:>10.0f} "
+            f"{result['compiled_per_second']:>11.0f} {result['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark of the Singer message writers.
+
+Serializes the mock server's records for every endpoint with the standard
+singer-python writer and with the fast buffered writer, writing to a sink that
+discards the output:
+
+    python -m tap_cin7.tests.benchmark_output --records 20000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+import singer
+
+from tap_cin7.output import BufferedWriter, SingerWriter
+from tap_cin7.tests.mock_server import ENDPOINTS, generate_records
+
+
+class NullOutput:
+    """A stand-in for stdout which discards everything written to it."""
+
+    @property
+    def buffer(self) -> "NullOutput":
+        """Accept binary writes as well."""
+        return self
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Discard a chunk of output."""
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing is buffered."""
+
+
+def _time_writer(
+    writer: Union[SingerWriter, BufferedWriter], messages: List[singer.Message]
+) -> float:
+    stdout, sys.stdout = sys.stdout, NullOutput()
+    try:
+        start = time.perf_counter()
+        for message in messages:
+            writer.write(message)
+        writer.flush()
+        return time.perf_counter() - start
+    finally:
+        sys.stdout = stdout
+
+
+def benchmark_endpoint(path: str, records: int) -> Dict[str, Any]:
+    """Return the records/sec of each writer for one endpoint's records."""
+    now = datetime.now(timezone.utc)
+    messages = [
+        singer.RecordMessage(stream=path, record=record, time_extracted=now)
+        for record in generate_records(path, records)
+    ]
+    singer_seconds = _time_writer(SingerWriter(), messages)
+    fast_seconds = _time_writer(BufferedWriter(), messages)
+    return {
+        "endpoint": path,
+        "singer_per_second": records / singer_seconds,
+        "fast_per_second": records / fast_seconds,
+        "speedup": singer_seconds / fast_seconds,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    print(f"{'endpoint':<20} {'singer/s':>10} {'fast/s':>10} {'speedup':>8}")
+    for path in ENDPOINTS:
+        result = benchmark_endpoint(path, args.records)
+        print(
+            f"{path:<20} {result['singer_per_second']:>10.0f} "
+            f"{result['fast_per_second']:>10.0f} {result['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Startup benchmark of short tap runs against the offline CIN7 mock server.
+
+Times complete `tap-cin7` processes, from interpreter start to exit, for a
+`--discover` run and for an incremental sync of a single small stream:
+
+    python -m tap_cin7.tests.benchmark_startup --runs 10 --stream voucher
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from tap_cin7.tests.benchmark import BENCHMARK_CONFIG, _catalog
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def _time_runs(args: List[str], runs: int) -> List[float]:
+    command = [sys.executable, "-m", "tap_cin7.tap", *args]
+    seconds = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def run_benchmark(stream_name: str, runs: int, records: int) -> Dict[str, float]:
+    """Return the median seconds of a discovery run and of a one-stream sync."""
+    with MockCIN7Server(records=records) as server:
+        with tempfile.TemporaryDirectory() as directory:
+            config = dict(BENCHMARK_CONFIG, api_url=server.url)
+            config_path = os.path.join(directory, "config.json")
+            catalog_path = os.path.join(directory, "catalog.json")
+            with open(config_path, "w") as config_file:
+                json.dump(config, config_file)
+            with open(catalog_path, "w") as catalog_file:
+                json.dump(_catalog(config, stream_name), catalog_file)
+            discover = _time_runs(["--config", config_path, "--discover"], runs)
+            sync = _time_runs(
+                ["--config", config_path, "--catalog", catalog_path], runs
+            )
+    return {"discover": statistics.median(discover), "sync": statistics.median(sync)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--stream", default="voucher")
+    parser.add_argument("--records", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.stream, args.runs, args.records)
+    print(f"--discover       {result['discover']:.3f}s")
+    print(f"sync {args.stream:<11} {result['sync']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
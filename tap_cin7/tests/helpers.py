@@ -0,0 +1,58 @@
+"""Helpers running the tap against the mock server in tests."""
+
+import io
+import json
+import sys
+from typing import Iterable, List, Optional
+
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.benchmark import BENCHMARK_CONFIG
+
+
+def tap_config(server_url: str, **settings: object) -> dict:
+    """Return a tap config for the mock server with extra settings."""
+    return dict(BENCHMARK_CONFIG, api_url=server_url, **settings)
+
+
+def select_streams(config: dict, names: Iterable[str]) -> dict:
+    """Return the discovered catalog with only the named streams selected."""
+    names = set(names)
+    catalog = TapCIN7(config=config, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in names
+    return catalog
+
+
+def run_tap(
+    config: dict, catalog: Optional[dict] = None, state: Optional[dict] = None
+) -> List[dict]:
+    """Sync the tap and return the Singer messages it wrote."""
+    output = io.StringIO()
+    stdout, sys.stdout = sys.stdout, output
+    try:
+        tap = TapCIN7(config=config, catalog=catalog, state=state)
+        tap.sync_all()
+    finally:
+        sys.stdout = stdout
+    return parse_messages(output.getvalue())
+
+
+def parse_messages(output: str) -> List[dict]:
+    """Return the Singer messages written in a tap's output."""
+    return [json.loads(line) for line in output.splitlines() if line]
+
+
+def records(messages: List[dict], stream: str) -> List[dict]:
+    """Return the records written for a stream."""
+    return [
+        message["record"]
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == stream
+    ]
+
+
+def final_state(messages: List[dict]) -> dict:
+    """Return the value of the last STATE message."""
+    return [message for message in messages if message["type"] == "STATE"][-1]["value"]
@@ -0,0 +1,485 @@
+"""An offline stand-in for the CIN7 API used by the tests and benchmarks.
+
+The server generates seeded, paginated data for every endpoint the tap syncs
+and understands the query parameters the tap sends: `page`, `rows`, `where`,
+`order` and `fields`. Latency, HTTP 429 and 5xx responses can be injected to
+exercise the tap's concurrency, rate limiting and retry handling.
+
+    with MockCIN7Server(records=1000, latency=0.05) as server:
+        config = {"api_url": server.url, "api_key": "key", "api_password": "pw"}
+"""
+
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_ROWS = 50
+MAX_ROWS = 250
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+EPOCH = datetime(2020, 1, 1)
+HISTORY = timedelta(days=3 * 365)
+
+WHERE_CLAUSE = re.compile(r"^\s*(\w+)\s*(>=|<=|<>|>|<|=)\s*'([^']*)'\s*$")
+OPERATORS: Dict[str, Callable[[object, object], bool]] = {
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+}
+
+FIRST_NAMES = ["Olivia", "Jack", "Amelia", "Noah", "Isla", "Leo", "Mia", "Oscar"]
+LAST_NAMES = ["Smith", "Jones", "Williams", "Brown", "Wilson", "Taylor", "Nguyen"]
+CITIES = ["Auckland", "Sydney", "Melbourne", "Wellington", "Brisbane", "Perth"]
+WORDS = ["Classic", "Premium", "Organic", "Deluxe", "Compact", "Vintage", "Eco"]
+PRODUCTS = ["Tee", "Hoodie", "Mug", "Backpack", "Lamp", "Bottle", "Notebook"]
+
+
+def _date(rng: random.Random, after: datetime = EPOCH) -> str:
+    seconds = int((EPOCH + HISTORY - after).total_seconds())
+    return (after + timedelta(seconds=rng.randint(0, seconds))).strftime(
+        DATETIME_FORMAT
+    )
+
+
+def _person(rng: random.Random) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "firstName": first,
+        "lastName": last,
+        "company": f"{last} {rng.choice(WORDS)} Ltd",
+        "email": f"{first}.{last}{rng.randint(1, 999)}@example.com".lower(),
+        "phone": f"+64 9 {rng.randint(1000000, 9999999)}",
+        "mobile": f"+64 21 {rng.randint(1000000, 9999999)}",
+        "address1": f"{rng.randint(1, 400)} {rng.choice(LAST_NAMES)} Street",
+        "city": rng.choice(CITIES),
+        "postCode": str(rng.randint(1000, 9999)),
+        "country": "New Zealand",
+    }
+
+
+def _line_items(rng: random.Random, transaction_id: int, created: str) -> List[dict]:
+    items = []
+    for sort in range(rng.randint(1, 8)):
+        product_id = rng.randint(1, 5000)
+        items.append(
+            {
+                "id": transaction_id * 100 + sort,
+                "createdDate": created,
+                "transactionId": transaction_id,
+                "parentId": 0,
+                "productId": product_id,
+                "productOptionId": product_id * 10 + rng.randint(0, 3),
+                "sort": sort,
+                "code": f"SKU-{product_id:05d}",
+                "name": f"{rng.choice(WORDS)} {rng.choice(PRODUCTS)}",
+                "qty": float(rng.randint(1, 20)),
+                "unitPrice": round(rng.uniform(2, 250), 2),
+                "discount": 0.0,
+            }
+        )
+    return items
+
+
+def _order(rng: random.Random, record_id: int, prefix: str) -> dict:
+    created = _date(rng)
+    items = _line_items(rng, record_id, created)
+    product_total = round(sum(i["qty"] * i["unitPrice"] for i in items), 2)
+    freight = round(rng.uniform(0, 30), 2)
+    return dict(
+        _person(rng),
+        id=record_id,
+        createdDate=created,
+        modifiedDate=_date(rng, datetime.strptime(created, DATETIME_FORMAT)),
+        reference=f"{prefix}-{record_id:06d}",
+        memberId=rng.randint(1, 2000),
+        branchId=rng.randint(1, 5),
+        isApproved=rng.random() < 0.9,
+        isVoid=rng.random() < 0.02,
+        status=rng.choice(["DRAFT", "APPROVED", "VOID"]),
+        stage=rng.choice(["New", "Dispatched", "Received"]),
+        productTotal=product_total,
+        freightTotal=freight,
+        discountTotal=0.0,
+        total=round(product_total + freight, 2),
+        currencyCode="NZD",
+        currencyRate=1.0,
+        currencySymbol="$",
+        taxStatus="Incl",
+        taxRate=0.15,
+        lineItems=items,
+    )
+
+
+def _product(rng: random.Random, record_id: int) -> dict:
+    created = _date(rng)
+    name = f"{rng.choice(WORDS)} {rng.choice(PRODUCTS)}"
+    return {
+        "id": record_id,
+        "name": name,
+        "status": rng.choice(["Public", "Primary", "Inactive"]),
+        "createdDate": created,
+        "modifiedDate": _date(rng, datetime.strptime(created, DATETIME_FORMAT)),
+        "description": f"{name} made from the finest materials.",
+        "images": [{"link": f"https://img.example.com/{record_id}.jpg"}],
+        "supplierId": rng.randint(1, 200),
+        "brand": rng.choice(LAST_NAMES),
+        "category": rng.choice(PRODUCTS),
+        "stockControl": 1,
+        "orderType": "Stock",
+        "productType": rng.choice(PRODUCTS),
+        "productOptions": [
+            {
+                "id": record_id * 10 + option,
+                "createdDate": created,
+                "modifiedDate": created,
+                "status": "Primary",
+                "productId": record_id,
+                "code": f"SKU-{record_id:05d}-{option}",
+                "barcode": str(rng.randint(10**12, 10**13 - 1)),
+                "retailPrice": round(rng.uniform(5, 300), 2),
+                "wholesalePrice": round(rng.uniform(2, 150), 2),
+                "stockAvailable": float(rng.randint(0, 500)),
+                "stockOnHand": float(rng.randint(0, 500)),
+                "priceColumns": {"priceAUD": round(rng.uniform(5, 300), 2)},
+            }
+            for option in range(rng.randint(1, 4))
+        ],
+    }
+
+
+def _stock(rng: random.Random, record_id: int) -> dict:
+    on_hand = float(rng.randint(0, 500))
+    return {
+        "productId": record_id,
+        "productOptionId": record_id * 10,
+        "modifiedDate": _date(rng),
+        "code": f"SKU-{record_id:05d}",
+        "barcode": str(rng.randint(10**12, 10**13 - 1)),
+        "branchId": rng.randint(1, 5),
+        "branchName": rng.choice(CITIES),
+        "productName": f"{rng.choice(WORDS)} {rng.choice(PRODUCTS)}",
+        "available": on_hand - rng.randint(0, int(on_hand)),
+        "stockOnHand": on_hand,
+        "openSales": float(rng.randint(0, 20)),
+        "incoming": float(rng.randint(0, 100)),
+        "virtual": 0.0,
+        "holding": 0.0,
+    }
+
+
+def _voucher(rng: random.Random, record_id: int) -> dict:
+    amount = float(rng.choice([10, 20, 50, 100]))
+    return {
+        "customerID": record_id,
+        "createdDate": _date(rng),
+        "status": rng.choice(["Active", "Redeemed", "Expired"]),
+        "code": f"GV{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+        "type": "Gift Voucher",
+        "description": f"${amount:.0f} gift voucher",
+        "amount": amount,
+        "customerEmail": f"customer{record_id}@example.com",
+        "redeemedCount": rng.randint(0, 1),
+        "redeemedCountLimit": 1,
+        "redeemedAmount": 0.0,
+    }
+
+
+def _contact(rng: random.Random, record_id: int) -> dict:
+    created = _date(rng)
+    return dict(
+        _person(rng),
+        id=record_id,
+        createdDate=created,
+        modifiedDate=_date(rng, datetime.strptime(created, DATETIME_FORMAT)),
+        isActive=rng.random() < 0.95,
+        type=rng.choice(["Customer", "Customer", "Customer", "Supplier"]),
+        accountNumber=f"ACC{record_id:06d}",
+        priceColumn="RetailPrice",
+        creditLimit=float(rng.choice([0, 1000, 5000])),
+        balanceOwing=round(rng.uniform(0, 1000), 2),
+        group=rng.choice(["Retail", "Wholesale"]),
+    )
+
+
+def _branch(rng: random.Random, record_id: int) -> dict:
+    created = _date(rng)
+    return dict(
+        _person(rng),
+        id=record_id,
+        branchType=rng.choice(["Retail", "Warehouse"]),
+        stockControlOptions="Full",
+        taxStatus="Incl",
+        createdDate=created,
+        modifiedDate=_date(rng, datetime.strptime(created, DATETIME_FORMAT)),
+        isActive=True,
+        branchLocations=[{"zone": "A", "bins": ["A1", "A2"]}],
+        secondaryContacts=[],
+    )
+
+
+def _bom_master(rng: random.Random, record_id: int) -> dict:
+    created = _date(rng)
+    return {
+        "id": record_id,
+        "createdDate": created,
+        "modifiedDate": _date(rng, datetime.strptime(created, DATETIME_FORMAT)),
+        "createdBy": rng.randint(1, 20),
+        "modifiedBy": rng.randint(1, 20),
+        "reference": f"BOM-{record_id:05d}",
+        "products": [
+            {
+                "id": record_id * 10 + sort,
+                "productId": rng.randint(1, 5000),
+                "sort": sort,
+                "code": f"SKU-{rng.randint(1, 5000):05d}",
+                "name": f"{rng.choice(WORDS)} {rng.choice(PRODUCTS)}",
+                "qty": 1.0,
+                "components": [
+                    {
+                        "id": record_id * 100 + sort * 10 + component,
+                        "productId": rng.randint(1, 5000),
+                        "sort": component,
+                        "qty": float(rng.randint(1, 5)),
+                        "unitCost": round(rng.uniform(1, 50), 2),
+                    }
+                    for component in range(rng.randint(1, 5))
+                ],
+            }
+            for sort in range(rng.randint(1, 3))
+        ],
+    }
+
+
+ENDPOINTS: Dict[str, Callable[[random.Random, int], dict]] = {
+    "/v1/Products": _product,
+    "/v1/SalesOrders": lambda rng, record_id: _order(rng, record_id, "SO"),
+    "/v1/PurchaseOrders": lambda rng, record_id: _order(rng, record_id, "PO"),
+    "/v1/Stock": _stock,
+    "/v1/Voucher": _voucher,
+    "/v1/Contacts": _contact,
+    "/v1/Branches": _branch,
+    "/v2/BomMasters": _bom_master,
+}
+
+
+def generate_records(path: str, count: int, seed: int = 0) -> List[dict]:
+    """Return `count` seeded records for an endpoint, in id order."""
+    factory = ENDPOINTS[path]
+    rng = random.Random(f"{seed}:{path}")
+    return [factory(rng, record_id) for record_id in range(1, count + 1)]
+
+
+def parse_where(where: str) -> List[Callable[[dict], bool]]:
+    """Parse a CIN7 `where` clause made of `AND`-ed comparisons."""
+    predicates = []
+    for clause in re.split(r"\s+AND\s+", where, flags=re.IGNORECASE):
+        match = WHERE_CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"Unsupported where clause: {clause}")
+        field, operator, value = match.groups()
+        compare = OPERATORS[operator]
+        predicates.append(
+            lambda record, f=field, c=compare, v=value: record.get(f) is not None
+            and c(str(record[f]), v)
+        )
+    return predicates
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_HTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Keep the test output quiet."""
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        """Serve one page of an endpoint."""
+        mock: MockCIN7Server = self.server.mock
+        url = urlparse(self.path)
+        path = url.path.replace(mock.prefix, "", 1)
+        status, body, headers = mock.handle(
+            path, parse_qs(url.query), self.headers.get("Authorization")
+        )
+        if mock.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self._send(status, body, headers)
+
+
+class _HTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    mock: "MockCIN7Server"
+
+
+class MockCIN7Server:
+    """A local HTTP server emulating the CIN7 endpoints synced by the tap."""
+
+    prefix = "/api"
+
+    def __init__(
+        self,
+        records: Union[int, Dict[str, int]] = 500,
+        seed: int = 0,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: int = 1,
+        compress: bool = True,
+        ordering: bool = True,
+    ) -> None:
+        """Create a server holding `records` records per endpoint.
+
+        `records` may also map endpoint paths such as "/v1/Products" to their
+        own record counts. `latency` is added to every response, and
+        `throttle_rate` and `error_rate` are the fractions of requests answered
+        with HTTP 429 and HTTP 503 respectively. Without `ordering`, the
+        `order` parameter is ignored and records are served in id order.
+        """
+        self.seed = seed
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.compress = compress
+        self.ordering = ordering
+        self._counts = records
+        self._data: Dict[str, List[dict]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.responses: Counter = Counter()
+        self._httpd: Optional[_HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL to configure as the tap's `api_url`."""
+        assert self._httpd is not None, "the server is not running"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def records(self, path: str) -> List[dict]:
+        """Return every record served by an endpoint."""
+        with self._lock:
+            if path not in self._data:
+                if isinstance(self._counts, dict):
+                    count = self._counts.get(path, 0)
+                else:
+                    count = self._counts
+                self._data[path] = generate_records(path, count, self.seed)
+            return self._data[path]
+
+    def reset_stats(self) -> None:
+        """Clear the request and response counters."""
+        with self._lock:
+            self.requests.clear()
+            self.responses.clear()
+
+    def _inject(self) -> Optional[int]:
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def handle(
+        self, path: str, query: Dict[str, List[str]], authorization: Optional[str]
+    ) -> tuple:
+        """Return the status, body and headers answering a request."""
+        with self._lock:
+            self.requests[path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        status, body, headers = self._respond(path, query, authorization)
+        with self._lock:
+            self.responses[status] += 1
+        return status, body, headers
+
+    def _respond(
+        self, path: str, query: Dict[str, List[str]], authorization: Optional[str]
+    ) -> tuple:
+        headers = {"Content-Type": "application/json"}
+        if path not in ENDPOINTS:
+            return 404, b'{"message": "Not found"}', headers
+        if not authorization:
+            return 401, b'{"message": "Authorization required"}', headers
+        injected = self._inject()
+        if injected == 429:
+            headers["Retry-After"] = str(self.retry_after)
+            return 429, b'{"message": "Too many requests"}', headers
+        if injected:
+            return injected, b'{"message": "Service unavailable"}', headers
+
+        def param(name: str, default: str = "") -> str:
+            return query.get(name, [default])[0]
+
+        try:
+            page = int(param("page", "1"))
+            rows = min(int(param("rows", str(DEFAULT_ROWS))), MAX_ROWS)
+            predicates = parse_where(param("where")) if param("where") else []
+        except ValueError as ex:
+            return 400, json.dumps({"message": str(ex)}).encode(), headers
+
+        records = [
+            record
+            for record in self.records(path)
+            if all(predicate(record) for predicate in predicates)
+        ]
+        order = param("order")
+        if order and self.ordering:
+            records.sort(key=lambda record: str(record.get(order) or ""))
+        start = (page - 1) * rows
+        records = records[start:][:rows]
+        fields = [name for name in param("fields").split(",") if name]
+        if fields:
+            records = [
+                {name: record[name] for name in fields if name in record}
+                for record in records
+            ]
+        return 200, json.dumps(records).encode(), headers
+
+    def start(self) -> "MockCIN7Server":
+        """Start serving on a free local port."""
+        self._httpd = _HTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.mock = self
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mock-cin7", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockCIN7Server":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        self.stop()
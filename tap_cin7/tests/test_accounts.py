@@ -0,0 +1,77 @@
+"""Tests for multi-account syncs."""
+
+from tap_cin7.accounts import TENANT, TENANTS, get_accounts, tenant_state
+from tap_cin7.output import SharedState
+from tap_cin7.tests.helpers import (
+    final_state,
+    records,
+    run_tap,
+    select_streams,
+    tap_config,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def test_accounts_keep_only_their_own_settings():
+    """Each account contributes its tenant label, credentials and URL."""
+    config = {
+        "accounts": [
+            {"tenant": "acme", "api_key": "a", "api_password": "p", "extra": 1},
+            {"tenant": "globex", "api_key": "g", "api_password": "q"},
+        ]
+    }
+    assert get_accounts(config) == [
+        {"tenant": "acme", "api_key": "a", "api_password": "p"},
+        {"tenant": "globex", "api_key": "g", "api_password": "q"},
+    ]
+    assert get_accounts({"api_key": "a"}) == []
+
+
+def test_tenants_have_separate_bookmarks():
+    """Streams of different tenants checkpoint into their own namespaces."""
+    state = {"bookmarks": {"sale_order": {"replication_key_value": "2021"}}}
+    shared = SharedState(state)
+    private = shared.isolate("sale_order", "acme")
+    assert private == {"bookmarks": {"sale_order": {}}}
+
+    private["bookmarks"]["sale_order"]["replication_key_value"] = "2022"
+    shared.merge("sale_order", private, "acme")
+    assert tenant_state(state, "acme") == {
+        "bookmarks": {"sale_order": {"replication_key_value": "2022"}}
+    }
+    assert state["bookmarks"]["sale_order"] == {"replication_key_value": "2021"}
+    assert tenant_state(state, None) is state
+
+
+def test_accounts_sync_into_one_output():
+    """Records of every account are labelled, keyed and bookmarked per tenant."""
+    with MockCIN7Server(records=30) as acme, MockCIN7Server(records=20) as globex:
+        config = tap_config(
+            acme.url,
+            accounts=[
+                {"tenant": "acme", "api_key": "a", "api_password": "p"},
+                {
+                    "tenant": "globex",
+                    "api_key": "g",
+                    "api_password": "q",
+                    "api_url": globex.url,
+                },
+            ],
+        )
+        catalog = select_streams(config, ["products"])
+        messages = run_tap(config, catalog)
+
+    schemas = [message for message in messages if message["type"] == "SCHEMA"]
+    assert {message["stream"] for message in schemas} == {"products"}
+    assert all(message["key_properties"] == [TENANT, "id"] for message in schemas)
+    assert TENANT in schemas[0]["schema"]["properties"]
+
+    tenants = [record[TENANT] for record in records(messages, "products")]
+    assert sorted(tenants) == ["acme"] * 30 + ["globex"] * 20
+
+    state = final_state(messages)
+    assert set(state[TENANTS]) == {"acme", "globex"}
+    for tenant in ("acme", "globex"):
+        bookmark = state[TENANTS][tenant]["bookmarks"]["products"]
+        assert bookmark["replication_key_value"]
+    assert "products" not in state.get("bookmarks", {})
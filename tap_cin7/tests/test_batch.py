@@ -0,0 +1,69 @@
+"""Tests for batch file output."""
+
+import gzip
+import json
+from urllib.parse import urlparse
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_cin7.batch import BatchWriter
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import tap_config
+
+
+def _read(uri):
+    with gzip.open(urlparse(uri).path, "rt") as batch_file:
+        return [json.loads(line) for line in batch_file]
+
+
+def test_files_rotate_and_are_announced_on_flush(tmp_path):
+    """Full files are completed and the open file is closed by a flush."""
+    writer = BatchWriter("sale_order", str(tmp_path), max_records=2)
+    for i in range(5):
+        writer.write({"id": i})
+    assert len(writer.completed) == 2
+
+    message = writer.flush().asdict()
+    assert message["type"] == "BATCH"
+    assert message["stream"] == "sale_order"
+    assert message["encoding"] == {"format": "jsonl", "compression": "gzip"}
+    assert [[r["id"] for r in _read(uri)] for uri in message["manifest"]] == [
+        [0, 1],
+        [2, 3],
+        [4],
+    ]
+    assert writer.flush() is None
+
+
+def test_parquet_files_rotate_by_records_and_bytes(tmp_path):
+    """Parquet files hold every column seen and rotate on either limit."""
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    writer = BatchWriter("sale_order", str(tmp_path), "parquet", max_records=3)
+    for i in range(4):
+        writer.write({"id": i, "note": "x" if i % 2 else None})
+    writer.write({"id": 4, "total": 1.5})
+
+    message = writer.flush().asdict()
+    assert message["encoding"] == {"format": "parquet", "compression": "gzip"}
+    tables = [
+        pyarrow_parquet.read_table(urlparse(uri).path).to_pydict()
+        for uri in message["manifest"]
+    ]
+    assert tables == [
+        {"id": [0, 1, 2], "note": [None, "x", None]},
+        {"id": [3, 4], "note": ["x", None], "total": [None, 1.5]},
+    ]
+
+    writer = BatchWriter("sale_order", str(tmp_path), "parquet", max_bytes=40)
+    for i in range(3):
+        writer.write({"id": i, "name": "abc"})
+    assert len(writer.completed) == 1
+    assert len(writer.flush().manifest) == 2
+
+
+def test_unknown_batch_formats_fail_config_validation():
+    """A misspelt batch format is rejected before any record is synced."""
+    TapCIN7(config=tap_config("http://localhost", batch_format="parquet"))
+    with pytest.raises(ConfigValidationError):
+        TapCIN7(config=tap_config("http://localhost", batch_format="jsonl.gz"))
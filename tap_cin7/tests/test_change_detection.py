@@ -0,0 +1,63 @@
+"""Tests for content-hash change detection."""
+
+from tap_cin7.change_detection import DELETED_AT, ChangeDetector, fingerprint
+from tap_cin7.tests.helpers import records, run_tap, select_streams, tap_config
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def test_fingerprint_ignores_key_order():
+    """Records with the same content have the same fingerprint."""
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_only_changes_and_deletes_are_reported(tmp_path):
+    """Unchanged records are skipped once a run has been committed."""
+    path = str(tmp_path / "changes.db")
+    first = ChangeDetector(path, "voucher", ["customerID"])
+    records = [{"customerID": i, "amount": 10.0} for i in range(3)]
+    assert all(first.is_changed(record) for record in records)
+    first.commit()
+
+    second = ChangeDetector(path, "voucher", ["customerID"])
+    assert not second.is_changed(records[0])
+    assert second.is_changed({"customerID": 1, "amount": 20.0})
+    assert second.deleted_keys() == [{"customerID": 2}]
+    second.commit(second.deleted_keys())
+
+    third = ChangeDetector(path, "voucher", ["customerID"])
+    assert not third.is_changed({"customerID": 1, "amount": 20.0})
+    assert third.is_changed(records[2])
+    assert ChangeDetector(path, "branches", ["id"]).deleted_keys() == []
+
+
+def test_uncommitted_runs_are_forgotten(tmp_path):
+    """A failed run does not hide its changes from the next one."""
+    path = str(tmp_path / "changes.db")
+    ChangeDetector(path, "voucher", ["customerID"]).is_changed({"customerID": 1})
+    assert ChangeDetector(path, "voucher", ["customerID"]).is_changed({"customerID": 1})
+
+
+def test_empty_runs_delete_nothing(tmp_path):
+    """A run returning no records neither emits nor forgets any keys."""
+    with MockCIN7Server(records=20) as server:
+        config = tap_config(
+            server.url,
+            emit_deletes=True,
+            change_detection_path=str(tmp_path / "changes.db"),
+        )
+        catalog = select_streams(config, ["voucher"])
+        run_tap(config, catalog)
+
+        vouchers = server.records("/v1/Voucher")
+        saved = list(vouchers)
+        vouchers.clear()
+        assert records(run_tap(config, catalog), "voucher") == []
+
+        vouchers.extend(saved[1:])
+        emitted = records(run_tap(config, catalog), "voucher")
+
+    # Only the voucher really removed is deleted; the rest are still known.
+    assert len(emitted) == 1
+    assert emitted[0]["customerID"] == saved[0]["customerID"]
+    assert emitted[0][DELETED_AT]
@@ -0,0 +1,63 @@
+"""Tests for resuming interrupted stream syncs from page checkpoints."""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_cin7.client import PAGE_CHECKPOINT
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import (
+    final_state,
+    parse_messages,
+    records,
+    run_tap,
+    select_streams,
+    tap_config,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+class InterruptedServer(MockCIN7Server):
+    """A mock server failing once on a given page, recording the pages asked for."""
+
+    def __init__(self, fail_page: int, **settings: object) -> None:
+        """Create a server failing the first request for `fail_page`."""
+        super().__init__(**settings)
+        self.fail_page = fail_page
+        self.pages = []
+
+    def _respond(self, path, query, authorization):
+        page, rows = int(query["page"][0]), int(query["rows"][0])
+        self.pages.append((page, rows))
+        if page == self.fail_page:
+            self.fail_page = None
+            return 400, b'{"message": "Interrupted"}', {}
+        return super()._respond(path, query, authorization)
+
+
+def test_interrupted_scans_resume_after_the_last_checkpoint():
+    """A restart requests the page after the checkpoint, emitting every id once."""
+    with InterruptedServer(fail_page=6, records=500) as server:
+        config = tap_config(server.url, page_size=50, checkpoint_pages=2)
+        catalog = select_streams(config, ["voucher"])
+        output = io.StringIO()
+        with pytest.raises(FatalAPIError), redirect_stdout(output):
+            TapCIN7(config=config, catalog=catalog).sync_all()
+        interrupted = parse_messages(output.getvalue())
+
+        states = [m for m in interrupted if m["type"] == "STATE"]
+        checkpoint = states[-1]["value"]["bookmarks"]["voucher"][PAGE_CHECKPOINT]
+        assert (checkpoint["page"], checkpoint["rows"]) == (4, 50)
+        # Records after the last checkpoint are synced again on restart.
+        committed = records(interrupted[: interrupted.index(states[-1])], "voucher")
+
+        server.pages.clear()
+        resumed = run_tap(config, catalog, states[-1]["value"])
+        assert server.pages[0] == (5, 50)
+        ids = [record["customerID"] for record in server.records("/v1/Voucher")]
+
+    synced = committed + records(resumed, "voucher")
+    assert sorted(record["customerID"] for record in synced) == sorted(ids)
+    assert PAGE_CHECKPOINT not in final_state(resumed)["bookmarks"]["voucher"]
@@ -0,0 +1,94 @@
+"""Tests for syncing several streams concurrently."""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import (
+    final_state,
+    parse_messages,
+    records,
+    run_tap,
+    select_streams,
+    tap_config,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+class FailingServer(MockCIN7Server):
+    """A mock server rejecting every request for one endpoint."""
+
+    def __init__(self, fail_path: str, **settings: object) -> None:
+        """Create a server answering requests for `fail_path` with HTTP 400."""
+        super().__init__(**settings)
+        self.fail_path = fail_path
+
+    def _respond(self, path, query, authorization):
+        if path == self.fail_path:
+            return 400, b'{"message": "Bad request"}', {}
+        return super()._respond(path, query, authorization)
+
+
+STREAMS = ["products", "sale_order", "purchase_orders", "contacts", "voucher"]
+
+
+def test_concurrent_streams_keep_every_bookmark():
+    """State written by concurrent streams is whole, ordered and complete."""
+    with MockCIN7Server(records=300, latency=0.005) as server:
+        serial_config = tap_config(server.url, page_size=50)
+        catalog = select_streams(serial_config, STREAMS)
+        serial = run_tap(serial_config, catalog)
+        # Every message parsing as a JSON line shows none were interleaved.
+        concurrent = run_tap(dict(serial_config, max_workers=3), catalog)
+
+    assert final_state(concurrent) == final_state(serial)
+    for stream in STREAMS:
+        assert len(records(concurrent, stream)) == len(records(serial, stream))
+
+    # A bookmark, once written, is never lost by another stream's checkpoint.
+    seen = set()
+    for message in concurrent:
+        if message["type"] == "STATE":
+            bookmarks = message["value"]["bookmarks"]
+            assert seen <= set(bookmarks)
+            seen |= {name for name, bookmark in bookmarks.items() if bookmark}
+    assert seen >= set(STREAMS) - {"voucher"}
+
+
+def test_a_tap_syncs_each_stream_once_per_run(capsys):
+    """Streams sync once per run and the tap keeps them for the next run."""
+    with MockCIN7Server(records=50) as server:
+        config = tap_config(server.url)
+        catalog = select_streams(config, ["products", "voucher"])
+        tap = TapCIN7(config=config, catalog=catalog)
+        runs = []
+        for _ in range(2):
+            tap.sync_all()
+            runs.append(parse_messages(capsys.readouterr().out))
+        resumed = run_tap(config, catalog, final_state(runs[0]))
+
+    for messages in runs:
+        schemas = [m["stream"] for m in messages if m["type"] == "SCHEMA"]
+        assert sorted(schemas) == ["products", "voucher"]
+    assert len(records(runs[0], "products")) == 50
+    assert records(runs[1], "products") == records(resumed, "products") != []
+    assert sorted(tap.streams) == sorted(
+        entry["tap_stream_id"] for entry in tap.catalog_dict["streams"]
+    )
+
+
+def test_a_failing_stream_stops_the_other_streams():
+    """The first failure is raised without waiting for long streams to finish."""
+    with FailingServer(
+        "/v1/Voucher", records={"/v1/Products": 2000}, latency=0.02
+    ) as server:
+        config = tap_config(server.url, page_size=50, max_workers=2)
+        catalog = select_streams(config, ["products", "voucher"])
+        with pytest.raises(FatalAPIError), redirect_stdout(io.StringIO()):
+            TapCIN7(config=config, catalog=catalog).sync_all()
+
+    # Products has 40 pages, but stops after the few started before the failure.
+    assert server.requests["/v1/Products"] < 10
@@ -0,0 +1,100 @@
+"""Tests for compiled record conformance and validation."""
+
+import datetime
+
+from tap_cin7.conform import compile_conformer, compile_validator
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": ["integer", "null"]},
+        "isActive": {"type": ["boolean", "null"]},
+        "total": {"type": ["number", "null"]},
+        "modifiedDate": {"type": ["string", "null"], "format": "date-time"},
+        "address": {
+            "type": ["object", "null"],
+            "properties": {
+                "city": {"type": ["string", "null"]},
+                "notes": {"type": ["string", "null"]},
+            },
+        },
+        "lineItems": {
+            "type": ["array", "null"],
+            "items": {
+                "type": ["object", "null"],
+                "properties": {
+                    "qty": {"type": ["integer", "null"]},
+                    "taxable": {"type": ["boolean", "null"]},
+                },
+            },
+        },
+    },
+}
+
+
+def test_values_are_converted_to_the_schema_types():
+    """Booleans, numbers and datetimes are conformed, at every level."""
+    conform = compile_conformer(SCHEMA)
+    record = conform(
+        {
+            "id": "12",
+            "isActive": 0,
+            "total": "9.5",
+            "modifiedDate": datetime.datetime(2022, 3, 1, 12, 30),
+            "lineItems": [{"qty": 2.0, "taxable": 1}],
+        }
+    )
+    assert record == {
+        "id": 12,
+        "isActive": False,
+        "total": 9.5,
+        "modifiedDate": "2022-03-01T12:30:00+00:00",
+        "lineItems": [{"qty": 2, "taxable": True}],
+    }
+
+
+def test_non_finite_numbers_are_left_as_strings():
+    """Strings parsing as NaN or infinity are not turned into numbers."""
+    conform = compile_conformer(SCHEMA)
+    for value in ("nan", "inf", "-Infinity"):
+        assert conform({"total": value}) == {"total": value}
+
+
+def test_unknown_and_deselected_properties_are_dropped():
+    """Properties outside the schema or deselected are removed from objects."""
+    mask = {
+        (): True,
+        ("properties", "total"): False,
+        ("properties", "address", "properties", "notes"): False,
+    }
+
+    class Mask(dict):
+        def __missing__(self, breadcrumb):
+            return True
+
+    conform = compile_conformer(SCHEMA, Mask(mask), "sale_order")
+    record = conform(
+        {
+            "id": 1,
+            "total": 3,
+            "extra": "x",
+            "address": {"city": "Oslo", "notes": "n", "zip": "0150"},
+            "lineItems": [{"qty": 1, "colour": "red"}],
+        }
+    )
+    assert record == {
+        "id": 1,
+        "address": {"city": "Oslo"},
+        "lineItems": [{"qty": 1}],
+    }
+
+
+def test_validator_reports_type_mismatches():
+    """The validator lists each field whose JSON type the schema does not allow."""
+    errors = compile_validator(SCHEMA)
+    assert errors({"id": 1, "total": 2, "lineItems": [{"qty": 1}]}) == []
+    assert errors({"id": "a", "address": {"city": 5}, "lineItems": [{"qty": 1.5}]}) == [
+        "id: expected integer/null, got string",
+        "address.city: expected null/string, got integer",
+        "lineItems[].qty: expected integer/null, got number",
+    ]
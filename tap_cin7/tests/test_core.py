@@ -5,19 +5,25 @@ import datetime
 from singer_sdk.testing import get_standard_tap_tests
 
 from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.mock_server import MockCIN7Server
 
 SAMPLE_CONFIG = {
-    "start_date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
-    # TODO: Initialize minimal tap config
+    "start_date": (
+        datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=3650)
+    ).strftime("%Y-%m-%d"),
+    "api_key": "test",
+    "api_password": "test",
 }
 
 
-# Run standard built-in tap tests from the SDK:
+# Run standard built-in tap tests from the SDK against the offline mock server:
 def test_standard_tap_tests():
     """Run standard tap tests from the SDK."""
-    tests = get_standard_tap_tests(TapCIN7, config=SAMPLE_CONFIG)
-    for test in tests:
-        test()
+    with MockCIN7Server(records=300) as server:
+        config = dict(SAMPLE_CONFIG, api_url=server.url)
+        tests = get_standard_tap_tests(TapCIN7, config=config)
+        for test in tests:
+            test()
 
 
 # TODO: Create additional tests as appropriate for your tap.
@@ -0,0 +1,43 @@
+"""Tests for CIN7 response decoding."""
+
+import json
+
+import pytest
+
+from tap_cin7.decoding import decode_page, iter_array
+
+PAGE = [
+    {"id": 1, "reference": "SO-1,]", "lineItems": [{"code": 'A"}'}, {"qty": 2}]},
+    {"id": 2, "notes": "line one\\r\nline two", "lineItems": []},
+    {"id": 3, "empty": {}, "nested": [[1, 2], []]},
+]
+
+
+def _chunks(raw, size):
+    return [raw[start:][:size] for start in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_iter_array_matches_full_decode(size):
+    """Records decoded incrementally equal those of a full decode."""
+    raw = json.dumps(PAGE, indent=2).encode()
+    assert list(iter_array(_chunks(raw, size))) == decode_page(raw)
+
+
+def test_carriage_return_escapes_are_stripped():
+    """Literal \\r escapes are removed before decoding, as they always were."""
+    raw = b'[{"notes": "a\\r\\nb"}]'
+    assert decode_page(raw) == [{"notes": "a\nb"}]
+    assert list(iter_array([raw])) == [{"notes": "a\nb"}]
+
+
+def test_iter_array_handles_scalars_and_empty_arrays():
+    """Scalar elements and empty arrays are supported."""
+    assert list(iter_array([b"[]"])) == []
+    assert list(iter_array([b' [1, "x", null ,true]'])) == [1, "x", None, True]
+
+
+def test_iter_array_rejects_objects():
+    """Only a top-level array can be streamed."""
+    with pytest.raises(ValueError):
+        list(iter_array([b'{"a": 1}']))
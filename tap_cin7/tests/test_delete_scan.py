@@ -0,0 +1,50 @@
+"""Tests for id-only delete detection."""
+
+from tap_cin7.change_detection import DELETED_AT
+from tap_cin7.delete_scan import IdSet, load_ids, save_ids
+from tap_cin7.tests.helpers import records, run_tap, select_streams, tap_config
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def test_id_set_difference():
+    """Ids missing from the newer scan are reported in order."""
+    previous = IdSet([5, 1, 9, 3, 3, 12])
+    current = IdSet([1, 4, 9, 12, 20])
+    assert list(previous) == [1, 3, 5, 9, 12]
+    assert previous.difference(current) == [3, 5]
+    assert current.difference(IdSet()) == [1, 4, 9, 12, 20]
+    assert 9 in current and 3 not in current and "9" not in current
+
+
+def test_id_sets_are_compact_and_saved(tmp_path):
+    """Dense ids compress to a fraction of a byte each and survive a round trip."""
+    ids = IdSet(range(1000, 101000))
+    assert len(ids.to_bytes()) < len(ids) // 10
+    assert list(IdSet.from_bytes(ids.to_bytes())) == list(ids)
+
+    path = str(tmp_path / "ids.db")
+    assert load_ids(path, "products") is None
+    save_ids(path, "products", IdSet([7, 2]))
+    save_ids(path, "products", IdSet([2, 8]))
+    assert list(load_ids(path, "products")) == [2, 8]
+
+
+def test_fanned_out_streams_are_scanned_for_deletes(tmp_path):
+    """Suppliers taken from the contacts scan still get their own delete scan."""
+    with MockCIN7Server(records=300) as server:
+        config = tap_config(
+            server.url,
+            delete_scan_streams=["contact_supplier"],
+            delete_scan_path=str(tmp_path / "ids.db"),
+        )
+        catalog = select_streams(config, ["contacts", "contact_supplier"])
+        run_tap(config, catalog)
+
+        contacts = server.records("/v1/Contacts")
+        removed = [c["id"] for c in contacts if c["type"] == "Supplier"][:5]
+        contacts[:] = [c for c in contacts if c["id"] not in removed]
+        messages = run_tap(config, catalog)
+
+    deleted = [r for r in records(messages, "contact_supplier") if r.get(DELETED_AT)]
+    assert sorted(record["id"] for record in deleted) == sorted(removed)
+    assert not any(r.get(DELETED_AT) for r in records(messages, "contacts"))
@@ -0,0 +1,80 @@
+"""Tests for streams synced from the scan of another stream."""
+
+from tap_cin7.tests.helpers import (
+    final_state,
+    records,
+    run_tap,
+    select_streams,
+    tap_config,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+OLDER = "2021-01-01T00:00:00Z"
+NEWER = "2022-06-01T00:00:00Z"
+
+
+def _bookmark(value):
+    return {"replication_key": "modifiedDate", "replication_key_value": value}
+
+
+def _sync_contacts(contacts_start, suppliers_start):
+    """Sync contacts and suppliers from bookmarks, returning what was emitted."""
+    with MockCIN7Server(records=400) as server:
+        config = tap_config(server.url, page_size=50)
+        catalog = select_streams(config, ["contacts", "contact_supplier"])
+        state = {
+            "bookmarks": {
+                "contacts": _bookmark(contacts_start),
+                "contact_supplier": _bookmark(suppliers_start),
+            }
+        }
+        messages = run_tap(config, catalog, state)
+        contacts = server.records("/v1/Contacts")
+        requests = server.requests["/v1/Contacts"]
+    assert requests == 8  # A single scan of every contact.
+    return messages, contacts
+
+
+def _ids(rows):
+    return sorted(row["id"] for row in rows)
+
+
+def test_sources_scan_back_to_the_oldest_target_bookmark():
+    """Suppliers with an older bookmark are synced from the contacts scan."""
+    messages, contacts = _sync_contacts(NEWER, OLDER)
+    suppliers = [c for c in contacts if c["type"] == "Supplier"]
+    assert _ids(records(messages, "contact_supplier")) == _ids(
+        c for c in suppliers if c["modifiedDate"] > OLDER
+    )
+    assert _ids(records(messages, "contacts")) == _ids(
+        c for c in contacts if c["modifiedDate"] >= NEWER
+    )
+
+
+def test_targets_skip_records_older_than_their_bookmark():
+    """A scan reaching back for its own bookmark does not resend the target's."""
+    messages, contacts = _sync_contacts(OLDER, NEWER)
+    suppliers = [c for c in contacts if c["type"] == "Supplier"]
+    assert _ids(records(messages, "contact_supplier")) == _ids(
+        c for c in suppliers if c["modifiedDate"] >= NEWER
+    )
+    assert _ids(records(messages, "contacts")) == _ids(
+        c for c in contacts if c["modifiedDate"] > OLDER
+    )
+    bookmarks = final_state(messages)["bookmarks"]
+    newest = max(c["modifiedDate"] for c in suppliers)
+    assert bookmarks["contact_supplier"]["replication_key_value"] == newest
+
+
+def test_fan_out_only_streams_sync_without_their_source():
+    """Line items are synced from a sale order scan whose records are not sent."""
+    with MockCIN7Server(records=120) as server:
+        config = tap_config(server.url, child_streams=True)
+        catalog = select_streams(config, ["sale_order_line_items"])
+        messages = run_tap(config, catalog)
+        orders = server.records("/v1/SalesOrders")
+
+    items = [item for order in orders for item in order["lineItems"]]
+    assert _ids(records(messages, "sale_order_line_items")) == _ids(items)
+    assert records(messages, "sale_order") == []
+    assert "sale_order_line_items" in final_state(messages)["bookmarks"]
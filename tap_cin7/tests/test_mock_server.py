@@ -0,0 +1,57 @@
+"""Tests for the offline CIN7 mock server."""
+
+import requests
+
+from tap_cin7.tests.mock_server import MockCIN7Server, generate_records
+
+AUTH = ("key", "password")
+
+
+def test_records_are_seeded():
+    """The same seed always generates the same data."""
+    assert generate_records("/v1/Products", 5, seed=1) == generate_records(
+        "/v1/Products", 5, seed=1
+    )
+    assert generate_records("/v1/Products", 5, seed=1) != generate_records(
+        "/v1/Products", 5, seed=2
+    )
+
+
+def test_paging_filtering_and_projection():
+    """Pages honour `rows`, `where`, `order` and `fields`."""
+    with MockCIN7Server(records=120) as server:
+        url = f"{server.url}/v1/Contacts"
+        pages = [
+            requests.get(url, params={"page": page, "rows": 50}, auth=AUTH).json()
+            for page in (1, 2, 3, 4)
+        ]
+        assert [len(page) for page in pages] == [50, 50, 20, 0]
+
+        where = "type='Supplier' AND modifiedDate>'2021-01-01T00:00:00Z'"
+        records = requests.get(
+            url,
+            params={
+                "rows": 250,
+                "where": where,
+                "order": "modifiedDate",
+                "fields": "id,type,modifiedDate",
+            },
+            auth=AUTH,
+        ).json()
+        assert records
+        assert all(set(record) == {"id", "type", "modifiedDate"} for record in records)
+        assert all(record["type"] == "Supplier" for record in records)
+        dates = [record["modifiedDate"] for record in records]
+        assert dates == sorted(dates) and dates[0] > "2021-01-01T00:00:00Z"
+        assert server.requests["/v1/Contacts"] == 5
+
+
+def test_injected_failures():
+    """Throttling and server errors are injected at the configured rates."""
+    with MockCIN7Server(records=1, throttle_rate=1.0, retry_after=7) as server:
+        response = requests.get(f"{server.url}/v1/Stock", auth=AUTH)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+    with MockCIN7Server(records=1, error_rate=1.0) as server:
+        assert requests.get(f"{server.url}/v1/Stock", auth=AUTH).status_code == 503
+        assert requests.get(f"{server.url}/v1/Stock").status_code == 401
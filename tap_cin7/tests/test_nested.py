@@ -0,0 +1,54 @@
+"""Tests for child streams of nested arrays."""
+
+from tap_cin7.nested import iter_nested_items, nested_items_schema
+from tap_cin7.streams import BomMastersStream, ProductOptionsStream
+
+
+def test_items_carry_their_parents_keys():
+    """Every nested item becomes a record keyed by the records above it."""
+    bom = {
+        "id": 1,
+        "modifiedDate": "2023-01-02T00:00:00Z",
+        "products": [
+            {"id": 10, "components": [{"id": 100}, {"id": 101}]},
+            {"id": 11, "components": None},
+            {"id": 12, "components": [{"id": 120}]},
+        ],
+    }
+    rows = iter_nested_items(bom, ("products", "components"), ("bom", "line"), {})
+    assert [(row["bom"], row["line"], row["id"]) for row in rows] == [
+        (1, 10, 100),
+        (1, 10, 101),
+        (1, 12, 120),
+    ]
+    assert list(iter_nested_items({"id": 2}, ("lineItems",), ("order",), {})) == []
+
+
+def test_parent_fields_move_clashing_item_fields_aside():
+    """An option keeps its own modifiedDate while following the product's."""
+    product = {
+        "id": 5,
+        "modifiedDate": "2023-02-01T00:00:00Z",
+        "productOptions": [{"id": 50, "modifiedDate": "2022-12-01T00:00:00Z"}],
+    }
+    stream = ProductOptionsStream
+    (row,) = iter_nested_items(
+        product, stream.items_path, stream.parent_keys, stream.renamed_fields
+    )
+    assert row == {
+        "id": 50,
+        "productId": 5,
+        "modifiedDate": "2023-02-01T00:00:00Z",
+        "optionModifiedDate": "2022-12-01T00:00:00Z",
+    }
+    assert set(row) <= set(stream.schema["properties"])
+
+
+def test_child_schema_is_flat():
+    """The child schema has the keys and the nested item's own properties."""
+    schema = nested_items_schema(
+        BomMastersStream.schema, ("products", "components"), ("bom", "line"), {}
+    )
+    properties = schema["properties"]
+    assert list(properties)[:3] == ["bom", "line", "modifiedDate"]
+    assert "unitCost" in properties and "components" not in properties
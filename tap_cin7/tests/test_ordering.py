@@ -0,0 +1,51 @@
+"""Tests for sorted replication and its fallback when records arrive unsorted."""
+
+import logging
+
+from tap_cin7.tests.helpers import (
+    final_state,
+    records,
+    run_tap,
+    select_streams,
+    tap_config,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def _bookmarks(messages, stream):
+    return [
+        message["value"]["bookmarks"].get(stream, {})
+        for message in messages
+        if message["type"] == "STATE"
+    ]
+
+
+def test_sorted_streams_fall_back_when_pages_are_unsorted(caplog):
+    """The bookmark stays put until an out-of-order stream completes."""
+    with MockCIN7Server(records=500, ordering=False) as server:
+        config = tap_config(server.url, page_size=50)
+        catalog = select_streams(config, ["products"])
+        start = "2021-06-01T00:00:00Z"
+        bookmark = {"replication_key": "modifiedDate", "replication_key_value": start}
+        state = {"bookmarks": {"products": bookmark}}
+        with caplog.at_level(logging.WARNING):
+            messages = run_tap(config, catalog, state)
+        expected = [
+            record
+            for record in server.records("/v1/Products")
+            if record["modifiedDate"] > start
+        ]
+
+    synced = records(messages, "products")
+    assert sorted(r["id"] for r in synced) == sorted(r["id"] for r in expected)
+    bookmarks = _bookmarks(messages, "products")
+    assert len(bookmarks) >= 2
+    for bookmark in bookmarks[:-1]:
+        assert bookmark.get("replication_key_value", start) == start
+    newest = max(record["modifiedDate"] for record in expected)
+    assert final_state(messages)["bookmarks"]["products"] == {
+        "replication_key": "modifiedDate",
+        "replication_key_value": newest,
+    }
+    fallbacks = [r for r in caplog.records if "out of modifiedDate order" in r.message]
+    assert len(fallbacks) == 1
@@ -0,0 +1,58 @@
+"""Tests for the Singer message writers."""
+
+import io
+import json
+import sys
+
+import pytest
+import singer
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_cin7.output import BufferedWriter, encode_message
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import tap_config
+from tap_cin7.tests.test_rate_limit import FakeClock
+
+
+class FakeStdout(io.StringIO):
+    """A text stdout backed by a byte buffer that records each write."""
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = io.BytesIO()
+
+
+def test_encoded_messages_match_singer():
+    """The fast encoding decodes to the same message as singer-python's."""
+    message = singer.RecordMessage(stream="s", record={"id": 1, "name": "Olá"})
+    assert json.loads(encode_message(message)) == json.loads(
+        singer.format_message(message)
+    )
+
+
+def test_records_are_buffered_until_state(monkeypatch):
+    """Records stay buffered until the size or a STATE message forces a flush."""
+    stdout = FakeStdout()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    clock = FakeClock()
+    writer = BufferedWriter(buffer_size=1000, flush_interval=5, clock=clock)
+
+    writer.write(singer.RecordMessage(stream="s", record={"id": 1}))
+    writer.write(singer.RecordMessage(stream="s", record={"id": 2}))
+    assert stdout.buffer.getvalue() == b""
+
+    writer.write(singer.StateMessage(value={"bookmarks": {}}))
+    lines = [json.loads(line) for line in stdout.buffer.getvalue().splitlines()]
+    assert [line["type"] for line in lines] == ["RECORD", "RECORD", "STATE"]
+
+    writer.write(singer.RecordMessage(stream="s", record={"id": 3}))
+    clock.sleep(5)
+    writer.write(singer.RecordMessage(stream="s", record={"id": 4}))
+    assert len(stdout.buffer.getvalue().splitlines()) == 5
+
+
+def test_unknown_message_writers_fail_config_validation():
+    """A misspelt writer is rejected instead of falling back to singer-python."""
+    TapCIN7(config=tap_config("http://localhost", message_writer="fast"))
+    with pytest.raises(ConfigValidationError):
+        TapCIN7(config=tap_config("http://localhost", message_writer="orjson"))
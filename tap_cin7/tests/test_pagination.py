@@ -0,0 +1,191 @@
+"""Tests for the CIN7 pagination helpers."""
+
+import threading
+from concurrent.futures import Future
+
+from tap_cin7.pagination import (
+    AdaptivePageSize,
+    PageToken,
+    find_last_page,
+    iter_pages_in_order,
+    iter_prefetched_pages,
+    page_size_ladder,
+)
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import run_tap, select_streams, tap_config
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def _fetcher(total_rows, page_size):
+    requested = []
+    lock = threading.Lock()
+
+    def fetch(page):
+        with lock:
+            requested.append(page)
+        start = (page - 1) * page_size
+        return [{"id": i} for i in range(start, min(start + page_size, total_rows))]
+
+    return fetch, requested
+
+
+def test_prefetch_yields_pages_in_order_and_stops_on_short_page():
+    """Records come back in page order and the short last page ends the scan."""
+    fetch, requested = _fetcher(total_rows=23, page_size=5)
+    pages = list(iter_prefetched_pages(fetch, 1, window=4, page_size=5))
+    assert [page for page, _ in pages] == [1, 2, 3, 4, 5]
+    assert [r["id"] for _, records in pages for r in records] == list(range(23))
+    assert max(requested) <= 5 + 3
+
+
+def test_prefetch_stops_on_empty_page_without_page_size():
+    """Without a known page size, the first empty page ends the scan."""
+    fetch, _ = _fetcher(total_rows=10, page_size=5)
+    pages = list(iter_prefetched_pages(fetch, 1, window=2, page_size=None))
+    assert [len(records) for _, records in pages] == [5, 5, 0]
+
+
+def test_pages_in_order_cancels_pages_past_the_end():
+    """Pages requested past the last one are cancelled once it arrives."""
+    futures = {}
+
+    def submit(page):
+        futures[page] = Future()
+        if page <= 2:
+            # Page 1 is full and the short page 2 ends the scan.
+            futures[page].set_result(3 - page)
+        return futures[page]
+
+    pages = iter_pages_in_order(submit, 1, window=3, page_size=2, count=int)
+    assert list(pages) == [(1, 2), (2, 1)]
+    assert sorted(futures) == [1, 2, 3, 4]
+    assert futures[3].cancelled() and futures[4].cancelled()
+
+
+def test_last_page_is_bisected_between_known_pages():
+    """Pages between one with records and an empty one are bisected."""
+    for last in range(1, 20):
+        probed = []
+
+        def has_page(page):
+            probed.append(page)
+            return page <= last
+
+        assert find_last_page(has_page, 1, 20) == last
+        assert len(probed) <= 5
+    assert find_last_page(lambda page: page <= 12, 5, 13) == 12
+
+
+def _planned_pages(sizes, window, planned=None, probe=True):
+    """Return the pages yielded and requested, and the plans made."""
+    requested, plans = [], []
+
+    def submit(page):
+        requested.append(page)
+        future = Future()
+        future.set_result(sizes.get(page, 0))
+        return future
+
+    def plan(last_known, empty):
+        plans.append((last_known, empty))
+        if planned is not None:
+            return planned
+        return find_last_page(lambda page: page in sizes, last_known, empty)
+
+    pages = iter_pages_in_order(
+        submit, 1, window=window, page_size=2, count=int, plan=plan if probe else None
+    )
+    return [page for page, _ in pages], requested, plans
+
+
+def test_planned_pages_are_not_requested_past_the_end():
+    """The last page of the first window tells how far to fetch ahead."""
+    # The empty page 6 ends the first window, and the pages before are bisected.
+    assert _planned_pages({1: 2, 2: 2, 3: 1}, window=6) == (
+        [1, 2, 3],
+        [1, 6, 2, 3],
+        [(1, 6)],
+    )
+    # The short page 4 ends the first window and is the last page.
+    assert _planned_pages({1: 2, 2: 2, 3: 2, 4: 1}, window=4) == (
+        [1, 2, 3, 4],
+        [1, 4, 2, 3],
+        [],
+    )
+    # Page 4 was only filled after planning, and is followed alone.
+    assert _planned_pages({1: 2, 2: 2, 3: 2, 4: 1}, window=6, planned=2) == (
+        [1, 2, 3, 4],
+        [1, 6, 2, 3, 4],
+        [(1, 6)],
+    )
+    # A short first page ends the scan.
+    assert _planned_pages({1: 1}, window=4) == ([1], [1, 4], [])
+
+
+def test_long_planned_scans_request_the_same_pages():
+    """A full last page of the first window leaves fetching ahead unplanned."""
+    sizes = dict.fromkeys(range(1, 20), 2)
+    sizes[20] = 1
+    pages, requested, plans = _planned_pages(sizes, window=4)
+    assert pages == list(range(1, 21)) and plans == []
+    _, unplanned, _ = _planned_pages(sizes, window=4, probe=False)
+    assert sorted(requested) == sorted(unplanned)
+
+
+def test_probing_never_costs_more_requests_than_it_saves():
+    """Against the mock server, probing only ever saves requests."""
+    counts = {"/v1/Products": 2000, "/v1/Voucher": 370}
+    requested = {}
+    with MockCIN7Server(records=counts) as server:
+        for probe in (False, True):
+            config = tap_config(
+                server.url, page_size=50, prefetch_pages=8, trim_short_scans=probe
+            )
+            server.reset_stats()
+            run_tap(config, select_streams(config, ["products", "voucher"]))
+            requested[probe] = dict(server.requests)
+
+    # The 40 full pages of the long scan are followed by an empty one, past
+    # which no more than the 7 pages fetched ahead without probing are sent.
+    assert requested[True]["/v1/Products"] <= 41 + 7
+    # The short scan ends on the last page of the first window, and only its
+    # 8 pages are requested.
+    assert requested[True]["/v1/Voucher"] == 8
+    assert requested[False]["/v1/Voucher"] > 8
+
+
+def test_stream_page_sizes_override_the_page_size():
+    """Streams listed in stream_page_sizes request their own number of rows."""
+    config = tap_config(
+        "http://localhost", page_size=200, stream_page_sizes={"products": 40}
+    )
+    streams = TapCIN7(config=config).streams
+    assert streams["products"].page_size == 40
+    assert streams["voucher"].page_size == 200
+
+
+def test_page_size_ladder():
+    """Each page size divides the one before it."""
+    assert page_size_ladder(250) == [250, 125, 25, 5]
+    assert page_size_ladder(100) == [100, 25, 5]
+    assert page_size_ladder(30) == [30, 5]
+
+
+def test_adaptive_page_size_keeps_offsets_aligned():
+    """Page sizes change without skipping or repeating records."""
+    sizer = AdaptivePageSize(250, max_bytes=1000, slow_seconds=10)
+    assert sizer.token_at(250) == PageToken(2, 250)
+
+    sizer.observe(seconds=1, size=5000)
+    assert sizer.rows == 125
+    assert sizer.token_at(250) == PageToken(3, 125)
+    assert sizer.shrink() and sizer.shrink() and not sizer.shrink()
+    assert sizer.token_at(375) == PageToken(76, 5)
+
+    for _ in range(3):
+        sizer.observe(seconds=0.1, size=10)
+    assert sizer.rows == 250
+    # 375 records in, the largest page size ending on a boundary is 125.
+    token = sizer.token_at(375)
+    assert token == PageToken(4, 125) and token.offset == 375
+    assert sizer.token_at(token.offset + token.rows) == PageToken(3, 250)
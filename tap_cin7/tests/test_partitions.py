@@ -0,0 +1,64 @@
+"""Tests for date-window partitioning."""
+
+from datetime import datetime, timezone
+
+from tap_cin7.partitions import advance_watermark, build_windows
+from tap_cin7.tests.helpers import final_state, run_tap, select_streams, tap_config
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def test_build_windows_covers_the_range():
+    """Windows are contiguous and the last one reaches past the end."""
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2022, 1, 20, tzinfo=timezone.utc)
+    windows = build_windows(start, end, days=7)
+    assert windows == [
+        {"window_start": "2022-01-01T00:00:00Z", "window_end": "2022-01-08T00:00:00Z"},
+        {"window_start": "2022-01-08T00:00:00Z", "window_end": "2022-01-15T00:00:00Z"},
+        {"window_start": "2022-01-15T00:00:00Z", "window_end": "2022-01-22T00:00:00Z"},
+    ]
+
+
+def test_advance_watermark_only_folds_contiguous_windows():
+    """An unfinished window holds back the watermark and keeps later windows."""
+    windows = build_windows(
+        datetime(2022, 1, 1, tzinfo=timezone.utc),
+        datetime(2022, 1, 29, tzinfo=timezone.utc),
+        days=7,
+    )
+    state = {
+        "partitions": [
+            {"context": windows[0], "window_complete": True},
+            {"context": windows[1], "replication_key_value": "2022-01-09T00:00:00Z"},
+            {"context": windows[2], "window_complete": True},
+        ]
+    }
+    assert advance_watermark(state, "2022-01-01T00:00:00Z") == "2022-01-08T00:00:00Z"
+    assert [p["context"] for p in state["partitions"]] == windows[1:3]
+
+    state["partitions"][0]["window_complete"] = True
+    assert (
+        advance_watermark(state, state["window_watermark"]) == windows[2]["window_end"]
+    )
+    assert state["partitions"] == []
+
+
+def test_state_only_keeps_open_windows_across_runs():
+    """Windows folded into the watermark do not come back into the state."""
+    with MockCIN7Server(records=300) as server:
+        config = tap_config(server.url, window_days=90, max_workers=2)
+        catalog = select_streams(config, ["products", "sale_order"])
+        state = None
+        for _ in range(2):
+            state = final_state(run_tap(config, catalog, state))
+            stream_state = state["bookmarks"]["products"]
+            watermark = stream_state["window_watermark"]
+            starts = [
+                partition["context"]["window_start"]
+                for partition in stream_state["partitions"]
+            ]
+            assert starts and all(start >= watermark for start in starts)
+            assert not any(
+                partition.get("window_complete")
+                for partition in stream_state["partitions"]
+            )
@@ -0,0 +1,47 @@
+"""Tests for catalog-driven column projection."""
+
+from tap_cin7.projection import selected_fields
+
+SCHEMA = {
+    "properties": {
+        "id": {"type": ["integer", "null"]},
+        "modifiedDate": {"type": ["string", "null"], "format": "date-time"},
+        "reference": {"type": ["string", "null"]},
+        "total": {"type": ["number", "null"]},
+        "lineItems": {
+            "type": ["array", "null"],
+            "items": {"type": "object", "properties": {"qty": {"type": "number"}}},
+        },
+    }
+}
+
+
+def test_everything_selected_requests_all_fields():
+    """No `fields` parameter is needed when every property is selected."""
+    assert selected_fields(SCHEMA, {}, ["id"]) is None
+
+
+def test_deselected_properties_are_not_requested():
+    """Deselected properties are dropped, keys are always kept."""
+    selection = {
+        ("properties", "id"): False,
+        ("properties", "modifiedDate"): False,
+        ("properties", "lineItems"): False,
+    }
+    assert selected_fields(SCHEMA, selection, ["id", "modifiedDate"]) == [
+        "reference",
+        "total",
+        "id",
+        "modifiedDate",
+    ]
+
+
+def test_selected_nested_property_requests_its_parent():
+    """A selected nested property pulls in its top-level parent."""
+    selection = {
+        ("properties", "reference"): False,
+        ("properties", "total"): False,
+        ("properties", "lineItems"): False,
+        ("properties", "lineItems", "items", "properties", "qty"): True,
+    }
+    assert selected_fields(SCHEMA, selection) == ["id", "modifiedDate", "lineItems"]
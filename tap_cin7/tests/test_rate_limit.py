@@ -0,0 +1,73 @@
+"""Tests for the CIN7 rate limiter."""
+
+from tap_cin7.rate_limit import RateLimiter, parse_retry_after
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_burst_then_steady_rate():
+    """Requests within the burst go out at once, then at the per-second rate."""
+    clock = FakeClock()
+    limiter = _limiter(clock, burst=3, per_second=2, per_minute=None)
+    waits = [limiter.acquire() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == [0.5, 0.5]
+
+
+def test_time_spent_elsewhere_is_not_slept_again():
+    """A slow response counts towards the spacing of the next request."""
+    clock = FakeClock()
+    limiter = _limiter(clock, burst=1, per_second=1, per_minute=None)
+    limiter.acquire()
+    clock.now += 1.5
+    assert limiter.acquire() == 0.0
+
+
+def test_per_minute_budget_is_never_exceeded():
+    """No sliding minute sees more requests than the per-minute budget."""
+    clock = FakeClock()
+    limiter = _limiter(clock, burst=3, per_second=3, per_minute=60)
+    sent = []
+    for _ in range(200):
+        limiter.acquire()
+        sent.append(clock.now)
+    for i, start in enumerate(sent):
+        in_window = [t for t in sent[i:] if t < start + 60]
+        assert len(in_window) <= 60
+
+
+def test_throttle_slows_down_and_recovers():
+    """HTTP 429 halves the rate and honours Retry-After; successes recover."""
+    clock = FakeClock()
+    limiter = _limiter(clock, burst=1, per_second=1, per_minute=None)
+    limiter.acquire()
+    limiter.throttled(retry_after=10)
+    assert limiter.scale == 0.5
+    assert limiter.acquire() == 10.0
+    assert limiter.acquire() == 2.0
+    for _ in range(20):
+        limiter.succeeded()
+    assert limiter.scale == 1.0
+
+
+def test_parse_retry_after():
+    """Retry-After accepts delta-seconds and ignores garbage."""
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
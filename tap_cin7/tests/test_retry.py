@@ -0,0 +1,107 @@
+"""Tests for the retry budget and circuit breaker."""
+
+from tap_cin7.retry import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    PROBE_POLL_INTERVAL,
+    CircuitBreaker,
+    RetryBudget,
+)
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import tap_config
+from tap_cin7.tests.test_rate_limit import FakeClock
+
+
+def test_retry_budget_is_shared_and_finite():
+    """The budget allows exactly its number of retries."""
+    budget = RetryBudget(2)
+    assert [budget.spend() for _ in range(3)] == [True, True, False]
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    """Repeated failures pause requests; a success resets the count."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=3, cooldown=10, clock=clock, sleep=clock.sleep
+    )
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open
+    assert breaker.wait() == 0.0
+
+    breaker.record_failure()
+    assert breaker.is_open
+    assert breaker.wait() == 10.0
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_backs_off_when_probe_fails():
+    """A failure after the cooldown re-opens the breaker for longer."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, cooldown=10, clock=clock, sleep=clock.sleep
+    )
+    breaker.record_failure()
+    breaker.wait()
+    breaker.record_failure()
+    assert breaker.wait() == 20.0
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.wait() == 10.0
+
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    """After the cooldown one request probes while the others keep waiting."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=2, cooldown=10, clock=clock, sleep=clock.sleep
+    )
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.sleep(10)
+    assert breaker.delay() == 0.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.delay() == PROBE_POLL_INTERVAL
+
+    # A failed probe re-opens the breaker, starting the count afresh.
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.delay() == 20.0
+    clock.sleep(20)
+    assert breaker.delay() == 0.0
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.delay() == 0.0
+
+
+def test_half_open_breaker_replaces_a_lost_probe():
+    """A probe never reporting back is followed by another after the cooldown."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, cooldown=10, clock=clock, sleep=clock.sleep
+    )
+    breaker.record_failure()
+    assert breaker.wait() == 10.0
+    assert breaker.wait() == 10.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_taps_do_not_share_budgets_or_limits():
+    """Each tap builds its own budgets and limiters from its own config."""
+    first = TapCIN7(config=tap_config("http://localhost", retry_budget=1))
+    second = TapCIN7(config=tap_config("http://localhost", retry_budget=100))
+    assert first.streams["products"].retry_budget.spend()
+    assert first.streams["products"].retry_budget.remaining == 0
+
+    products = second.streams["products"]
+    assert products.retry_budget.remaining == 100
+    assert products.rate_limiter is not first.streams["products"].rate_limiter
+    assert products.requests_session is not first.streams["products"].requests_session
+    # Streams of the same tap and account share them.
+    assert second.streams["voucher"].retry_budget is products.retry_budget
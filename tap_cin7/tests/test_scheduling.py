@@ -0,0 +1,76 @@
+"""Tests for stream scheduling from run statistics."""
+
+import threading
+from collections import Counter
+
+from tap_cin7.rate_limit import RateLimiter
+from tap_cin7.scheduling import FairShare, RunHistory
+from tap_cin7.telemetry import Metrics
+
+
+def _metrics(seconds, requests, records):
+    clock = iter([0.0, seconds])
+    metrics = Metrics("stream", clock=lambda: next(clock))
+    metrics.add(requests=requests, records=records)
+    metrics.finish()
+    return metrics
+
+
+def test_history_is_smoothed_and_saved(tmp_path):
+    """Statistics survive a round trip and are averaged with earlier runs."""
+    path = str(tmp_path / "run_stats.json")
+    history = RunHistory(path)
+    history.update("sale_order", _metrics(100.0, 400, 100000))
+    history.save()
+
+    history = RunHistory(path)
+    history.update("sale_order", _metrics(50.0, 200, 50000))
+    assert history.expected("sale_order", "seconds") == 75.0
+    assert history.expected("sale_order", "requests") == 300
+    assert history.streams["sale_order"]["runs"] == 2
+    assert history.expected("branches", "seconds") is None
+
+
+def test_longest_first_and_weights(tmp_path):
+    """Unknown streams go first, then the rest by expected duration."""
+    history = RunHistory(str(tmp_path / "missing.json"))
+    history.streams = {
+        "branches": {"seconds": 2, "requests": 10},
+        "sale_order": {"seconds": 300, "requests": 900},
+        "contacts": {"seconds": 20, "requests": 50},
+    }
+    names = ["branches", "contacts", "stockstream", "sale_order"]
+    assert history.longest_first(names, key=str) == [
+        "stockstream",
+        "sale_order",
+        "contacts",
+        "branches",
+    ]
+    weights = history.weights(names)
+    assert weights["sale_order"] == 900
+    assert weights["stockstream"] == (900 + 50 + 10) / 3
+
+
+def test_fair_share_splits_slots_by_weight():
+    """Contending streams get request slots in proportion to their weights."""
+    limiter = RateLimiter(burst=1, per_second=500, per_minute=None)
+    fair_share = FairShare({"sale_order": 3, "branches": 1})
+    granted = []
+    lock = threading.Lock()
+
+    def worker(stream):
+        for _ in range(60):
+            fair_share.acquire(stream, limiter)
+            with lock:
+                granted.append(stream)
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in fair_share.weights]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # While both streams were waiting, slots went 3:1.
+    counts = Counter(granted[:60])
+    assert 40 <= counts["sale_order"] <= 50
+    assert fair_share.shares() == {"sale_order": 0.75, "branches": 0.25}
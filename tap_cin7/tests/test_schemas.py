@@ -0,0 +1,70 @@
+"""Tests for lazily loaded schemas and catalog-driven stream construction."""
+
+from tap_cin7.accounts import TENANT
+from tap_cin7.change_detection import DELETED_AT
+from tap_cin7.schemas import LazySchema
+from tap_cin7.streams import OrderStream, SaleOrderLineItemsStream
+from tap_cin7.tap import TapCIN7
+
+CONFIG = {"api_key": "a", "api_password": "p", "child_streams": True}
+
+
+def test_schemas_are_built_once_per_class():
+    """A schema is only built when read, then shared by the class."""
+    built = []
+
+    class Stream:
+        schema = LazySchema(lambda stream_type: built.append(stream_type) or {})
+
+    class Child(Stream):
+        pass
+
+    assert built == []
+    assert Stream.schema is Stream().schema
+    assert Child.schema is Child.schema
+    assert built == [Stream, Child]
+
+
+def test_child_schemas_derive_from_their_source():
+    """Child streams take their item properties from the source's schema."""
+    line_items = OrderStream.schema["properties"]["lineItems"]["items"]
+    properties = SaleOrderLineItemsStream.schema["properties"]
+    assert properties["salesOrderId"] == {"type": ["integer", "null"]}
+    assert properties["qty"] == line_items["properties"]["qty"]
+
+
+def _catalog(selected):
+    catalog = TapCIN7(config=CONFIG, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in selected
+    return catalog
+
+
+def test_only_streams_the_catalog_needs_are_built():
+    """Deselected streams are not built, unless a selected one is taken from them."""
+    tap = TapCIN7(config=CONFIG, catalog=_catalog({"voucher"}), parse_env_config=False)
+    assert list(tap.streams) == ["voucher"]
+
+    catalog = _catalog({"sale_order_line_items"})
+    tap = TapCIN7(config=CONFIG, catalog=catalog, parse_env_config=False)
+    assert list(tap.streams) == ["sale_order", "sale_order_line_items"]
+    assert [stream.name for stream in tap._streams_to_sync()] == ["sale_order"]
+
+
+def test_extended_schemas_stay_with_their_tap(tmp_path):
+    """Tenant and delete properties do not leak into later taps' catalogs."""
+    config = {
+        "accounts": [{"tenant": "acme", "api_key": "a", "api_password": "p"}],
+        "emit_deletes": True,
+        "change_detection_path": str(tmp_path / "hashes.sqlite"),
+    }
+    tap = TapCIN7(config=config, parse_env_config=False)
+    assert TENANT in tap.streams["products"].schema["properties"]
+    assert DELETED_AT in tap.streams["voucher"].schema["properties"]
+
+    plain = TapCIN7(config=CONFIG, parse_env_config=False)
+    for entry in plain.catalog_dict["streams"]:
+        assert TENANT not in entry["schema"]["properties"]
+        assert DELETED_AT not in entry["schema"]["properties"]
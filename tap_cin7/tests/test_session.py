@@ -0,0 +1,63 @@
+"""Tests for the pooled HTTP sessions shared by the streams of an account."""
+
+import socket
+
+from requests.adapters import HTTPAdapter
+
+from tap_cin7.session import (
+    ACCEPT_ENCODING,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    MIN_POOL_SIZE,
+    CIN7Adapter,
+    build_session,
+    get_session,
+    pool_size,
+)
+from tap_cin7.tests.mock_server import MockCIN7Server
+
+
+def test_pool_size_covers_every_concurrent_request():
+    """The pool fits all workers' requests in flight, unless configured."""
+    assert pool_size({}) == MIN_POOL_SIZE
+    concurrent = {"max_workers": 4, "partition_workers": 2, "prefetch_pages": 8}
+    assert pool_size(concurrent) == 64
+    assert pool_size(dict(concurrent, pool_size=5)) == 5
+
+
+def test_sessions_keep_connections_alive_in_one_pool():
+    """Sessions mount a single keep-alive pool of the configured size."""
+    session = build_session({"max_workers": 4, "prefetch_pages": 8})
+    adapter = session.get_adapter("https://api.cin7.com/api/v1/Products")
+    assert isinstance(adapter, CIN7Adapter)
+    assert adapter._pool_maxsize == 32
+    options = adapter.poolmanager.connection_pool_kw["socket_options"]
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+    assert session.headers["Accept-Encoding"] == ACCEPT_ENCODING
+
+
+def test_requests_always_use_the_configured_timeouts(monkeypatch):
+    """A timeout passed with a request is replaced by the configured ones."""
+    sent = []
+    send = HTTPAdapter.send
+
+    def record_send(adapter, request, **kwargs):
+        sent.append(kwargs["timeout"])
+        return send(adapter, request, **kwargs)
+
+    monkeypatch.setattr(HTTPAdapter, "send", record_send)
+    with MockCIN7Server(records=10) as server:
+        build_session({}).get(f"{server.url}/v1/Branches", timeout=1)
+        build_session({"connect_timeout": 2, "read_timeout": 30}).get(
+            f"{server.url}/v1/Branches"
+        )
+    assert sent == [(DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT), (2, 30)]
+
+
+def test_accounts_share_one_session_each():
+    """Streams of the same account reuse its session; other accounts do not."""
+    sessions = {}
+    session = get_session(sessions, "test-session-a", {})
+    assert get_session(sessions, "test-session-a", {"pool_size": 99}) is session
+    assert get_session(sessions, "test-session-b", {}) is not session
+    assert get_session({}, "test-session-a", {}) is not session
@@ -0,0 +1,61 @@
+"""Tests for per-stream telemetry."""
+
+import json
+
+from tap_cin7.telemetry import Histogram, Telemetry
+
+
+def test_histogram_quantiles():
+    """Quantiles are reported as the upper bound of their bucket."""
+    histogram = Histogram([0.1, 1.0, 10.0])
+    for value in [0.05, 0.5, 0.5, 0.7, 4.0]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.95) == 4.0
+    assert histogram.counts == [1, 3, 1, 0]
+
+
+def test_stream_totals_and_exports():
+    """Partition metrics add up to stream totals in every export."""
+    telemetry = Telemetry()
+    for window in ("2021", "2022"):
+        metrics = telemetry.metrics("sale_order", {"window_start": window})
+        metrics.observe_request(0.2)
+        metrics.add(records=250, response_bytes=1000)
+        metrics.finish()
+    telemetry.metrics("sale_order").add(throttled=1)
+
+    totals = telemetry.stream_totals("sale_order").values
+    assert totals["requests"] == 2
+    assert totals["records"] == 500
+    assert totals["throttled"] == 1
+
+    summary = telemetry.summary()["streams"]["sale_order"]
+    assert summary["response_bytes"] == 2000
+    assert len(summary["partitions"]) == 2
+
+    text = telemetry.prometheus_text()
+    assert 'tap_cin7_records_total{stream="sale_order"} 500' in text
+    assert (
+        'tap_cin7_request_duration_seconds_bucket{stream="sale_order",le="+Inf"} 2'
+        in text
+    )
+
+
+def test_metric_lines_are_counters_and_timers(caplog):
+    """Only totals are logged as METRIC lines; the record rate is summary-only."""
+    metrics = Telemetry().metrics("sale_order")
+    metrics.observe_request(0.2)
+    metrics.add(records=250)
+    metrics.finish()
+    with caplog.at_level("INFO"):
+        metrics.log()
+
+    logged = [
+        json.loads(message.split("METRIC: ", 1)[1])
+        for message in caplog.messages
+        if "METRIC: " in message
+    ]
+    assert {line["type"] for line in logged} == {"counter", "timer"}
+    assert "records_per_second" not in {line["metric"] for line in logged}
+    assert metrics.as_dict()["records_per_second"] > 0
@@ -0,0 +1,79 @@
+"""Tests for the asyncio transport."""
+
+import pytest
+import requests
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_cin7.scheduling import FairShare
+from tap_cin7.tap import TapCIN7
+from tap_cin7.tests.helpers import records, run_tap, select_streams, tap_config
+from tap_cin7.tests.mock_server import MockCIN7Server
+from tap_cin7.transport import _convert_error, to_requests_response
+
+httpx = pytest.importorskip("httpx")
+
+
+def test_responses_work_like_requests_responses():
+    """Converted responses carry the status, headers and body of the original."""
+    request = requests.Request("GET", "https://api.cin7.com/api/v1/Products").prepare()
+    response = httpx.Response(
+        429,
+        headers={"Retry-After": "2", "Content-Type": "application/json"},
+        content=b'[{"id": 1}]',
+        request=httpx.Request("GET", request.url),
+    )
+    converted = to_requests_response(request, response, 0.25)
+    assert converted.status_code == 429
+    assert converted.headers["retry-after"] == "2"
+    assert converted.reason == "Too Many Requests"
+    assert converted.json() == [{"id": 1}]
+    assert converted.elapsed.total_seconds() == 0.25
+    assert converted.request is request
+
+
+def test_errors_are_raised_as_requests_errors():
+    """Transport failures map to the exceptions the retry logic expects."""
+    request = requests.Request("GET", "https://api.cin7.com/api").prepare()
+    expected = [
+        (httpx.ConnectTimeout("slow"), requests.exceptions.ConnectTimeout),
+        (httpx.ReadTimeout("slow"), requests.exceptions.ReadTimeout),
+        (httpx.RemoteProtocolError("cut"), requests.exceptions.ChunkedEncodingError),
+        (httpx.ConnectError("refused"), requests.exceptions.ConnectionError),
+    ]
+    for error, converted in expected:
+        assert type(_convert_error(error, request)) is converted
+
+
+def test_requests_take_their_fair_share(tmp_path, monkeypatch):
+    """Requests sent on the event loop are scheduled like the threads' ones."""
+    acquired = []
+    acquire = FairShare.acquire
+
+    def record_acquire(self, stream, limiter):
+        acquired.append(stream)
+        return acquire(self, stream, limiter)
+
+    monkeypatch.setattr(FairShare, "acquire", record_acquire)
+    with MockCIN7Server(records=600) as server:
+        config = tap_config(
+            server.url,
+            transport="asyncio",
+            prefetch_pages=2,
+            max_workers=2,
+            run_stats_path=str(tmp_path / "stats.json"),
+        )
+        catalog = select_streams(config, ["products", "voucher"])
+        messages = run_tap(config, catalog)
+        sent = sum(server.requests.values())
+
+    assert len(records(messages, "products")) == 600
+    assert sorted(set(acquired)) == ["products", "voucher"]
+    # Prefetched pages past the end may be cancelled after taking their slot.
+    assert len(acquired) >= sent
+
+
+def test_unknown_transports_fail_config_validation():
+    """A misspelt transport is rejected instead of falling back to requests."""
+    TapCIN7(config=tap_config("http://localhost", transport="asyncio"))
+    with pytest.raises(ConfigValidationError):
+        TapCIN7(config=tap_config("http://localhost", transport="httpx"))
@@ -0,0 +1,166 @@
+"""An asyncio request engine for page requests.
+
+With `transport` set to `asyncio`, page requests are sent with httpx from one
+event loop running on a background thread. Streams still build their requests
+and parse their pages on their own threads. They hand prepared requests to the
+loop and read the responses back in page order, with up to `prefetch_pages`
+pages of each stream in flight. A request waiting on the rate limit or the
+network then costs a coroutine instead of a thread, so hundreds of them can be
+outstanding across streams and accounts.
+
+Responses are converted to `requests.Response` objects and httpx errors to
+their `requests` equivalents, so response validation, retries and parsing work
+the same with either transport.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Any, Coroutine, Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from tap_cin7.session import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, pool_size
+
+REQUESTS = "requests"
+ASYNCIO = "asyncio"
+TRANSPORTS = (REQUESTS, ASYNCIO)
+
+
+def to_requests_response(
+    request: requests.PreparedRequest, response: Any, seconds: float
+) -> requests.Response:
+    """Return an httpx response as a `requests.Response` with its body read."""
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers = CaseInsensitiveDict(response.headers.items())
+    result.reason = response.reason_phrase
+    result.url = str(response.url)
+    result.encoding = get_encoding_from_headers(result.headers)
+    result.request = request
+    result.elapsed = timedelta(seconds=seconds)
+    result._content = response.content
+    result._content_consumed = True  # type: ignore[attr-defined]
+    return result
+
+
+def _convert_error(ex: Exception, request: requests.PreparedRequest) -> Exception:
+    """Return the `requests` exception raised for the same failure."""
+    import httpx
+
+    if isinstance(ex, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(str(ex), request=request)
+    if isinstance(ex, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(str(ex), request=request)
+    if isinstance(ex, httpx.RemoteProtocolError):
+        return requests.exceptions.ChunkedEncodingError(str(ex), request=request)
+    if isinstance(ex, httpx.DecodingError):
+        return requests.exceptions.ContentDecodingError(str(ex), request=request)
+    return requests.exceptions.ConnectionError(str(ex), request=request)
+
+
+class AsyncTransport:
+    """An event loop on a daemon thread sending requests with httpx.
+
+    Every API account gets its own connection pool, sized like the account's
+    `requests` session.
+    """
+
+    def __init__(self) -> None:
+        """Start the event loop."""
+        # httpx is only imported by runs using this transport.
+        try:
+            import httpx  # noqa: F401
+        except ImportError as ex:
+            raise ImportError("The asyncio transport requires httpx") from ex
+        self._loop = asyncio.new_event_loop()
+        # Only used from the loop's thread.
+        self._clients: Dict[Optional[str], Any] = {}
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="tap-cin7-transport", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """Run a coroutine on the loop and return a future for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _client(self, account: Optional[str], config: Mapping[str, Any]) -> Any:
+        import httpx
+
+        client = self._clients.get(account)
+        if client is None:
+            size = pool_size(config)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=size, max_keepalive_connections=size
+                ),
+                timeout=httpx.Timeout(
+                    config.get("read_timeout", DEFAULT_READ_TIMEOUT),
+                    connect=config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+                    # Requests queue for a free connection for as long as needed.
+                    pool=None,
+                ),
+            )
+            self._clients[account] = client
+        return client
+
+    async def send(
+        self,
+        account: Optional[str],
+        config: Mapping[str, Any],
+        request: requests.PreparedRequest,
+    ) -> requests.Response:
+        """Send a prepared request on the account's connection pool."""
+        import httpx
+
+        client = self._client(account, config)
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+            )
+        except httpx.RequestError as ex:
+            raise _convert_error(ex, request) from ex
+        return to_requests_response(request, response, time.perf_counter() - started)
+
+    async def _close_clients(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def close(self) -> None:
+        """Close every connection and stop the event loop."""
+        self.submit(self._close_clients()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_TRANSPORT: Optional[AsyncTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> AsyncTransport:
+    """Return the transport shared by every stream, starting it on first use."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = AsyncTransport()
+        return _TRANSPORT
+
+
+def close_transport() -> None:
+    """Stop the shared transport, if it was started."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        transport, _TRANSPORT = _TRANSPORT, None
+    if transport is not None:
+        transport.close()